@@ -0,0 +1,30 @@
+# general libraries
+import argparse
+# custom libraries
+from tools.config_logger import config_logger
+from tools.arduino_resources import InterfaceType
+from tools.benchmark import Benchmark
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark command latency / throughput against simulated boards")
+    parser.add_argument("--iterations", type=int, default=200, help="# of commands per command family")
+    parser.add_argument("--timeout", type=float, default=0.05, help="interface timeout (sec)")
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated board reply latency (sec)")
+    parser.add_argument("--transport", nargs="+", default=None, choices=["Wifi", "Serial"],
+                        help="transports to benchmark, default: every transport simulated on this OS")
+    parser.add_argument("--loss", nargs="+", type=float, default=[0.0, 0.05], help="packet loss probabilities")
+    parser.add_argument("--family", nargs="+", default=None, choices=list(Benchmark.command_families))
+    parser.add_argument("--output", default="benchmark.json", help="JSON results file")
+    args = parser.parse_args()
+
+    config_logger(use_stream_handler=True)
+    benchmark = Benchmark(iterations=args.iterations, timeout=args.timeout, latency=args.latency,
+                          families=args.family)
+    interface_types = [InterfaceType[name] for name in args.transport] if args.transport else None
+    benchmark.run(interface_types=interface_types, loss_options=args.loss)
+    benchmark.save_json(args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+# general libraries
+import logging as logger
+# custom libraries
+from tools.config_logger import config_logger
+from tools.arduino_resources import Settings
+from tools.fleet import Fleet
+from tools.poller import Poller
+from tools.telemetry_store import TelemetryStore
+from tools.metrics import MetricsServer
+
+
+def main():
+    config_logger(use_stream_handler=True, use_queue=True)
+    comm_settings = Settings.get_json()["comm_settings"]
+    if not comm_settings["polling_enabled"]:
+        logger.info(f"Polling disabled (settings.json -> polling_enabled)")
+        return
+    logger.info(f"Polling boards every {comm_settings['polling_interval']} sec\n")
+
+    fleet = Fleet()
+    telemetry_store = TelemetryStore()
+    metrics_server = None
+    if comm_settings["metrics_enabled"]:
+        metrics_server = MetricsServer(fleet.interfaces, port=comm_settings["metrics_port"]).start()
+    poller = Poller(fleet, polling_interval=comm_settings["polling_interval"], telemetry_store=telemetry_store)
+    try:
+        poller.run()
+    except KeyboardInterrupt:
+        logger.info(f"Polling stopped")
+    finally:
+        poller.stop()
+        if metrics_server is not None:
+            metrics_server.stop()
+        fleet.close()
+        telemetry_store.close()
+        logger.info(f"Latency stats: {fleet.get_latency_stats()}")
+
+
+if __name__ == "__main__":
+    main()
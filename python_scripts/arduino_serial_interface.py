@@ -50,10 +50,8 @@ def main():
         Arduino.get_io_state(serial_com, "ssr", x)
     for x in range(1, 5):
         Arduino.get_io_state(serial_com, "opto", x)
-    for x in range(1, 5):
-        Arduino.get_io_state(serial_com, "ssr", x)
-    for x in range(1, 5):
-        Arduino.get_io_state(serial_com, "opto", x)
+    # Get all IOs, analog inputs and probes in one pipelined batch
+    Arduino.get_io_snapshot(serial_com)
     # Config SSR Alarms
     for x in range(1, 5):
         Arduino.config_output_alarm(serial_com, "ssr", x, True, True, alarm_ssrx_time_list[x - 1])
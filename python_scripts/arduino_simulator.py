@@ -0,0 +1,40 @@
+# general libraries
+import argparse
+import logging as logger
+import threading
+# custom libraries
+from tools.config_logger import config_logger
+from tools.arduino_simulator import SimulatedBoard, LinkConditions, UdpSimulator, PtySimulator
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulated arduino automator board (udp and serial pty)")
+    parser.add_argument("--ip_address", default="127.0.0.1", help="udp address to listen on")
+    parser.add_argument("--udp_port", type=int, default=2390, help="udp port to listen on")
+    parser.add_argument("--no_pty", action="store_true", help="don't serve the board on a pseudo-terminal")
+    parser.add_argument("--crc", action="store_true", help="expect and send crc8 bytes")
+    parser.add_argument("--latency", type=float, default=0.0, help="reply latency (sec)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="random extra reply latency (sec)")
+    parser.add_argument("--loss", type=float, default=0.0, help="packet loss probability [0-1]")
+    parser.add_argument("--reorder", type=float, default=0.0, help="udp reply reordering probability [0-1]")
+    parser.add_argument("--seed", type=int, default=None, help="random seed")
+    args = parser.parse_args()
+
+    config_logger(use_stream_handler=True)
+    board = SimulatedBoard(rx_crc8_enabled=args.crc, tx_crc8_enabled=args.crc, ip_address=args.ip_address)
+    link = LinkConditions(latency=args.latency, jitter=args.jitter, loss=args.loss, reorder=args.reorder,
+                          seed=args.seed)
+    simulators = [UdpSimulator(board, ip_address=args.ip_address, udp_port=args.udp_port, link=link).start()]
+    if not args.no_pty:
+        simulators.append(PtySimulator(board, link=link).start())
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        logger.info(f"Simulator stopped, {board.command_count} command(s) handled")
+    finally:
+        for simulator in simulators:
+            simulator.stop()
+
+
+if __name__ == "__main__":
+    main()
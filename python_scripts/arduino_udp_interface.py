@@ -50,10 +50,8 @@ def main():
         Arduino.get_io_state(wifi_sock, "ssr", x)
     for x in range(1, 5):
         Arduino.get_io_state(wifi_sock, "opto", x)
-    for x in range(1, 5):
-        Arduino.get_io_state(wifi_sock, "ssr", x)
-    for x in range(1, 5):
-        Arduino.get_io_state(wifi_sock, "opto", x)
+    # Get all IOs, analog inputs and probes in one pipelined batch
+    Arduino.get_io_snapshot(wifi_sock)
     # Config SSR Alarms
     for x in range(1, 5):
         Arduino.config_output_alarm(wifi_sock, "ssr", x, True, True, alarm_ssrx_time_list[x - 1])
@@ -67,6 +65,9 @@ def main():
     Arduino.config_expected_io_state(wifi_sock, output_type="ssr", output_num=3)
     Arduino.config_expected_io_state(wifi_sock, output_type="ssr", output_num=4)
 
+    # close udp interface
+    wifi_sock.close()
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,46 @@
+# general libraries
+import os
+import sys
+import pytest
+
+# tests import the tools package the same way the scripts of python_scripts do
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# custom libraries
+from tools.arduino_resources import Arduino, Interface, InterfaceType
+from tools.arduino_simulator import SimulatedBoard, UdpSimulator, LinkConditions
+
+
+@pytest.fixture
+def crc8_enabled(request):
+    """
+    enables crc8 on commands and replies for the test (param: bool, default True), restores Arduino settings after
+    """
+    enabled = getattr(request, "param", True)
+    saved_crc8 = (Arduino.tx_crc8_enabled, Arduino.rx_crc8_enabled)
+    Arduino.tx_crc8_enabled = Arduino.rx_crc8_enabled = enabled
+    yield enabled
+    Arduino.tx_crc8_enabled, Arduino.rx_crc8_enabled = saved_crc8
+
+
+@pytest.fixture
+def simulated_link():
+    """
+    :return: function(link=None, crc8=False, timeout=0.05, **interface_kwargs) -> (Interface, UdpSimulator),
+             serving a fresh SimulatedBoard on a free udp port, everything is closed at the end of the test
+    """
+    opened = []
+
+    def open_link(link=None, crc8=False, timeout=0.05, **interface_kwargs):
+        board = SimulatedBoard(rx_crc8_enabled=crc8, tx_crc8_enabled=crc8)
+        simulator = UdpSimulator(board, udp_port=0, link=link if link else LinkConditions()).start()
+        interface_kwargs.setdefault("adaptive_timeout", False)
+        com = Interface(InterfaceType.Wifi, ip_address=simulator.ip_address, udp_port=simulator.udp_port,
+                        timeout=timeout, **interface_kwargs)
+        opened.append((com, simulator))
+        return com, simulator
+
+    yield open_link
+    for com, simulator in opened:
+        com.close()
+        simulator.stop()
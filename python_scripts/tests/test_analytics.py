@@ -0,0 +1,40 @@
+# general libraries
+import numpy as np
+# custom libraries
+from tools.analytics import Analytics
+from tools.telemetry_store import TelemetryStore
+
+
+def test_hold_empty_source():
+    held = Analytics.hold(np.array([1.0, 2.0]), np.array([]), np.array([]))
+    assert held.shape == (2,)
+    assert np.all(np.isnan(held))
+
+
+def test_hold_step_signal():
+    held = Analytics.hold(np.array([0.5, 1.0, 2.5]), np.array([1.0, 2.0]), np.array([0.0, 1.0]))
+    assert np.isnan(held[0])
+    assert held[1:].tolist() == [0.0, 1.0]
+
+
+def test_report_without_ssr_samples(tmp_path):
+    telemetry_store = TelemetryStore(str(tmp_path))
+    for i in range(20):
+        telemetry_store.append("board", "probe_1", 1000.0 + i, 20.0 + i * 0.1)
+    telemetry_store.flush()
+    report = Analytics.ssr_temperature_report(telemetry_store, "board", 1, 1)
+    assert report["on_period_count"] == 0
+    assert report["mean_rate_on"] is None and report["lag_sec"] is None
+
+
+def test_ssr_heats_probe():
+    timestamps = np.arange(200, dtype=np.float64)
+    ssr_states = (timestamps // 20) % 2
+    # temperature rises 0.5 deg C/sec while ssr on, falls 0.1 deg C/sec while off
+    rates = np.where(ssr_states > 0, 0.5, -0.1)
+    probe_values = 20.0 + np.concatenate(([0.0], np.cumsum(rates[:-1])))
+    report = Analytics.ssr_temperature_response(timestamps, ssr_states, timestamps, probe_values, max_lag=5)
+    assert report["correlation"] > 0.99
+    assert report["lag_sec"] == 0
+    assert report["mean_rate_on"] == 0.5
+    assert report["on_period_count"] == 5
@@ -0,0 +1,142 @@
+# general libraries
+import asyncio
+import pytest
+# custom libraries
+from tools.OSDetection import OSDetection, OSType
+from tools.arduino_resources import InterfaceType, FailedFSM, Arduino, HealthTracker, BoardUnavailable, RetryPolicy
+from tools.arduino_async_resources import AsyncInterface, AsyncArduino
+from tools.arduino_simulator import SimulatedBoard, UdpSimulator, PtySimulator, LinkConditions
+
+
+@pytest.fixture
+def simulator():
+    """
+    :return: function(link=None, crc8=False) -> UdpSimulator serving a fresh SimulatedBoard, stopped after the test
+    """
+    started = []
+
+    def start(link=None, crc8=False):
+        board = SimulatedBoard(rx_crc8_enabled=crc8, tx_crc8_enabled=crc8)
+        udp_simulator = UdpSimulator(board, udp_port=0, link=link if link else LinkConditions()).start()
+        started.append(udp_simulator)
+        return udp_simulator
+
+    yield start
+    for udp_simulator in started:
+        udp_simulator.stop()
+
+
+def run_client(udp_simulator, client, timeout=0.05, **interface_kwargs):
+    """
+    :param client: coroutine function(AsyncInterface) - run on an interface opened on udp_simulator
+    :return: tuple (value returned by client, AsyncInterface) - interface is closed before the event loop stops
+    """
+    interface_kwargs.setdefault("adaptive_timeout", False)
+    com = AsyncInterface(InterfaceType.Wifi, ip_address=udp_simulator.ip_address, udp_port=udp_simulator.udp_port,
+                         timeout=timeout, **interface_kwargs)
+
+    async def main():
+        await com.open()
+        try:
+            return await client(com)
+        finally:
+            await com.close()
+
+    return asyncio.run(main()), com
+
+
+async def set_then_get(com):
+    await AsyncArduino.config_io_state(com, "ssr", 3, True)
+    return [await AsyncArduino.get_io_state(com, "ssr", io_num) for io_num in range(1, 5)]
+
+
+def test_set_and_get_with_loss_and_crc(simulator, crc8_enabled):
+    udp_simulator = simulator(link=LinkConditions(loss=0.05, latency=0.001, jitter=0.02, seed=4), crc8=True)
+    results, com = run_client(udp_simulator, lambda com: asyncio.gather(*(set_then_get(com) for _ in range(10))),
+                              timeout=0.02)
+    assert all(io_states == [False, False, True, False] for io_states in results)
+    counters = com.metrics.snapshot()["counters"]
+    assert counters["commands_ok"] == 50
+    assert counters["commands_failed"] == 0
+    # lost datagrams are reported like the sync FSMs report them
+    assert counters["timeouts"] + counters["late_replies"] > 0
+    assert com.metrics.bytes_tx > 0 and com.metrics.bytes_rx > 0
+
+
+def test_nak_is_counted(simulator, crc8_enabled):
+    # board expects a crc byte the command doesn't carry
+    udp_simulator = simulator(crc8=True)
+    Arduino.tx_crc8_enabled = False
+
+    async def get_io_state(com):
+        with pytest.raises(FailedFSM):
+            await AsyncArduino.get_io_state(com, "ssr", 1)
+
+    _, com = run_client(udp_simulator, get_io_state)
+    counters = com.metrics.snapshot()["counters"]
+    assert counters["naks"] == 1
+    assert counters["commands_failed"] == 1
+    assert com.health_tracker.is_closed()
+
+
+def test_late_bytes_are_discarded_before_next_attempt(simulator):
+    udp_simulator = simulator()
+
+    async def get_after_stray_bytes(com):
+        # reply of an attempt that already gave up
+        com.feed(b'\x06\x01')
+        return await AsyncArduino.get_io_state(com, "ssr", 1)
+
+    io_state, com = run_client(udp_simulator, get_after_stray_bytes)
+    assert io_state is False
+    assert com.metrics.snapshot()["counters"]["late_bytes"] == 2
+
+
+def test_adaptive_timeout_follows_board(simulator):
+    udp_simulator = simulator()
+
+    async def get_io_states(com):
+        for _ in range(20):
+            await AsyncArduino.get_io_state(com, "ssr", 1)
+
+    _, com = run_client(udp_simulator, get_io_states, timeout=1, adaptive_timeout=True)
+    assert com.timeout < 0.5
+    assert com.get_max_timeout() >= 1
+
+
+def test_dead_board_is_rejected(simulator):
+    udp_simulator = simulator()
+    udp_simulator.stop()
+
+    async def get_io_states(com):
+        for _ in range(2):
+            with pytest.raises(FailedFSM):
+                await AsyncArduino.get_io_state(com, "ssr", 1)
+        with pytest.raises(BoardUnavailable):
+            await AsyncArduino.get_io_state(com, "ssr", 1)
+
+    _, com = run_client(udp_simulator, get_io_states, health_tracker=HealthTracker(failure_threshold=2),
+                        retry_policy=RetryPolicy(max_attempts=1))
+    assert com.metrics.snapshot()["counters"]["commands_rejected"] == 1
+
+
+@pytest.mark.skipif(OSDetection.get_os_type() == OSType.windows, reason="pty simulator needs a posix os")
+def test_serial_reader_removed_on_close():
+    pty_simulator = PtySimulator(SimulatedBoard()).start()
+    com = AsyncInterface(InterfaceType.Serial, timeout=0.5, windows_port_name=pty_simulator.port_name,
+                         linux_port_name=pty_simulator.port_name, osx_port_name=pty_simulator.port_name,
+                         adaptive_timeout=False)
+
+    async def main():
+        await com.open()
+        io_state = await AsyncArduino.get_io_state(com, "ssr", 1)
+        fd = com.interface.fileno()
+        await com.close()
+        # the reader was registered on the loop com was opened on
+        assert not asyncio.get_running_loop().remove_reader(fd)
+        return io_state
+
+    try:
+        assert asyncio.run(main()) is False
+    finally:
+        pty_simulator.stop()
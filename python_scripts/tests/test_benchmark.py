@@ -0,0 +1,20 @@
+# custom libraries
+from tools.arduino_resources import InterfaceType
+from tools.benchmark import Benchmark
+
+
+def test_summarize_keeps_decode_errors_apart():
+    result = Benchmark.summarize([0.003, 0.001, 0.002], 1, 0.5, decode_error_count=2)
+    assert result["count"] == 6
+    assert result["failure_count"] == 1
+    assert result["decode_error_count"] == 2
+    assert result["p50_ms"] == 2.0
+    assert result["max_ms"] == 3.0
+
+
+def test_lossy_link_without_crc_decodes_every_reply():
+    # late replies are dropped by the FSM instead of being decoded as the reply of the next command
+    benchmark = Benchmark(iterations=30, timeout=0.02, families=["rtc_time", "alarm"])
+    for result in benchmark.run_scenario(InterfaceType.Wifi, False, 0.1):
+        assert result["count"] == 30
+        assert result["decode_error_count"] == 0
@@ -0,0 +1,59 @@
+# general libraries
+import socket
+import time
+import pytest
+# custom libraries
+from tools.arduino_resources import Arduino, CommandBatch, GenCmd, ResponseSchemas
+from tools.arduino_simulator import LinkConditions
+
+
+def queue_io_states(com, io_nums):
+    """
+    :return: tuple (CommandBatch, list GetCmdFSM) - batch with one ssr get command per io #
+    """
+    batch = CommandBatch(com, max_in_flight=4)
+    return batch, [batch.add(GenCmd.get_io_state("ssr", io_num), ResponseSchemas.io_state) for io_num in io_nums]
+
+
+def test_replies_matched_in_order(simulated_link):
+    com, simulator = simulated_link()
+    simulator.board.ssr_outputs = [True, False, False, True]
+    batch, _ = queue_io_states(com, [1, 2, 3, 4, 4, 3, 2, 1])
+    assert batch.run() == [[True], [False], [False], [True], [True], [False], [False], [True]]
+    counters = com.metrics.snapshot()["counters"]
+    assert counters["batch_windows_ok"] == 2
+    assert counters["commands_ok"] == 8
+
+
+def test_lossy_windows_are_sent_again(simulated_link, crc8_enabled):
+    com, simulator = simulated_link(link=LinkConditions(loss=0.05, seed=1), crc8=True)
+    simulator.board.ssr_outputs = [True, False, True, False]
+    for _ in range(5):
+        assert Arduino.get_io_snapshot(com)["ssr"] == [True, False, True, False]
+    counters = com.metrics.snapshot()["counters"]
+    assert counters["batch_windows_failed"] > 0
+    assert counters["timeouts"] > 0
+
+
+def test_failed_window_falls_back_to_one_fsm_per_command(simulated_link, monkeypatch):
+    com, simulator = simulated_link()
+    simulator.board.ssr_outputs = [False, True, False, True]
+    batch, fsm_list = queue_io_states(com, [1, 2, 3, 4])
+    monkeypatch.setattr(batch, "run_window", lambda fsm_window: False)
+    assert batch.run() == [[False], [True], [False], [True]]
+    assert all(fsm.literal_state == "get_cmd_ok" for fsm in fsm_list)
+    assert com.metrics.snapshot()["counters"]["commands_ok"] == 4
+
+
+def test_stray_bytes_do_not_shift_the_window(simulated_link):
+    com, simulator = simulated_link()
+    simulator.board.ssr_outputs = [True, True, True, True]
+    # binds the udp socket of the interface
+    assert Arduino.get_io_state(com, "ssr", 1) is True
+    # reply of an attempt that already gave up, received before the batch is sent
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as late_sender:
+        late_sender.sendto(b"\x06\x00", ("127.0.0.1", com.interface.getsockname()[1]))
+    time.sleep(0.05)
+    batch, _ = queue_io_states(com, [1, 2, 3, 4])
+    assert batch.run() == [[True], [True], [True], [True]]
+    assert com.metrics.snapshot()["counters"]["late_bytes"] == 2
@@ -0,0 +1,77 @@
+# general libraries
+import random
+import pytest
+# custom libraries
+from tools.arduino_resources import CRC8, GenCmd, GetCmdFSM, ResponseSchemas, CrcMismatch
+
+
+def reference_crc8(data):
+    """bit by bit CRC-8 (poly 0x07, init 0, not reflected, no final xor), as computed by the uC"""
+    crc = 0
+    for byte_value in data:
+        crc ^= byte_value
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x07) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+    return crc
+
+
+def test_check_value():
+    # standard check value of CRC-8/SMBUS
+    assert CRC8.compute(b"123456789") == 0xF4
+
+
+def test_empty_payload():
+    assert CRC8.compute(b"") == 0
+
+
+def test_matches_bitwise_reference():
+    rng = random.Random(13)
+    for _ in range(2000):
+        payload = bytes(rng.randrange(256) for _ in range(rng.randrange(1, 64)))
+        assert CRC8.compute(payload) == reference_crc8(payload)
+
+
+def test_incremental_update_and_memoryview():
+    payload = bytearray(range(200))
+    view = memoryview(payload)
+    assert CRC8.update(CRC8.update(0, view[:77]), view[77:]) == CRC8.compute(bytes(payload))
+    assert CRC8.is_valid(view[10:20], reference_crc8(payload[10:20]))
+    assert not CRC8.is_valid(view[10:20], reference_crc8(payload[10:20]) ^ 1)
+
+
+def test_matches_crc8_package():
+    crc8 = pytest.importorskip("crc8")
+    payload = b"CG1"
+    assert CRC8.compute(payload) == crc8.crc8(payload).digest()[0]
+
+
+def test_command_crc_byte():
+    byte_cmd = GenCmd.get_io_state("ssr", 1, append_crc8=True)
+    assert byte_cmd[:4] == b"[CG1"
+    assert byte_cmd[4] == reference_crc8(b"CG1")
+    assert byte_cmd.endswith(b"]")
+
+
+@pytest.mark.parametrize("crc_offset, crc_valid", [(0, True), (1, False)])
+def test_reply_crc_checked_in_place(simulated_link, monkeypatch, crc_offset, crc_valid):
+    com, _ = simulated_link()
+    data = ResponseSchemas.probe_reading.rx_struct.pack(21.5)
+    frame = bytearray(data + bytes([reference_crc8(data) ^ crc_offset]))
+    read_sizes = []
+
+    def read_view(n):
+        # data and crc come from a single view of the interface buffer
+        read_sizes.append(n)
+        return memoryview(frame)[:n]
+
+    monkeypatch.setattr(com, "read_view", read_view)
+    fsm = GetCmdFSM(com, GenCmd.get_probe_reading(1, append_crc8=True), ResponseSchemas.probe_reading,
+                    rx_crc8_enabled=True)
+    if crc_valid:
+        fsm.rx_data()
+        assert fsm.rx_data_list == [21.5]
+        assert fsm.rx_crc_is_valid
+    else:
+        with pytest.raises(CrcMismatch):
+            fsm.rx_data()
+    assert read_sizes == [len(frame)]
@@ -0,0 +1,65 @@
+# general libraries
+import pytest
+# custom libraries
+from tools.arduino_resources import Arduino, Settings, InvalidSettings, FailedFSM, RetryPolicy
+from tools.arduino_simulator import SimulatedBoard, UdpSimulator
+from tools.fleet import Fleet
+
+
+@pytest.fixture
+def simulators():
+    """
+    :return: list UdpSimulator - two boards served on free udp ports, stopped at the end of the test
+    """
+    simulator_list = [UdpSimulator(SimulatedBoard(), udp_port=0).start() for _ in range(2)]
+    yield simulator_list
+    for simulator in simulator_list:
+        simulator.stop()
+
+
+def fleet_boards(simulator_list):
+    """
+    :param simulator_list: list UdpSimulator - running simulators
+    :return: list dict - one board per simulator (see Settings.get_boards)
+    """
+    return [{"name": f"board_{i}", "interface_type": "Wifi", "ip_address": simulator.ip_address,
+             "udp_port": simulator.udp_port, "timeout": 0.05, "port_name": None}
+            for i, simulator in enumerate(simulator_list)]
+
+
+def test_poll_every_board(simulators):
+    fleet = Fleet(fleet_boards(simulators))
+    try:
+        Arduino.config_io_state(fleet.interfaces["board_1"], "ssr", 2, True)
+        results = fleet.poll(Arduino.get_io_state, "ssr", 2)
+        assert results == {"board_0": False, "board_1": True}
+        latency_stats = fleet.get_latency_stats()
+        assert [stats["count"] for stats in latency_stats.values()] == [1, 1]
+        assert all(stats["failure_count"] == 0 for stats in latency_stats.values())
+        assert fleet.last_sweep_time is not None
+    finally:
+        fleet.close()
+
+
+def test_failed_board_returns_its_error(simulators):
+    fleet = Fleet(fleet_boards(simulators))
+    try:
+        fleet.interfaces["board_0"].retry_policy = RetryPolicy(max_attempts=1)
+        simulators[0].stop()
+        results = fleet.poll(Arduino.get_io_state, "ssr", 1)
+        assert isinstance(results["board_0"], FailedFSM)
+        assert results["board_1"] is False
+        assert fleet.get_latency_stats()["board_0"]["failure_count"] == 1
+    finally:
+        fleet.close()
+
+
+def test_empty_fleet_is_rejected():
+    with pytest.raises(InvalidSettings):
+        Fleet([])
+
+
+def test_single_board_from_settings():
+    boards = Settings.get_boards(Settings.get_json())
+    assert [board["name"] for board in boards] == ["arduino"]
+    assert boards[0]["ip_address"] == Settings.get_full_ip_address(Settings.get_json())
@@ -0,0 +1,77 @@
+# general libraries
+import time
+import pytest
+# custom libraries
+from tools.arduino_resources import Arduino, HealthTracker, HealthState, BoardUnavailable, FailedFSM, RetryPolicy
+from tools.arduino_simulator import UdpSimulator
+
+
+def test_opens_after_consecutive_failures():
+    health_tracker = HealthTracker(failure_threshold=3, probe_interval=60)
+    for _ in range(2):
+        health_tracker.record_failure()
+    assert health_tracker.is_closed()
+    health_tracker.record_success()
+    for _ in range(3):
+        health_tracker.record_failure()
+    assert health_tracker.state == HealthState.open
+    with pytest.raises(BoardUnavailable):
+        health_tracker.check()
+
+
+def test_probe_owner_only():
+    health_tracker = HealthTracker(failure_threshold=1, probe_interval=0)
+    health_tracker.record_failure()
+    assert health_tracker.check(owner="probe")
+    assert health_tracker.state == HealthState.half_open
+    assert not health_tracker.check(owner="probe")
+    with pytest.raises(BoardUnavailable):
+        health_tracker.check(owner="other")
+    # probe ended before its outcome was recorded: failed
+    health_tracker.end_probe()
+    assert health_tracker.state == HealthState.open
+    assert health_tracker.probe_owner is None
+
+
+def test_dead_board_fails_fast_then_recovers(simulated_link):
+    com, simulator = simulated_link(health_tracker=HealthTracker(failure_threshold=2, probe_interval=0.3),
+                                    retry_policy=RetryPolicy(max_attempts=2))
+    assert Arduino.get_io_state(com, "ssr", 1) is False
+    simulator.stop()
+    for _ in range(2):
+        with pytest.raises(FailedFSM):
+            Arduino.get_io_state(com, "ssr", 1)
+    start = time.perf_counter()
+    with pytest.raises(BoardUnavailable):
+        Arduino.get_io_state(com, "ssr", 1)
+    assert time.perf_counter() - start < com.timeout
+    assert com.metrics.snapshot()["counters"]["commands_rejected"] == 1
+
+    # board back on the same port, answers the next probe
+    revived_simulator = UdpSimulator(simulator.board, udp_port=simulator.udp_port).start()
+    try:
+        time.sleep(0.3)
+        assert Arduino.get_io_state(com, "ssr", 1) is False
+        assert com.health_tracker.as_dict()["probe_count"] == 1
+        assert com.health_tracker.is_closed()
+    finally:
+        revived_simulator.stop()
+
+
+def test_default_deadline_follows_timeout():
+    retry_policy = RetryPolicy(max_attempts=10)
+    start = time.monotonic()
+    # every attempt of a board that never replies fits in the deadline
+    assert retry_policy.get_deadline(4) - start >= 40
+    assert RetryPolicy(deadline=1).get_deadline(4) - start < 2
+
+
+def test_batch_to_dead_board_fails_fast(simulated_link):
+    # the fallback of the first window opens the tracker, the second window must not be left unsent
+    com, simulator = simulated_link(health_tracker=HealthTracker(failure_threshold=8, probe_interval=60),
+                                    retry_policy=RetryPolicy(max_attempts=1))
+    simulator.stop()
+    with pytest.raises(BoardUnavailable):
+        Arduino.get_io_snapshot(com)
+    assert com.health_tracker.state == HealthState.open
+    assert com.metrics.snapshot()["counters"]["commands_rejected"] == 1
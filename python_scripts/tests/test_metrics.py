@@ -0,0 +1,70 @@
+# general libraries
+import urllib.error
+import urllib.request
+import pytest
+# custom libraries
+from tools.arduino_resources import Arduino, FsmEvent, GetState, HealthState, FailedFSM
+from tools.metrics import Histogram, CommMetrics, PrometheusExporter, MetricsServer
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram(buckets=(0.01, 0.1))
+    for value in (0.005, 0.01, 0.05, 3):
+        histogram.observe(value)
+    assert histogram.as_dict() == {"buckets": [[0.01, 2], [0.1, 3], ["+Inf", 4]], "count": 4, "sum": 3.065}
+
+
+def test_transitions_update_counters_and_retries():
+    metrics = CommMetrics()
+    metrics.record_transition("get", GetState.wait_get_ack, FsmEvent.timeout_ack_not_rx, GetState.increment_retry_get)
+    metrics.record_transition("get", GetState.wait_get_ack, FsmEvent.nak_rx, GetState.comms_failure)
+    metrics.record_transition("get", GetState.wait_get_ack, FsmEvent.ack_rx, GetState.wait_data)
+    metrics.record_command("get", b"[CG1]", 0.02, True)
+    snapshot = metrics.snapshot()
+    assert snapshot["counters"]["timeouts"] == 1
+    assert snapshot["counters"]["naks"] == 1
+    assert snapshot["counters"]["commands_ok"] == 1
+    assert snapshot["retries"] == [{"kind": "get", "state": "wait_get_ack", "count": 1}]
+    assert snapshot["latency"][0]["command"] == "CG"
+    metrics.reset()
+    assert metrics.snapshot()["counters"]["timeouts"] == 0
+
+
+def test_health_states_match_tracker():
+    assert PrometheusExporter.health_states == tuple(state.name for state in HealthState)
+
+
+@pytest.mark.parametrize("health", ["closed", "open", "half_open"])
+def test_board_series_do_not_change_with_health(health):
+    lines = PrometheusExporter.render({"b1": dict(CommMetrics().snapshot(), health=health)}).splitlines()
+    assert f'arduino_board_up{{board="b1"}} {int(health == "closed")}' in lines
+    health_lines = [line for line in lines if line.startswith("arduino_board_health_state{")]
+    assert health_lines == [f'arduino_board_health_state{{board="b1",state="{state}"}} {int(state == health)}'
+                            for state in PrometheusExporter.health_states]
+
+
+def test_server_exposes_interface_metrics(simulated_link):
+    com, _ = simulated_link()
+    Arduino.get_io_state(com, "ssr", 1)
+    metrics_server = MetricsServer({"board_1": com}, port=0).start()
+    try:
+        url = f"http://{metrics_server.host}:{metrics_server.port}"
+        body = urllib.request.urlopen(f"{url}/metrics", timeout=2).read().decode("utf-8")
+        assert 'arduino_commands_ok_total{board="board_1"} 1' in body
+        assert 'arduino_command_latency_seconds_count{board="board_1",kind="get",command="CG"} 1' in body
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(f"{url}/other", timeout=2)
+    finally:
+        metrics_server.stop()
+
+
+def test_batch_naks_are_counted(simulated_link, crc8_enabled):
+    # board expects a crc byte the commands don't carry, every pipelined reply is a NAK
+    com, _ = simulated_link(crc8=True)
+    Arduino.tx_crc8_enabled = False
+    with pytest.raises(FailedFSM):
+        Arduino.get_io_snapshot(com)
+    counters = com.metrics.snapshot()["counters"]
+    # one NAK per failed window, then one per command of the per-command fallback
+    assert counters["naks"] == counters["batch_windows_failed"] + 16
+    assert counters["timeouts"] == 0
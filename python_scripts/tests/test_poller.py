@@ -0,0 +1,61 @@
+# general libraries
+import pytest
+# custom libraries
+from tools.arduino_resources import RetryPolicy
+from tools.arduino_simulator import SimulatedBoard, UdpSimulator
+from tools.fleet import Fleet
+from tools.poller import Poller
+from tools.telemetry_store import TelemetryStore
+
+
+@pytest.fixture
+def fleet():
+    """
+    :return: tuple (Fleet, UdpSimulator) - fleet of one simulated board, everything is closed after the test
+    """
+    simulator = UdpSimulator(SimulatedBoard(), udp_port=0).start()
+    board_fleet = Fleet([{"name": "board_1", "interface_type": "Wifi", "ip_address": simulator.ip_address,
+                          "udp_port": simulator.udp_port, "timeout": 0.05, "port_name": None}])
+    yield board_fleet, simulator
+    board_fleet.close()
+    simulator.stop()
+
+
+def test_cycles_fill_history_and_telemetry(fleet, tmp_path):
+    board_fleet, _ = fleet
+    telemetry_store = TelemetryStore(str(tmp_path / "telemetry"))
+    poller = Poller(board_fleet, polling_interval=0.05, history_length=2, telemetry_store=telemetry_store)
+    try:
+        poller.run(cycles=3)
+        # waits for the last cycle
+        board_fleet.executor.shutdown(wait=True)
+        history = poller.get_history("board_1")
+        assert len(history) == 2
+        assert history[0]["timestamp"] < history[1]["timestamp"]
+        assert poller.get_latest("board_1") == history[-1]
+        assert history[-1]["ssr"] == [False, False, False, False]
+        assert history[-1]["wifi_rssi"] == -55
+        assert len(telemetry_store.load("board_1", "probe_1")) == 3
+        assert board_fleet.get_latency_stats()["board_1"]["count"] == 3
+    finally:
+        telemetry_store.close()
+
+
+def test_busy_board_skips_cycle(fleet):
+    board_fleet, _ = fleet
+    poller = Poller(board_fleet)
+    poller.busy_boards.add("board_1")
+    poller.run_cycle()
+    assert poller.skipped_cycles["board_1"] == 1
+    assert poller.get_latest("board_1") is None
+
+
+def test_failed_snapshot_is_not_stored(fleet):
+    board_fleet, simulator = fleet
+    board_fleet.interfaces["board_1"].retry_policy = RetryPolicy(max_attempts=1)
+    simulator.stop()
+    poller = Poller(board_fleet)
+    poller.poll_board("board_1")
+    assert poller.get_latest("board_1") is None
+    assert not poller.busy_boards
+    assert board_fleet.get_latency_stats()["board_1"]["failure_count"] == 1
@@ -0,0 +1,72 @@
+# general libraries
+import socket
+import pytest
+# custom libraries
+from tools.arduino_resources import Interface, InterfaceType, RxStream
+
+
+@pytest.fixture
+def peer_link():
+    """
+    :return: tuple (Interface, socket, tuple) - wifi interface, udp socket playing the board, interface address
+    """
+    peer = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    peer.bind(("127.0.0.1", 0))
+    peer.settimeout(1)
+    com = Interface(InterfaceType.Wifi, ip_address="127.0.0.1", udp_port=peer.getsockname()[1], timeout=0.1,
+                    adaptive_timeout=False)
+    # the board replies to the address commands come from
+    com.write(b"[CG1]")
+    _, address = peer.recvfrom(16)
+    yield com, peer, address
+    com.close()
+    peer.close()
+
+
+def test_read_view_refuses_more_than_unread():
+    rx_stream = RxStream()
+    with pytest.raises(ValueError):
+        rx_stream.read_view(1)
+    assert len(rx_stream) == 0
+
+
+def test_free_space_compacts_unread_bytes():
+    rx_stream = RxStream(capacity=4096)
+    rx_stream.view[:10] = bytes(range(10))
+    rx_stream.end = 10
+    rx_stream.read_view(4)
+    assert rx_stream.free_space() == 4096 - 6
+    assert bytes(rx_stream.read_view(6)) == bytes(range(4, 10))
+
+
+def test_per_byte_datagrams_are_reassembled(peer_link):
+    com, peer, address = peer_link
+    for byte_value in b"\x06\x01\x02\x03\x04":
+        peer.sendto(bytes([byte_value]), address)
+    assert com.read() == b"\x06"
+    assert com.read_exact(4) == b"\x01\x02\x03\x04"
+
+
+def test_empty_datagram_is_not_a_reply(peer_link):
+    com, peer, address = peer_link
+    peer.sendto(b"\x06", address)
+    assert com.read() == b"\x06"
+    # an empty datagram must not return the byte already read (phantom ACK)
+    peer.sendto(b"", address)
+    peer.sendto(b"\x15", address)
+    assert com.read() == b"\x15"
+    assert len(com.rx_stream) == 0
+    peer.sendto(b"", address)
+    with pytest.raises(socket.timeout):
+        com.read()
+    assert len(com.rx_stream) == 0
+
+
+def test_full_stream_is_discarded_before_receiving(peer_link):
+    com, peer, address = peer_link
+    # unread bytes leaving less than one datagram of space
+    com.rx_stream.end = len(com.rx_stream.buffer) - RxStream.max_datagram_size // 2
+    peer.sendto(b"\x06", address)
+    com.receive_datagrams()
+    assert com.read() == b"\x06"
+    assert len(com.rx_stream) == 0
@@ -0,0 +1,82 @@
+# general libraries
+import json
+import pytest
+# custom libraries
+from tools.arduino_resources import Settings, InvalidSettings, Interface, InterfaceType
+
+# settings.json as released before optional keys were added
+first_release_comm_settings = {"default_interface_type": "Wifi",
+                               "linux_port_name": "/dev/ttyACM0",
+                               "osx_port_name": "/dev/cu.usbmodem3102",
+                               "windows_port_name": "COM5",
+                               "baud_rate": 9600,
+                               "timeout": 0.2,
+                               "arduino_ip_1": "192",
+                               "arduino_ip_2": "168",
+                               "arduino_ip_3": "1",
+                               "arduino_ip_4": "148",
+                               "udp_port": 2390,
+                               "polling_enabled": False,
+                               "polling_interval": 5}
+
+
+@pytest.fixture
+def settings_file(tmp_path, monkeypatch):
+    """
+    :return: function(json_settings) -> settings loaded through Settings.get_json from a temporary file
+    """
+    json_file_path = tmp_path / "settings.json"
+    monkeypatch.setattr(Settings, "json_file_path", str(json_file_path))
+    monkeypatch.setattr(Settings, "cached_json_settings", None)
+    monkeypatch.setattr(Settings, "cached_mtime_ns", None)
+
+    def load(json_settings):
+        json_file_path.write_text(json.dumps(json_settings))
+        Settings.cached_json_settings = None
+        return Settings.get_json()
+
+    return load
+
+
+def test_first_release_settings_load_with_defaults(settings_file):
+    json_settings = settings_file({"comm_settings": dict(first_release_comm_settings)})
+    for key, value in Settings.comm_settings_defaults.items():
+        assert json_settings["comm_settings"][key] == value
+
+
+def test_optional_keys_override_defaults(settings_file):
+    comm_settings = dict(first_release_comm_settings, adaptive_timeout=True, metrics_port=9200)
+    json_settings = settings_file({"comm_settings": comm_settings})
+    assert json_settings["comm_settings"]["adaptive_timeout"] is True
+    assert json_settings["comm_settings"]["metrics_port"] == 9200
+
+
+def test_repo_settings_are_valid():
+    with open(Settings.json_file_path) as f:
+        json_settings = json.load(f)
+    Settings.validate(json_settings)
+    # adaptive timeout is opt-in, and never caps the configured timeout
+    assert json_settings["comm_settings"]["adaptive_timeout"] is False
+    assert json_settings["comm_settings"]["max_timeout"] >= json_settings["comm_settings"]["timeout"]
+
+
+@pytest.mark.parametrize("comm_settings", [
+    {key: value for key, value in first_release_comm_settings.items() if key != "udp_port"},
+    dict(first_release_comm_settings, timeout="0.2"),
+    dict(first_release_comm_settings, polling_enabled=1),
+    dict(first_release_comm_settings, default_interface_type="Bluetooth"),
+    dict(first_release_comm_settings, min_timeout=1, max_timeout=0.5),
+])
+def test_invalid_settings(comm_settings):
+    with pytest.raises(InvalidSettings):
+        Settings.validate({"comm_settings": comm_settings})
+
+
+def test_adaptive_ceiling_not_below_timeout(settings_file):
+    settings_file({"comm_settings": dict(first_release_comm_settings, max_timeout=1)})
+    com = Interface(InterfaceType.Wifi, ip_address="127.0.0.1", udp_port=9, timeout=3, adaptive_timeout=True)
+    try:
+        assert com.timeout == 3
+        assert com.get_max_timeout() == 3
+    finally:
+        com.close()
@@ -0,0 +1,133 @@
+# general libraries
+import threading
+from datetime import datetime
+import pytest
+# custom libraries
+from tools.OSDetection import OSDetection, OSType
+from tools.arduino_resources import (Arduino, Interface, InterfaceType, GetCmdFSM, SetCmdFSM, GenCmd, ResponseSchemas,
+                                     FailedFSM, UnexpectedByte)
+from tools.arduino_simulator import SimulatedBoard, LinkConditions, PtySimulator
+from tools.trace_replay import ReplayInterface
+
+
+def run_workload(com, iterations):
+    """
+    :return: list - value returned by each command, error type name if it raised
+    """
+    results = []
+    for i in range(iterations):
+        for command in (lambda: Arduino.config_io_state(com, "ssr", 1 + i % 4, i % 2 == 0),
+                        lambda: Arduino.get_io_state(com, "ssr", 1 + i % 4),
+                        lambda: Arduino.get_rtc_time(com)):
+            try:
+                results.append(command())
+            except FailedFSM as e:
+                results.append(type(e).__name__)
+    return results
+
+
+@pytest.mark.parametrize("crc8_enabled", [False, True], indirect=True)
+def test_get_and_set_fsm(simulated_link, crc8_enabled):
+    com, simulator = simulated_link(crc8=crc8_enabled)
+    set_fsm = SetCmdFSM(com, GenCmd.set_io_state("ssr", 2, True, append_crc8=crc8_enabled),
+                        GenCmd.get_io_state("ssr", 2, append_crc8=crc8_enabled), ResponseSchemas.io_state,
+                        Arduino.assert_io_state, True,
+                        rx_crc8_enabled=crc8_enabled)
+    set_fsm.start_fsm()
+    assert set_fsm.literal_state == "set_cmd_ok"
+    assert simulator.board.ssr_outputs[1] is True
+    get_fsm = GetCmdFSM(com, GenCmd.get_io_state("ssr", 2, append_crc8=crc8_enabled), ResponseSchemas.io_state,
+                        rx_crc8_enabled=crc8_enabled)
+    get_fsm.start_fsm()
+    assert get_fsm.literal_state == "get_cmd_ok"
+    assert get_fsm.rx_data_list == [True]
+    if crc8_enabled:
+        assert get_fsm.rx_crc_is_valid
+
+
+def test_api_with_loss_and_crc(simulated_link, crc8_enabled):
+    com, simulator = simulated_link(link=LinkConditions(loss=0.05, seed=2), crc8=True)
+    results = run_workload(com, 30)
+    assert "FailedFSM" not in results
+    # last iterations set ssr 3, 4, 1, 2 to on, off, on, off
+    assert simulator.board.ssr_outputs == [True, False, True, False]
+    assert Arduino.get_io_snapshot(com)["ssr"] == [True, False, True, False]
+    assert com.metrics.snapshot()["counters"]["timeouts"] > 0
+
+
+def test_late_replies_are_retried(simulated_link, crc8_enabled):
+    # replies often arrive after the timeout, they must not be parsed as the reply of the next attempt
+    com, _ = simulated_link(link=LinkConditions(loss=0.05, latency=0.001, jitter=0.02, seed=3), crc8=True,
+                            timeout=0.02)
+    results = run_workload(com, 30)
+    assert "FailedFSM" not in results
+    assert all(isinstance(dt_obj, datetime) for dt_obj in results[2::3])
+
+
+@pytest.mark.parametrize("rx_raw", [bytes([7, 234, 0, 16, 10, 20, 30]), bytes([7, 234, 10, 16, 24, 20, 30])])
+def test_out_of_range_time_is_retried_as_late_reply(rx_raw):
+    # month 0 / hour 24: bytes of another reply, not a time the rtc can hold
+    with pytest.raises(UnexpectedByte):
+        ResponseSchemas.rtc_time.unpack(rx_raw)
+    assert ResponseSchemas.rtc_time.unpack(bytes([7, 234, 10, 16, 23, 59, 59])) == [2026, 10, 16, 23, 59, 59]
+
+
+def test_nak_fails_without_retrying(simulated_link, crc8_enabled):
+    # board expects a crc byte the command doesn't carry
+    com, _ = simulated_link(crc8=True)
+    Arduino.tx_crc8_enabled = False
+    with pytest.raises(FailedFSM):
+        Arduino.get_io_state(com, "ssr", 1)
+    counters = com.metrics.snapshot()["counters"]
+    assert counters["naks"] == 1
+    assert counters["timeouts"] == 0
+    assert com.health_tracker.is_closed()
+
+
+def test_concurrent_threads_share_interface(simulated_link):
+    com, _ = simulated_link()
+    failures = []
+
+    def worker(thread_num):
+        for i in range(20):
+            try:
+                if thread_num % 2:
+                    Arduino.config_io_state(com, "opto", 1 + thread_num % 4, i % 2 == 0)
+                else:
+                    Arduino.get_io_snapshot(com)
+            except Exception as e:
+                failures.append(e)
+
+    threads = [threading.Thread(target=worker, args=(thread_num,)) for thread_num in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert failures == []
+    futures = [com.submit(Arduino.get_io_state, "opto", 2) for _ in range(10)]
+    assert [future.result() for future in futures] == [False] * 10
+
+
+@pytest.mark.parametrize("crc8_enabled", [False, True], indirect=True)
+def test_trace_replay(simulated_link, crc8_enabled, tmp_path):
+    com, _ = simulated_link(link=LinkConditions(loss=0.1, seed=5), crc8=crc8_enabled, timeout=0.03)
+    trace_path = str(tmp_path / "session.trace")
+    com.start_recording(trace_path)
+    recorded = run_workload(com, 10)
+    com.stop_recording()
+    replay_com = ReplayInterface(trace_path)
+    assert run_workload(replay_com, 10) == recorded
+    assert replay_com.is_finished()
+
+
+@pytest.mark.skipif(OSDetection.get_os_type() == OSType.windows, reason="no pseudo-terminal on windows")
+def test_serial_transport(crc8_enabled):
+    simulator = PtySimulator(SimulatedBoard(rx_crc8_enabled=True, tx_crc8_enabled=True),
+                             link=LinkConditions(loss=0.05, seed=6)).start()
+    com = Interface(InterfaceType.Serial, timeout=0.05, adaptive_timeout=False, windows_port_name=simulator.port_name,
+                    linux_port_name=simulator.port_name, osx_port_name=simulator.port_name)
+    try:
+        assert "FailedFSM" not in run_workload(com, 10)
+    finally:
+        com.close()
+        simulator.stop()
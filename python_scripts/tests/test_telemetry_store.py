@@ -0,0 +1,78 @@
+# general libraries
+import os
+import pytest
+# custom libraries
+from tools.telemetry_store import TelemetryStore
+
+
+@pytest.fixture
+def telemetry_store(tmp_path):
+    """
+    :return: TelemetryStore object - store in a temporary directory, closed after the test
+    """
+    store = TelemetryStore(str(tmp_path / "telemetry"))
+    yield store
+    store.close()
+
+
+def test_append_keeps_time_order(telemetry_store):
+    for timestamp, value in ((100.0, 1.5), (101.0, 2.5), (101.0, 3.5)):
+        assert telemetry_store.append("b1", "probe_1", timestamp, value)
+    assert not telemetry_store.append("b1", "probe_1", 99.0, 0.0)
+    telemetry_store.flush()
+    records = telemetry_store.load("b1", "probe_1")
+    assert records["timestamp"].tolist() == [100.0, 101.0, 101.0]
+    assert records["value"].tolist() == [1.5, 2.5, 3.5]
+    assert telemetry_store.get_boards() == ["b1"]
+    assert telemetry_store.get_channels("b1") == ["probe_1"]
+
+
+def test_load_range(telemetry_store):
+    for second in range(10):
+        telemetry_store.append("b1", "analog_1", 1000.0 + second, float(second))
+    telemetry_store.flush()
+    # start included, end excluded
+    assert telemetry_store.load("b1", "analog_1", start=1003, end=1006)["value"].tolist() == [3.0, 4.0, 5.0]
+    assert len(telemetry_store.load("b1", "analog_1", start=2000)) == 0
+    assert len(telemetry_store.load("b1", "unknown")) == 0
+
+
+def test_partial_record_is_truncated_on_reopen(tmp_path):
+    directory = str(tmp_path / "telemetry")
+    store = TelemetryStore(directory)
+    store.append("b1", "probe_1", 100.0, 20.0)
+    store.close()
+    file_path = store.get_file_path("b1", "probe_1")
+    # crash in the middle of a record
+    with open(file_path, "ab") as channel_file:
+        channel_file.write(TelemetryStore.record_struct.pack(101.0, 21.0)[:5])
+
+    store = TelemetryStore(directory)
+    try:
+        # the last complete record still orders the next appends
+        assert not store.append("b1", "probe_1", 99.0, 0.0)
+        assert store.append("b1", "probe_1", 102.0, 22.0)
+        store.flush()
+        assert os.path.getsize(file_path) == 2 * TelemetryStore.record_struct.size
+        assert store.load("b1", "probe_1")["value"].tolist() == [20.0, 22.0]
+    finally:
+        store.close()
+
+
+def test_downsample_buckets(telemetry_store):
+    for timestamp, value in ((0.0, 1.0), (5.0, 3.0), (10.0, 10.0), (25.0, -2.0), (29.0, 4.0)):
+        telemetry_store.append("b1", "probe_1", timestamp, value)
+    telemetry_store.flush()
+    assert telemetry_store.downsample("b1", "probe_1", 10) == [
+        {"bucket_start": 0, "min": 1.0, "max": 3.0, "mean": 2.0, "count": 2},
+        {"bucket_start": 10, "min": 10.0, "max": 10.0, "mean": 10.0, "count": 1},
+        {"bucket_start": 20, "min": -2.0, "max": 4.0, "mean": 1.0, "count": 2}]
+    assert telemetry_store.downsample("b1", "missing", 10) == []
+
+
+def test_append_snapshot(telemetry_store):
+    snapshot = {"timestamp": 50.0, "probe": [21.5, 22.5], "analog": [1.25], "ssr": [True, False], "opto": [True]}
+    telemetry_store.append_snapshot("b1", snapshot)
+    assert telemetry_store.get_channels("b1") == ["analog_1", "probe_1", "probe_2", "ssr_1", "ssr_2"]
+    assert telemetry_store.load("b1", "ssr_1")["value"].tolist() == [1.0]
+    assert telemetry_store.load("b1", "probe_2")["value"].tolist() == [22.5]
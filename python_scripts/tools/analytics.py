@@ -0,0 +1,179 @@
+# general libraries
+import logging as logger
+import numpy as np
+
+
+class Analytics:
+    """
+    Class of vectorized computations over telemetry series (see TelemetryStore), used to tune heater alarms
+
+    series are passed as two numpy arrays of equal length: timestamps (epoch sec, ascending) and values
+    """
+
+    @staticmethod
+    def load_series(telemetry_store, board, channel, start=None, end=None):
+        """
+        :param telemetry_store: TelemetryStore object - store to read from
+        :param board: str - board name
+        :param channel: str - channel name, i.e. probe_1, analog_2, ssr_1
+        :param start: float - first timestamp included (epoch sec), from first sample if None
+        :param end: float - last timestamp excluded (epoch sec), up to last sample if None
+        :return: tuple (numpy array float64, numpy array float64) - timestamps, values
+        """
+        records = telemetry_store.load(board, channel, start, end)
+        return records['timestamp'].astype(np.float64), records['value'].astype(np.float64)
+
+    @staticmethod
+    def rolling_mean(values, window):
+        """
+        :param values: numpy array - samples
+        :param window: int - # of samples averaged
+        :return: numpy array float64 - same length as values, mean of the window ending on each sample,
+                 NaN until the first window is full
+        """
+        values = np.asarray(values, dtype=np.float64)
+        result = np.full(len(values), np.nan)
+        if window < 1 or len(values) < window:
+            return result
+        cumulative_sum = np.cumsum(np.insert(values, 0, 0.0))
+        result[window - 1:] = (cumulative_sum[window:] - cumulative_sum[:-window]) / window
+        return result
+
+    @staticmethod
+    def rate_of_change(timestamps, values):
+        """
+        :param timestamps: numpy array - sample times (epoch sec)
+        :param values: numpy array - samples
+        :return: tuple (numpy array, numpy array) - timestamps of the end of each interval,
+                 rate (value units per sec) over each interval, NaN where two samples share a timestamp
+        """
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64)
+        time_deltas = np.diff(timestamps)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rates = np.where(time_deltas > 0, np.diff(values) / time_deltas, np.nan)
+        return timestamps[1:], rates
+
+    @staticmethod
+    def threshold_crossings(timestamps, values, threshold):
+        """
+        :param timestamps: numpy array - sample times (epoch sec)
+        :param values: numpy array - samples
+        :param threshold: float - crossing level, a sample equal to threshold counts as above
+        :return: dict - keys = rising, falling -> numpy array of timestamps of the first sample past threshold
+        """
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        above = np.asarray(values) >= threshold
+        transitions = np.diff(above.astype(np.int8))
+        return {"rising": timestamps[np.flatnonzero(transitions == 1) + 1],
+                "falling": timestamps[np.flatnonzero(transitions == -1) + 1]}
+
+    @staticmethod
+    def on_periods(timestamps, states):
+        """
+        :param timestamps: numpy array - sample times of an output state (epoch sec)
+        :param states: numpy array - output state samples (0/1 or bool)
+        :return: tuple (numpy array, numpy array) - start (first on sample) and end (first off sample) timestamps
+                 of every on period, a period still on at the last sample ends on the last sample
+        """
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        padded = np.concatenate(([0], np.asarray(states) > 0, [0])).astype(np.int8)
+        transitions = np.diff(padded)
+        start_indexes = np.flatnonzero(transitions == 1)
+        end_indexes = np.minimum(np.flatnonzero(transitions == -1), len(timestamps) - 1)
+        return timestamps[start_indexes], timestamps[end_indexes]
+
+    @staticmethod
+    def hold(timestamps, source_timestamps, source_values):
+        """
+        samples a step signal (i.e. ssr state) at other timestamps, each value is held until the next source sample
+
+        :param timestamps: numpy array - times to sample at (epoch sec)
+        :param source_timestamps: numpy array - source sample times (epoch sec)
+        :param source_values: numpy array - source samples
+        :return: numpy array float64 - held source value at each timestamp, NaN before the first source sample
+        """
+        source_values = np.asarray(source_values, dtype=np.float64)
+        if not len(source_values):
+            return np.full(len(timestamps), np.nan)
+        indexes = np.searchsorted(source_timestamps, timestamps, side='right') - 1
+        return np.where(indexes >= 0, source_values[np.maximum(indexes, 0)], np.nan)
+
+    @staticmethod
+    def ssr_temperature_response(ssr_timestamps, ssr_states, probe_timestamps, probe_values, max_lag=60):
+        """
+        relates ssr on / off periods to the temperature response of a probe
+
+        :param ssr_timestamps: numpy array - ssr state sample times (epoch sec)
+        :param ssr_states: numpy array - ssr state samples (0/1 or bool, see Arduino.get_io_state)
+        :param probe_timestamps: numpy array - probe sample times (epoch sec)
+        :param probe_values: numpy array - probe samples (deg C)
+        :param max_lag: int - max # of probe samples the temperature response is searched after the ssr state
+        :return: dict - correlation: pearson coefficient between ssr state and temperature rate of change,
+                        lag_sec: delay of the strongest correlation between ssr state and temperature rate,
+                        lag_correlation: pearson coefficient at lag_sec,
+                        mean_rate_on / mean_rate_off: mean temperature rate of change while ssr on / off (deg C/sec),
+                        on_period_count, mean_rise_per_period: mean temperature change over an on period (deg C)
+        :caveats: the lag search assumes probe samples are evenly spaced (i.e. poller readings)
+        """
+        rate_timestamps, rates = Analytics.rate_of_change(probe_timestamps, probe_values)
+        # state in effect at the start of each interval drives the rate measured over it
+        states = Analytics.hold(np.asarray(probe_timestamps, dtype=np.float64)[:-1], ssr_timestamps, ssr_states)
+        valid = ~(np.isnan(rates) | np.isnan(states))
+        rates, states = rates[valid], states[valid]
+        result = {"correlation": Analytics.pearson(states, rates),
+                  "lag_sec": None,
+                  "lag_correlation": None,
+                  "mean_rate_on": float(rates[states > 0].mean()) if np.any(states > 0) else None,
+                  "mean_rate_off": float(rates[states <= 0].mean()) if np.any(states <= 0) else None}
+
+        lag_correlations = np.array([Analytics.pearson(states[:len(states) - lag], rates[lag:])
+                                     for lag in range(min(max_lag, len(states) - 2) + 1)])
+        if len(lag_correlations) and not np.all(np.isnan(lag_correlations)):
+            best_lag = int(np.nanargmax(np.abs(lag_correlations)))
+            sample_period = float(np.median(np.diff(probe_timestamps)))
+            result["lag_sec"] = best_lag * sample_period
+            result["lag_correlation"] = float(lag_correlations[best_lag])
+
+        period_starts, period_ends = Analytics.on_periods(ssr_timestamps, ssr_states)
+        result["on_period_count"] = len(period_starts)
+        if len(period_starts) and len(probe_timestamps):
+            rises = (np.interp(period_ends, probe_timestamps, probe_values) -
+                     np.interp(period_starts, probe_timestamps, probe_values))
+            result["mean_rise_per_period"] = float(rises.mean())
+        else:
+            result["mean_rise_per_period"] = None
+        logger.debug("ssr / temperature response: %s", result)
+        return result
+
+    @staticmethod
+    def pearson(x, y):
+        """
+        :param x: numpy array - first series
+        :param y: numpy array - second series, same length as x
+        :return: float - pearson correlation coefficient, NaN if a series is constant or has < 2 samples
+        """
+        if len(x) < 2:
+            return np.nan
+        x = x - x.mean()
+        y = y - y.mean()
+        denominator = np.sqrt(np.dot(x, x) * np.dot(y, y))
+        return float(np.dot(x, y) / denominator) if denominator else np.nan
+
+    @staticmethod
+    def ssr_temperature_report(telemetry_store, board, ssr_num, probe_num, start=None, end=None, max_lag=60):
+        """
+        :param telemetry_store: TelemetryStore object - store to read from
+        :param board: str - board name
+        :param ssr_num: int - ssr #
+        :param probe_num: int - temperature probe #
+        :param start: float - first timestamp included (epoch sec), from first sample if None
+        :param end: float - last timestamp excluded (epoch sec), up to last sample if None
+        :param max_lag: int - see ssr_temperature_response
+        :return: dict - see ssr_temperature_response
+        """
+        ssr_timestamps, ssr_states = Analytics.load_series(telemetry_store, board, f"ssr_{ssr_num}", start, end)
+        probe_timestamps, probe_values = Analytics.load_series(telemetry_store, board, f"probe_{probe_num}",
+                                                               start, end)
+        return Analytics.ssr_temperature_response(ssr_timestamps, ssr_states, probe_timestamps, probe_values,
+                                                  max_lag=max_lag)
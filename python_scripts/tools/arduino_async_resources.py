@@ -0,0 +1,946 @@
+# general libraries
+import asyncio
+import logging as logger
+import socket
+import time
+from datetime import datetime
+from serial import Serial
+# custom libraries
+from tools.OSDetection import OSDetection, OSType
+from tools.arduino_resources import (Settings, InterfaceType, Arduino, GenCmd, RX, ResponseSchemas, InterpretOutput,
+                                     RetryPolicy, HealthTracker, RttEstimator, RawTrace, CmdFSM, GetCmdFSM, SetCmdFSM,
+                                     GetState, SetState, FsmEvent, Error, FailedFSM, BoardUnavailable, NakReceived,
+                                     UnexpectedByte, CrcMismatch)
+from tools.metrics import CommMetrics
+
+
+class UdpReplyProtocol(asyncio.DatagramProtocol):
+    """
+    asyncio datagram protocol feeding every reply datagram from the arduino into an AsyncInterface
+    """
+
+    def __init__(self, com):
+        """
+        :param com: AsyncInterface object - interface receiving the datagrams
+        """
+        self.com = com
+
+    def datagram_received(self, data, addr):
+        self.com.feed(data)
+
+    def error_received(self, exc):
+        logger.warning(f"udp endpoint error: {exc}")
+
+
+class AsyncInterface:
+    """
+    Class to help abstract which interface (serial com or wifi udp) is being used, non-blocking asyncio version
+
+    replies are decoded with the ResponseSchema / CRC8 / RX.validate_ack of the sync client, metrics, late byte
+    discarding, adaptive timeout and health tracking behave as on Interface
+    :caveats: no trace recording / replay (TraceRecorder, ReplayInterface) and no pipelined CommandBatch,
+              commands are serialized by an asyncio.Lock instead of a worker thread (no submit())
+    """
+    detected_os = OSDetection.get_os_type()
+    serial_poll_interval = 0.005
+
+    def __init__(self, interface_type=None, ip_address=None, udp_port=None, baudrate=None, timeout=4,
+                 windows_port_name=None, linux_port_name=None, osx_port_name=None, retry_policy=None,
+                 health_tracker=None, adaptive_timeout=None):
+        """
+        :param interface_type: InterfaceType (Enum) - interface used to communicate with arduino
+        :param ip_address: str - arduino ip address
+        :param udp_port: int - port for udp socket
+        :param baudrate: int - serial comm baud rate
+        :param timeout: int - timeout used on interface (sec)
+        :param windows_port_name: str - name of windows serial port
+        :param osx_port_name: str - name of osx serial port
+        :param linux_port_name: str - name of linux serial port
+        :param retry_policy: RetryPolicy object - retries of commands sent on this interface, default if None
+        :param health_tracker: HealthTracker object - tracks if the board is reachable, default if None
+        :param adaptive_timeout: bool - if True, timeout follows the ACK latency of the board (see RttEstimator),
+                                 from settings (adaptive_timeout) if None
+        :caveats: interface is opened with: await com.open()
+        """
+        self.json_setings = Settings.get_json()
+        comm_settings = self.json_setings["comm_settings"]
+        if interface_type:
+            self.interface_type = interface_type
+        else:
+            self.interface_type = InterfaceType[comm_settings["default_interface_type"]]
+        self.arduino_ip = ip_address if ip_address else Settings.get_full_ip_address(self.json_setings)
+        self.udp_port = udp_port if udp_port else comm_settings["udp_port"]
+        self.baudrate = baudrate if baudrate else comm_settings["baud_rate"]
+        self.timeout = timeout if timeout else comm_settings["timeout"]
+        if AsyncInterface.detected_os == OSType.windows:
+            self.port_name = windows_port_name if windows_port_name else comm_settings["windows_port_name"]
+        elif AsyncInterface.detected_os == OSType.linux:
+            self.port_name = linux_port_name if linux_port_name else comm_settings["linux_port_name"]
+        elif AsyncInterface.detected_os == OSType.osx:
+            self.port_name = osx_port_name if osx_port_name else comm_settings["osx_port_name"]
+        else:
+            raise RuntimeError(f"OS unrecognized")
+        self.retry_policy = retry_policy if retry_policy else RetryPolicy()
+        self.health_tracker = health_tracker if health_tracker else HealthTracker()
+        if adaptive_timeout is None:
+            adaptive_timeout = comm_settings["adaptive_timeout"]
+        self.rtt_estimator = None
+        if adaptive_timeout:
+            # the ceiling never cuts the configured timeout, same as Interface
+            self.rtt_estimator = RttEstimator(self.timeout, min_timeout=comm_settings["min_timeout"],
+                                              max_timeout=max(self.timeout, comm_settings["max_timeout"]))
+            self.timeout = self.rtt_estimator.timeout
+        self.metrics = CommMetrics()
+        self.attempt_id = 0
+        self.loop = None
+        self.interface = None
+        self.serial_poll_task = None
+        self.rx_buffer = bytearray()
+        self.rx_event = None
+        self.lock = None
+
+    async def open(self):
+        """
+        opens the interface on the running event loop
+        :return: AsyncInterface object - self
+        """
+        self.loop = asyncio.get_running_loop()
+        self.rx_event = asyncio.Event()
+        self.lock = asyncio.Lock()
+        if self.interface_type == InterfaceType.Wifi:
+            self.interface, _ = await self.loop.create_datagram_endpoint(lambda: UdpReplyProtocol(self),
+                                                                         remote_addr=(self.arduino_ip, self.udp_port))
+        elif self.interface_type == InterfaceType.Serial:
+            # non-blocking serial port, bytes are pushed into rx buffer as they arrive
+            self.interface = Serial(port=self.port_name, baudrate=self.baudrate, timeout=0)
+            if AsyncInterface.detected_os == OSType.windows:
+                self.serial_poll_task = self.loop.create_task(self.poll_serial())
+            else:
+                self.loop.add_reader(self.interface.fileno(), self.read_serial_available)
+        else:
+            raise RuntimeError(f"Unknown Interface Type: {self.interface_type}")
+        logger.debug(f"async interface: {self.interface_type} opened")
+        return self
+
+    async def close(self):
+        """
+        closes the interface
+        :caveats: to await on the event loop the interface was opened on, before it stops
+        """
+        if self.interface_type == InterfaceType.Wifi:
+            self.interface.close()
+        elif self.interface_type == InterfaceType.Serial:
+            if self.serial_poll_task:
+                self.serial_poll_task.cancel()
+            else:
+                self.loop.remove_reader(self.interface.fileno())
+            self.interface.close()
+
+    def get_peer_name(self):
+        """
+        :return: str - ip:port (wifi) or serial port name of the uC
+        """
+        if self.interface_type == InterfaceType.Wifi:
+            return f"{self.arduino_ip}:{self.udp_port}"
+        return str(self.port_name)
+
+    def read_serial_available(self):
+        """
+        event loop reader callback, moves available serial bytes into rx buffer
+        """
+        rx_bytes = self.interface.read(self.interface.in_waiting or 1)
+        if rx_bytes:
+            self.feed(rx_bytes)
+
+    async def poll_serial(self):
+        """
+        polls serial port on platforms where it can't be registered with the event loop (windows)
+        """
+        while True:
+            if self.interface.in_waiting:
+                self.read_serial_available()
+            await asyncio.sleep(AsyncInterface.serial_poll_interval)
+
+    def feed(self, rx_bytes):
+        """
+        appends received bytes to rx buffer and wakes up pending readers
+        :param rx_bytes: bytes object - received bytes
+        """
+        self.rx_buffer += rx_bytes
+        self.metrics.bytes_rx += len(rx_bytes)
+        if RawTrace.enabled:
+            RawTrace.record("rx", self.get_peer_name(), rx_bytes)
+        self.rx_event.set()
+
+    def write(self, byte_cmd):
+        """
+        write a byte via interface (serial or wifi udp)
+        :param byte_cmd: bytes object - raw string of bytes to send to uC
+        """
+        if self.interface_type == InterfaceType.Wifi:
+            self.interface.sendto(byte_cmd)
+        else:
+            self.interface.write(byte_cmd)
+        self.metrics.bytes_tx += len(byte_cmd)
+        if RawTrace.enabled:
+            RawTrace.record("tx", self.get_peer_name(), byte_cmd)
+
+    async def read_exact(self, n):
+        """
+        read exactly n bytes from interface (serial or wifi udp)
+        :param n: int - number of bytes to read
+        :return: bytes object - n raw bytes
+        :caveats: raises socket.timeout if n bytes are not received before timeout, partial bytes are discarded
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+        while len(self.rx_buffer) < n:
+            self.rx_event.clear()
+            remaining = deadline - loop.time()
+            try:
+                if remaining <= 0:
+                    raise asyncio.TimeoutError
+                await asyncio.wait_for(self.rx_event.wait(), remaining)
+            except asyncio.TimeoutError:
+                self.rx_buffer.clear()
+                raise socket.timeout(f"expected {n} bytes")
+        rx_bytes = bytes(self.rx_buffer[:n])
+        del self.rx_buffer[:n]
+        return rx_bytes
+
+    def flush_input(self):
+        """
+        discards bytes already received but not read yet
+        :return: int - number of discarded bytes
+        """
+        discarded = len(self.rx_buffer)
+        self.rx_buffer.clear()
+        return discarded
+
+    def begin_attempt(self):
+        """
+        starts a new command attempt, bytes still pending answer earlier attempts: they are discarded and counted,
+        see Interface.begin_attempt
+        :return: int - attempt id, increases with every attempt on this interface
+        """
+        late_bytes = self.flush_input()
+        if late_bytes:
+            self.metrics.record_late_bytes(late_bytes)
+            logger.debug("discarded %s late byte(s) before attempt #%s", late_bytes, self.attempt_id + 1)
+        self.attempt_id += 1
+        return self.attempt_id
+
+    def get_max_timeout(self):
+        """
+        :return: float - longest time one attempt may wait for a reply (sec), see Interface.get_max_timeout
+        """
+        if self.rtt_estimator is not None:
+            return self.rtt_estimator.max_timeout
+        return self.timeout
+
+    def record_rtt(self, rtt):
+        """
+        feeds the adaptive timeout (if enabled) with the ACK latency of an attempt that wasn't retransmitted
+        :param rtt: float - time between a command write and its ACK (sec)
+        """
+        if self.rtt_estimator is not None:
+            self.timeout = self.rtt_estimator.add_sample(rtt)
+
+    def record_ack_timeout(self):
+        """
+        backs off the adaptive timeout (if enabled) after an ACK timeout
+        """
+        if self.rtt_estimator is not None:
+            self.timeout = self.rtt_estimator.backoff()
+
+
+class AsyncCmd:
+    """
+    Class of static coroutines running get/set command transactions on an AsyncInterface
+    (same sequence as GetCmdFSM and SetCmdFSM, retries follow com.retry_policy)
+
+    each failed attempt is reported to CommMetrics as the transition the sync FSM would take, the metrics of both
+    clients read the same
+    """
+    # (FSM class, state waiting the ACK, state waiting the data) of the get commands sent by a transaction
+    get_states = (GetCmdFSM, GetState.wait_get_ack, GetState.wait_data)
+    set_get_states = (SetCmdFSM, SetState.wait_get_ack, SetState.wait_data)
+    set_verify_states = (SetCmdFSM, SetState.wait_verify_get_ack, SetState.wait_verify_data)
+
+    @staticmethod
+    async def rx_data(com, rx_schema, rx_crc8_enabled=False):
+        """
+        rx data (+ crc) of a command, once ACK was received
+
+        :param com: AsyncInterface object - communication interface
+        :param rx_schema: ResponseSchema object - describes data returned by uC
+        :param rx_crc8_enabled : bool - if true, expects to receive crc byte after data
+        :return: list - decoded data
+        :caveats: raise error on timeout, unexpected byte or crc mismatch
+        """
+        rx_frame = await com.read_exact(rx_schema.get_frame_length(rx_crc8_enabled))
+        return rx_schema.unpack_frame(rx_frame, rx_crc8_enabled)[0]
+
+    @staticmethod
+    async def rx_ack(com):
+        """
+        rx and validates ACK from a command sent to arduino uC
+
+        :param com: AsyncInterface object - communication interface
+        :caveats: raise error if NAK or anything else is received (could timeout)
+        """
+        RX.validate_ack(await com.read_exact(1))
+
+    @staticmethod
+    def record_event(com, fsm_class, state, event):
+        """
+        reports an event of a transaction to CommMetrics as a transition of fsm_class
+
+        :param com: AsyncInterface object - communication interface
+        :param fsm_class: class - GetCmdFSM or SetCmdFSM
+        :param state: Enum - state of fsm_class the transaction is in
+        :param event: FsmEvent (Enum) - event that occurred
+        """
+        com.metrics.record_transition(fsm_class.metrics_kind, state, event, fsm_class.transition_table[(state, event)])
+        if event in CmdFSM.ack_timeout_events:
+            com.record_ack_timeout()
+
+    @staticmethod
+    def get_failure_event(error, waiting_ack):
+        """
+        :param error: Exception - error raised while receiving the reply of an attempt
+        :param waiting_ack: bool - True if the ACK wasn't received yet
+        :return: FsmEvent (Enum) - event the sync FSMs report for this error
+        """
+        if isinstance(error, CrcMismatch):
+            return FsmEvent.crc_mismatch_rx
+        if isinstance(error, UnexpectedByte):
+            return FsmEvent.late_ack_rx if waiting_ack else FsmEvent.late_data_rx
+        return FsmEvent.timeout_ack_not_rx if waiting_ack else FsmEvent.timeout_data_not_rx
+
+    @staticmethod
+    async def before_command(com):
+        """
+        probes the board if a probe is due, same as HealthTracker.before_command
+
+        :param com: AsyncInterface object - communication interface
+        :caveats: raises BoardUnavailable if the board is open or doesn't reply to the probe, com.lock must not
+                  be held (the probe is a get command)
+        """
+        try:
+            if not com.health_tracker.check(owner=asyncio.current_task()):
+                return
+        except BoardUnavailable:
+            com.metrics.record_rejected()
+            raise
+        logger.info(f"board unreachable for {com.health_tracker.probe_interval} sec, probing")
+        try:
+            await AsyncArduino.get_wifi_status(com)
+        except (Error, OSError) as e:
+            com.metrics.record_rejected()
+            raise BoardUnavailable(f"board unavailable, probe failed ({type(e).__name__})") from e
+        finally:
+            com.health_tracker.end_probe()
+
+    @staticmethod
+    async def get_cmd(com, byte_cmd, rx_schema, rx_crc8_enabled=False):
+        """
+        sends get command and returns decoded reply, resends on timeout
+
+        :param com: AsyncInterface object - communication interface
+        :param byte_cmd: byte string - get command used
+        :param rx_schema: ResponseSchema object - describes data returned by uC
+        :param rx_crc8_enabled : bool - if true, expects to receive crc byte after data
+        :return: list - decoded data
+        :caveats: raises FailedFSM on NAK or once retry policy gives up, BoardUnavailable (without sending
+                  anything) while the board is known to be unreachable
+        """
+        await AsyncCmd.before_command(com)
+        async with com.lock:
+            start = time.perf_counter()
+            success = False
+            try:
+                rx_data_list = await AsyncCmd.get_with_retry(com, byte_cmd, rx_schema, rx_crc8_enabled,
+                                                             com.retry_policy.get_deadline(com.get_max_timeout()),
+                                                             AsyncCmd.get_states)
+                success = True
+                return rx_data_list
+            finally:
+                com.metrics.record_command(GetCmdFSM.metrics_kind, byte_cmd, time.perf_counter() - start, success)
+
+    @staticmethod
+    async def get_with_retry(com, byte_cmd, rx_schema, rx_crc8_enabled, deadline, states, rtt_sample_valid=True):
+        """
+        sends get command until a valid reply is received or retry policy gives up, com.lock must be held
+
+        :param com: AsyncInterface object - communication interface
+        :param byte_cmd: byte string - get command used
+        :param rx_schema: ResponseSchema object - describes data returned by uC
+        :param rx_crc8_enabled : bool - if true, expects to receive crc byte after data
+        :param deadline: float - deadline of the command (see RetryPolicy.get_deadline)
+        :param states: tuple - (FSM class, ACK state, data state) the attempts are reported under (i.e. get_states)
+        :param rtt_sample_valid: bool - False if an earlier attempt of the transaction failed (Karn, see RttEstimator)
+        :return: list - decoded data
+        :caveats: raises FailedFSM on NAK or once retry policy gives up
+        """
+        fsm_class, ack_state, data_state = states
+        retry_policy = com.retry_policy
+        failed_attempts = 0
+        while True:
+            # late bytes of earlier attempts are discarded and counted
+            attempt_id = com.begin_attempt()
+            logger.debug("tx: %s (attempt #%s)", byte_cmd, attempt_id)
+            com.write(byte_cmd)
+            sent_at = time.perf_counter()
+            state = ack_state
+            try:
+                await AsyncCmd.rx_ack(com)
+                if rtt_sample_valid:
+                    com.record_rtt(time.perf_counter() - sent_at)
+                state = data_state
+                rx_data_list = await AsyncCmd.rx_data(com, rx_schema, rx_crc8_enabled)
+                com.health_tracker.record_success()
+                return rx_data_list
+            except (socket.timeout, CrcMismatch, UnexpectedByte) as e:
+                # unexpected byte: late reply of an earlier attempt
+                AsyncCmd.record_event(com, fsm_class, state, AsyncCmd.get_failure_event(e, state == ack_state))
+                rtt_sample_valid = False
+                failed_attempts += 1
+                # a probe of an unreachable board gets a single attempt
+                if not com.health_tracker.is_closed() or not retry_policy.allows_retry(failed_attempts, deadline):
+                    com.health_tracker.record_failure()
+                    raise FailedFSM(f"State: comms_failure cmd: {byte_cmd} (retry limit)")
+                logger.debug(f"get cmd: {byte_cmd} retry ({type(e).__name__})")
+                await asyncio.sleep(retry_policy.get_delay(failed_attempts))
+            except NakReceived as e:
+                AsyncCmd.record_event(com, fsm_class, state, FsmEvent.nak_rx)
+                com.health_tracker.record_success()
+                raise FailedFSM(f"State: comms_failure cmd: {byte_cmd} ({type(e).__name__})")
+
+    @staticmethod
+    async def set_cmd(com, set_byte_cmd, get_byte_cmd, rx_schema, assertion_function, expected_data,
+                      rx_crc8_enabled=False):
+        """
+        sends set command, then verifies it with a get command, resends set command if verification fails
+
+        :param com: AsyncInterface object - communication interface
+        :param set_byte_cmd: byte string - set command used
+        :param get_byte_cmd: byte string - get command used
+        :param rx_schema: ResponseSchema object - describes data returned by uC on get command
+        :param assertion_function: function - used with expected_data to assert configured resource on uC
+        :param expected_data: variable data type - expected value of resource configured on uC
+        :param rx_crc8_enabled : bool - if true, expects to receive crc byte after data
+        :return: list - decoded data of verify get command
+        :caveats: a lost (or late) set ACK isn't fatal, the verify get command decides. Raises FailedFSM on NAK
+                  or once retry policy gives up, BoardUnavailable (without sending anything) while the board is known
+                  to be unreachable
+        """
+        await AsyncCmd.before_command(com)
+        async with com.lock:
+            start = time.perf_counter()
+            success = False
+            try:
+                rx_data_list = await AsyncCmd.set_with_retry(com, set_byte_cmd, get_byte_cmd, rx_schema,
+                                                             assertion_function, expected_data, rx_crc8_enabled)
+                success = True
+                return rx_data_list
+            finally:
+                com.metrics.record_command(SetCmdFSM.metrics_kind, set_byte_cmd, time.perf_counter() - start,
+                                           success)
+
+    @staticmethod
+    async def set_with_retry(com, set_byte_cmd, get_byte_cmd, rx_schema, assertion_function, expected_data,
+                             rx_crc8_enabled):
+        """
+        sends set command and its verify get command until verified or retry policy gives up, com.lock must be held
+        (see set_cmd for parameters)
+        :return: list - decoded data of verify get command
+        """
+        retry_policy = com.retry_policy
+        deadline = retry_policy.get_deadline(com.get_max_timeout())
+        assert_failures = 0
+        rtt_sample_valid = True
+        while True:
+            attempt_id = com.begin_attempt()
+            logger.debug("tx: %s (attempt #%s)", set_byte_cmd, attempt_id)
+            com.write(set_byte_cmd)
+            sent_at = time.perf_counter()
+            get_states = AsyncCmd.set_get_states
+            try:
+                await AsyncCmd.rx_ack(com)
+                if rtt_sample_valid:
+                    com.record_rtt(time.perf_counter() - sent_at)
+            except (socket.timeout, UnexpectedByte) as e:
+                logger.debug(f"set ack not received ({type(e).__name__})")
+                AsyncCmd.record_event(com, SetCmdFSM, SetState.wait_set_ack,
+                                      FsmEvent.late_ack_rx_tx_verify_get_cmd if isinstance(e, UnexpectedByte)
+                                      else FsmEvent.ack_not_rx_tx_verify_get_cmd)
+                rtt_sample_valid = False
+                get_states = AsyncCmd.set_verify_states
+            except NakReceived as e:
+                AsyncCmd.record_event(com, SetCmdFSM, SetState.wait_set_ack, FsmEvent.nak_rx)
+                com.health_tracker.record_success()
+                raise FailedFSM(f"State: comms_failure cmd: {set_byte_cmd} ({type(e).__name__})")
+            rx_data_list = await AsyncCmd.get_with_retry(com, get_byte_cmd, rx_schema, rx_crc8_enabled, deadline,
+                                                         get_states, rtt_sample_valid)
+            if assertion_function(expected_data, rx_data_list):
+                return rx_data_list
+            rtt_sample_valid = False
+            assert_failures += 1
+            if not retry_policy.allows_retry(assert_failures, deadline):
+                raise FailedFSM(f"State: comms_failure cmd: {set_byte_cmd} (assert retry limit)")
+            await asyncio.sleep(retry_policy.get_delay(assert_failures))
+
+class AsyncArduino:
+    """
+    Class of static coroutines to interact with arduino uC, mirrors Arduino static methods
+    :caveats: crc settings are shared with Arduino (Arduino.tx_crc8_enabled / Arduino.rx_crc8_enabled)
+    """
+
+    @staticmethod
+    async def get(com, byte_cmd, rx_schema):
+        """
+        :param com: AsyncInterface object - communication interface
+        :param byte_cmd: byte string - get command used
+        :param rx_schema: ResponseSchema object - describes data returned by uC
+        :return: list - decoded data
+        """
+        return await AsyncCmd.get_cmd(com, byte_cmd, rx_schema, rx_crc8_enabled=Arduino.rx_crc8_enabled)
+
+    @staticmethod
+    async def set(com, set_byte_cmd, get_byte_cmd, rx_schema, assertion_function, expected_data):
+        """
+        :param com: AsyncInterface object - communication interface
+        :param set_byte_cmd: byte string - set command used
+        :param get_byte_cmd: byte string - get command used
+        :param rx_schema: ResponseSchema object - describes data returned by uC on get command
+        :param assertion_function: function - used with expected_data to assert configured resource on uC
+        :param expected_data: variable data type - expected value of resource configured on uC
+        :return: list - decoded data of verify get command
+        """
+        return await AsyncCmd.set_cmd(com, set_byte_cmd, get_byte_cmd, rx_schema, assertion_function, expected_data,
+                                      rx_crc8_enabled=Arduino.rx_crc8_enabled)
+
+    @staticmethod
+    async def config_io_state(com, output_type="ssr", output_num=1, output_state=True):
+        """
+        configures GPIO on arduino uC and verifies that it was correctly set, see Arduino.config_io_state
+        """
+        rx_data_list = await AsyncArduino.set(com,
+                                              GenCmd.set_io_state(output_type, output_num, output_state,
+                                                                  append_crc8=Arduino.tx_crc8_enabled),
+                                              GenCmd.get_io_state(output_type, output_num,
+                                                                  append_crc8=Arduino.tx_crc8_enabled),
+                                              ResponseSchemas.io_state,
+                                              Arduino.assert_io_state,
+                                              output_state)
+        logger.info(f"CONFIG:{output_type}|{output_num}->State: {rx_data_list[0]}")
+
+    @staticmethod
+    async def get_io_state(com, output_type="ssr", io_num=1):
+        """
+        reads GPIO on arduino uC, see Arduino.get_io_state
+        """
+        rx_data_list = await AsyncArduino.get(com,
+                                              GenCmd.get_io_state(output_type, io_num,
+                                                                  append_crc8=Arduino.tx_crc8_enabled),
+                                              ResponseSchemas.io_state)
+        logger.info(f"GET:{output_type}|{io_num}->State: {rx_data_list[0]}")
+        return rx_data_list[0]
+
+    @staticmethod
+    async def get_io_snapshot(com):
+        """
+        reads all outputs, push buttons, analog inputs and temperature probes on arduino uC,
+        see Arduino.get_io_snapshot
+        """
+        snapshot = {"ssr": [await AsyncArduino.get_io_state(com, "ssr", io_num) for io_num in range(1, 5)],
+                    "opto": [await AsyncArduino.get_io_state(com, "opto", io_num) for io_num in range(1, 5)],
+                    "push_button": [await AsyncArduino.get_io_state(com, "push_button", io_num)
+                                    for io_num in range(1, 3)],
+                    "analog": [await AsyncArduino.get_analog_reading(com, io_num) for io_num in range(1, 3)],
+                    "probe": [await AsyncArduino.get_probe_reading(com, io_num) for io_num in range(1, 5)]}
+        logger.info(f"GET: IO snapshot: {snapshot}")
+        return snapshot
+
+    @staticmethod
+    async def get_input_pulse_count(com, input_num=1):
+        """
+        reads push button pulse count associated to input_num, see Arduino.get_input_pulse_count
+        """
+        rx_data_list = await AsyncArduino.get(com,
+                                              GenCmd.get_input_pulse_count(input_num,
+                                                                           append_crc8=Arduino.tx_crc8_enabled),
+                                              ResponseSchemas.count)
+        logger.info(f"GET: INPUT PULSE COUNT: {rx_data_list[0]}")
+        return rx_data_list[0]
+
+    @staticmethod
+    async def config_rtc_time(com, dt_obj=None):
+        """
+        configures rtc time on arduino uC and verifies that time was set correctly, see Arduino.config_rtc_time
+        """
+        if dt_obj is None:
+            dt_obj = datetime.now()
+        rx_data_list = await AsyncArduino.set(com,
+                                              GenCmd.set_date_time(dt_obj=dt_obj, append_crc8=Arduino.tx_crc8_enabled),
+                                              GenCmd.get_rtc_time(append_crc8=Arduino.tx_crc8_enabled),
+                                              ResponseSchemas.rtc_time,
+                                              Arduino.assert_rtc_time,
+                                              dt_obj)
+        set_dt_obj = RX.parse_time(rx_data_list)
+        logger.info(f"SET RTC Time: {set_dt_obj} expected: {dt_obj}")
+
+    @staticmethod
+    async def get_rtc_time(com):
+        """
+        get rtc time on arduino uC, see Arduino.get_rtc_time
+        """
+        rx_data_list = await AsyncArduino.get(com,
+                                              GenCmd.get_rtc_time(append_crc8=Arduino.tx_crc8_enabled),
+                                              ResponseSchemas.rtc_time)
+        dt_obj = RX.parse_time(rx_data_list)
+        logger.info(f"GET RTC Time: {dt_obj}")
+        return dt_obj
+
+    @staticmethod
+    async def get_system_time(com):
+        """
+        get system time on arduino uC, see Arduino.get_system_time
+        """
+        rx_data_list = await AsyncArduino.get(com,
+                                              GenCmd.get_system_time(append_crc8=Arduino.tx_crc8_enabled),
+                                              ResponseSchemas.rtc_time)
+        dt_obj = RX.parse_time(rx_data_list)
+        logger.info(f"GET SYSTEM Time: {dt_obj}")
+        return dt_obj
+
+    @staticmethod
+    async def get_rtc_config_flag(com):
+        """
+        reads rtc config flag on arduino uC, see Arduino.get_rtc_config_flag
+        """
+        rx_data_list = await AsyncArduino.get(com,
+                                              GenCmd.get_rtc_config_flag(append_crc8=Arduino.tx_crc8_enabled),
+                                              ResponseSchemas.flag)
+        logger.info(f"GET: RTC Config Flag->State: {rx_data_list[0]}")
+        return rx_data_list[0]
+
+    @staticmethod
+    async def get_rtc_parse_flag(com):
+        """
+        reads rtc parse flag on arduino uC, see Arduino.get_rtc_parse_flag
+        """
+        rx_data_list = await AsyncArduino.get(com,
+                                              GenCmd.get_rtc_parse_flag(append_crc8=Arduino.tx_crc8_enabled),
+                                              ResponseSchemas.flag)
+        logger.info(f"GET: RTC Parse Failure Flag->State: {rx_data_list[0]}")
+        return rx_data_list[0]
+
+    @staticmethod
+    async def get_system_time_flag(com):
+        """
+        reads system time set flag on arduino uC, see Arduino.get_system_time_flag
+        """
+        rx_data_list = await AsyncArduino.get(com,
+                                              GenCmd.get_system_time_flag(append_crc8=Arduino.tx_crc8_enabled),
+                                              ResponseSchemas.flag)
+        logger.info(f"GET: System Time Flag->State: {rx_data_list[0]}")
+        return rx_data_list[0]
+
+    @staticmethod
+    async def config_output_alarm(com, output_type="ssr", output_num=1, on_off=True, enable=True, dt_obj=None):
+        """
+        configures output alarm on arduino uC and verifies that it was set correctly,
+        see Arduino.config_output_alarm
+        """
+        if dt_obj is None:
+            dt_obj = datetime.now()
+        expected_alarm_dict = {"enable": enable,
+                               "hour": dt_obj.hour,
+                               "minute": dt_obj.minute,
+                               "second": dt_obj.second,
+                               "dt_obj": dt_obj}
+        rx_data_list = await AsyncArduino.set(com,
+                                              GenCmd.set_output_alarm(output_type=output_type,
+                                                                      output_num=output_num,
+                                                                      on_off=on_off,
+                                                                      enable=enable,
+                                                                      dt_obj=dt_obj,
+                                                                      append_crc8=Arduino.tx_crc8_enabled),
+                                              GenCmd.get_output_alarm(output_type=output_type,
+                                                                      output_num=output_num,
+                                                                      on_off=on_off,
+                                                                      append_crc8=Arduino.tx_crc8_enabled),
+                                              ResponseSchemas.alarm,
+                                              Arduino.assert_output_alarm,
+                                              expected_alarm_dict)
+        set_alarm_dict = RX.parse_output_alarm(rx_data_list)
+        logger.info(f"SET output Alarm:<type>{output_type}|{output_num}|Fct: {on_off}|Enable: "
+                    f"{set_alarm_dict['enable']}|Time: {set_alarm_dict['dt_obj'].time()}")
+
+    @staticmethod
+    async def get_output_alarm(com, output_type="ssr", output_num=1, on_off=True):
+        """
+        reads output alarm from arduino uC, see Arduino.get_output_alarm
+        """
+        rx_data_list = await AsyncArduino.get(com,
+                                              GenCmd.get_output_alarm(output_type=output_type,
+                                                                      output_num=output_num,
+                                                                      on_off=on_off,
+                                                                      append_crc8=Arduino.tx_crc8_enabled),
+                                              ResponseSchemas.alarm)
+        alarm_dict = RX.parse_output_alarm(rx_data_list)
+        logger.info(f"GET output Alarm:<type>{output_type}|{output_num}|Fct: {on_off}|Enable: "
+                    f"{alarm_dict['enable']}|Time: {alarm_dict['dt_obj'].time()}")
+        return alarm_dict
+
+    @staticmethod
+    async def config_output_timer(com, output_num=1, value=1, cycle_duration=True, enable=True):
+        """
+        configures output timer on arduino uC and verifies that it was set correctly,
+        see Arduino.config_output_timer
+        """
+        if cycle_duration:
+            dt_obj = GenCmd.generate_cycles_per_day(value)
+        else:
+            dt_obj = GenCmd.generate_cycle_duration(value)
+        expected_alarm_dict = {"enable": enable,
+                               "hour": dt_obj.hour,
+                               "minute": dt_obj.minute,
+                               "second": dt_obj.second,
+                               "dt_obj": dt_obj}
+        rx_data_list = await AsyncArduino.set(com,
+                                              GenCmd.set_output_timer(output_num=output_num,
+                                                                      value=value,
+                                                                      cycle_duration=cycle_duration,
+                                                                      enable=enable,
+                                                                      append_crc8=Arduino.tx_crc8_enabled),
+                                              GenCmd.get_output_alarm(output_type="ssr",
+                                                                      output_num=output_num,
+                                                                      on_off=cycle_duration,
+                                                                      append_crc8=Arduino.tx_crc8_enabled),
+                                              ResponseSchemas.alarm,
+                                              Arduino.assert_output_alarm,
+                                              expected_alarm_dict)
+        set_alarm_dict = RX.parse_output_alarm(rx_data_list)
+        logger.info(f"SET output timer:<type>ssr|{output_num}|Fct: {cycle_duration}|Enable: "
+                    f"{set_alarm_dict['enable']}|Time: {set_alarm_dict['dt_obj'].time()}")
+
+    @staticmethod
+    async def config_alarm_mode(com, output_num=1, mode=True):
+        """
+        configures io alarm mode on arduino uC and verifies that it was correctly set, see Arduino.config_alarm_mode
+        """
+        rx_data_list = await AsyncArduino.set(com,
+                                              GenCmd.set_output_alarm_mode(output_num=output_num,
+                                                                           mode=mode,
+                                                                           append_crc8=Arduino.tx_crc8_enabled),
+                                              GenCmd.get_output_alarm_mode(output_num,
+                                                                           append_crc8=Arduino.tx_crc8_enabled),
+                                              ResponseSchemas.flag,
+                                              Arduino.assert_alarm_mode,
+                                              mode)
+        logger.info(f"CONFIG:ssr|{output_num}->Mode: {rx_data_list[0]}")
+
+    @staticmethod
+    async def get_alarm_mode(com, output_num=1):
+        """
+        reads GPIO alarm mode arduino uC, see Arduino.get_alarm_mode
+        """
+        rx_data_list = await AsyncArduino.get(com,
+                                              GenCmd.get_output_alarm_mode(output_num,
+                                                                           append_crc8=Arduino.tx_crc8_enabled),
+                                              ResponseSchemas.flag)
+        logger.info(f"GET:ssr|{output_num}->Mode: {rx_data_list[0]}")
+        return rx_data_list[0]
+
+    @staticmethod
+    async def config_master_alarm_enable(com, master_alarm_enable=True):
+        """
+        configures master alarm enable arduino uC and verifies that it was correctly set,
+        see Arduino.config_master_alarm_enable
+        """
+        rx_data_list = await AsyncArduino.set(com,
+                                              GenCmd.set_master_alarm_enable(master_alarm_enable,
+                                                                             append_crc8=Arduino.tx_crc8_enabled),
+                                              GenCmd.get_master_alarm_enable(append_crc8=Arduino.tx_crc8_enabled),
+                                              ResponseSchemas.flag,
+                                              Arduino.assert_master_alarm_enable_state,
+                                              master_alarm_enable)
+        logger.info(f"CONFIG Master Alarm:->State: {rx_data_list[0]}")
+
+    @staticmethod
+    async def get_master_alarm_enable(com):
+        """
+        reads master alarm enable on arduino uC, see Arduino.get_master_alarm_enable
+        """
+        rx_data_list = await AsyncArduino.get(com,
+                                              GenCmd.get_master_alarm_enable(append_crc8=Arduino.tx_crc8_enabled),
+                                              ResponseSchemas.flag)
+        logger.info(f"GET: Master Alarm->State: {rx_data_list[0]}")
+        return rx_data_list[0]
+
+    @staticmethod
+    async def clear_eeprom(com):
+        """
+        clears eeprom on arduino uC, see Arduino.clear_eeprom
+        """
+        clear_eeprom_count = await AsyncArduino.get_clear_eeprom_count(com)
+        rx_data_list = await AsyncArduino.set(com,
+                                              GenCmd.set_clear_eeprom(append_crc8=Arduino.tx_crc8_enabled),
+                                              GenCmd.get_clear_eeprom_count(append_crc8=Arduino.tx_crc8_enabled),
+                                              ResponseSchemas.count,
+                                              Arduino.assert_clear_eeprom_count,
+                                              clear_eeprom_count + 1)
+        logger.info(f"Cleared EEPROM-->Count:{rx_data_list[0]}")
+        return {"updated_clear_eeprom_count": rx_data_list[0]}
+
+    @staticmethod
+    async def get_clear_eeprom_count(com):
+        """
+        reads clear eeprom count on arduino uC, see Arduino.get_clear_eeprom_count
+        """
+        rx_data_list = await AsyncArduino.get(com,
+                                              GenCmd.get_clear_eeprom_count(append_crc8=Arduino.tx_crc8_enabled),
+                                              ResponseSchemas.count)
+        logger.info(f"GET:EEPROM CLEAR COUNT: {rx_data_list[0]}")
+        return rx_data_list[0]
+
+    @staticmethod
+    async def pulse_opto_output(com, output_num=1, n=1):
+        """
+        pulses specific opto output on arduino uC, see Arduino.pulse_opto_output
+        """
+        opto_pulse_count = await AsyncArduino.get_opto_pulse_count(com, output_num)
+        rx_data_list = await AsyncArduino.set(com,
+                                              GenCmd.pulse_opto_output(output_num, n,
+                                                                       append_crc8=Arduino.tx_crc8_enabled),
+                                              GenCmd.get_opto_pulse_count(output_num,
+                                                                          append_crc8=Arduino.tx_crc8_enabled),
+                                              ResponseSchemas.count,
+                                              Arduino.assert_opto_pulse_count,
+                                              opto_pulse_count + n)
+        logger.info(f"OPTO:{output_num}-->Pulse Count:{rx_data_list[0]}")
+        return {"updated_opto_pulse_count": rx_data_list[0]}
+
+    @staticmethod
+    async def get_opto_pulse_count(com, output_num=1):
+        """
+        reads opto pulse count associated to output_num, see Arduino.get_opto_pulse_count
+        """
+        rx_data_list = await AsyncArduino.get(com,
+                                              GenCmd.get_opto_pulse_count(output_num,
+                                                                          append_crc8=Arduino.tx_crc8_enabled),
+                                              ResponseSchemas.count)
+        logger.info(f"GET: OPTO PULSE COUNT: {rx_data_list[0]}")
+        return rx_data_list[0]
+
+    @staticmethod
+    async def config_expected_io_state(com, output_type="ssr", output_num=1):
+        """
+        configures expected io state on arduino uC depending on configured alarm,
+        see Arduino.config_expected_io_state
+        """
+        set_expected_io_count = await AsyncArduino.get_set_expected_io_count(com)
+        rx_data_list = await AsyncArduino.set(com,
+                                              GenCmd.set_expected_io_state(output_type=output_type,
+                                                                           output_num=output_num,
+                                                                           append_crc8=Arduino.tx_crc8_enabled),
+                                              GenCmd.get_set_expected_io_count(append_crc8=Arduino.tx_crc8_enabled),
+                                              ResponseSchemas.count,
+                                              Arduino.assert_set_expected_io_count,
+                                              set_expected_io_count + 1)
+        logger.info(f"CONFIG:{output_type}|{output_num}->Count: {rx_data_list[0]}")
+
+    @staticmethod
+    async def get_set_expected_io_count(com):
+        """
+        reads set expected io count on arduino uC, see Arduino.get_set_expected_io_count
+        """
+        rx_data_list = await AsyncArduino.get(com,
+                                              GenCmd.get_set_expected_io_count(append_crc8=Arduino.tx_crc8_enabled),
+                                              ResponseSchemas.count)
+        logger.info(f"GET:SET EXPECTED IO COUNT: {rx_data_list[0]}")
+        return rx_data_list[0]
+
+    @staticmethod
+    async def get_analog_reading(com, input_num=1):
+        """
+        reads analog input on arduino uC, see Arduino.get_analog_reading
+        """
+        rx_data_list = await AsyncArduino.get(com,
+                                              GenCmd.get_analog_reading(input_num=input_num,
+                                                                        append_crc8=Arduino.tx_crc8_enabled),
+                                              ResponseSchemas.analog_reading)
+        logger.info(f"GET:Analog|{input_num}->Value: {rx_data_list[0]}")
+        return rx_data_list[0]
+
+    @staticmethod
+    async def get_number_probes(com):
+        """
+        reads number of recognized temperature probes on arduino uC, see Arduino.get_number_probes
+        """
+        rx_data_list = await AsyncArduino.get(com,
+                                              GenCmd.get_number_probes(append_crc8=Arduino.tx_crc8_enabled),
+                                              ResponseSchemas.count)
+        logger.info(f"GET: # of Recognized Probes: {rx_data_list[0]}")
+        return rx_data_list[0]
+
+    @staticmethod
+    async def get_probe_recognition(com, input_num):
+        """
+        reads temperature specific probe(1-4) recognition flag on arduino uC, see Arduino.get_probe_recognition
+        """
+        rx_data_list = await AsyncArduino.get(com,
+                                              GenCmd.get_probe_recognition(input_num=input_num,
+                                                                           append_crc8=Arduino.tx_crc8_enabled),
+                                              ResponseSchemas.flag)
+        logger.info(f"GET: Probe #:{input_num} Recognition: {rx_data_list[0]}")
+        return rx_data_list[0]
+
+    @staticmethod
+    async def get_probe_reading(com, input_num):
+        """
+        reads temperature specific probe(1-4) value in celsius on arduino uC, see Arduino.get_probe_reading
+        """
+        rx_data_list = await AsyncArduino.get(com,
+                                              GenCmd.get_probe_reading(input_num=input_num,
+                                                                       append_crc8=Arduino.tx_crc8_enabled),
+                                              ResponseSchemas.probe_reading)
+        logger.info(f"GET:Probe #:{input_num} Temperature(C): {rx_data_list[0]}")
+        return rx_data_list[0]
+
+    @staticmethod
+    async def get_wifi_status(com):
+        """
+        reads wifi status on arduino uC, see Arduino.get_wifi_status
+        """
+        rx_data_list = await AsyncArduino.get(com,
+                                              GenCmd.get_wifi_status(append_crc8=Arduino.tx_crc8_enabled),
+                                              ResponseSchemas.wifi_status)
+        wifi_status_def = InterpretOutput.wifi_status_definition(rx_data_list[0])
+        logger.info(f"GET:Wifi Status: {rx_data_list[0]}:{wifi_status_def}")
+        return {"int": rx_data_list[0], "def": wifi_status_def}
+
+    @staticmethod
+    async def get_wifi_ip_address(com):
+        """
+        reads wifi ip address on arduino uC, see Arduino.get_wifi_ip_address
+        """
+        rx_data_list = await AsyncArduino.get(com,
+                                              GenCmd.get_wifi_ip_address(append_crc8=Arduino.tx_crc8_enabled),
+                                              ResponseSchemas.ip_address)
+        logger.info(f"GET:Wifi IP Address: {rx_data_list}")
+        return rx_data_list
+
+    @staticmethod
+    async def get_wifi_rssi(com):
+        """
+        reads wifi RSSI (dBm) on arduino uC, see Arduino.get_wifi_rssi
+        """
+        rx_data_list = await AsyncArduino.get(com,
+                                              GenCmd.get_wifi_rssi(append_crc8=Arduino.tx_crc8_enabled),
+                                              ResponseSchemas.wifi_rssi)
+        logger.info(f"GET:Wifi IP RSSI (dBm): {rx_data_list[0]}")
+        return rx_data_list[0]
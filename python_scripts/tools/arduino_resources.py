@@ -1,18 +1,36 @@
 # general libraries
 import logging as logger
 import json
+import os
+import threading
 import struct
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from enum import Enum
-from serial import Serial, SerialException
+from functools import lru_cache
+from serial import Serial, SerialException, SerialTimeoutException
 import socket
-from retry import retry
-from crc8 import crc8
 # custom libraries
 import serial.tools.list_ports as port_list
 from tools.OSDetection import OSDetection, OSType
+from tools.metrics import CommMetrics
 
 InterfaceType = Enum('InterfaceType', 'Serial Wifi')
+RxType = Enum('RxType', 'bool byte int float long')
+TraceEvent = Enum('TraceEvent', 'tx rx timeout flush')
+HealthState = Enum('HealthState', 'closed open half_open')
+FsmEvent = Enum('FsmEvent', 'start_comms tx_get_cmd tx_set_cmd tx_verify_get_cmd '
+                            'ack_rx ack_rx_tx_get_cmd ack_not_rx_tx_verify_get_cmd '
+                            'timeout_ack_not_rx timeout_data_not_rx data_rx assert_ok invalid_assert '
+                            'invalid_assert_tx_set_cmd nak_rx crc_mismatch_rx late_ack_rx late_data_rx '
+                            'late_ack_rx_tx_verify_get_cmd '
+                            'retry_get_ack_limit retry_get_data_limit retry_verify_get_ack_limit '
+                            'retry_verify_get_data_limit retry_verify_assert_data_limit')
+GetState = Enum('GetState', 'comms_start wait_get_ack increment_retry_get wait_data get_cmd_ok comms_failure')
+SetState = Enum('SetState', 'comms_start wait_set_ack wait_get_ack wait_verify_get_ack increment_retry_get '
+                            'increment_retry_verify_get wait_data wait_verify_data assert_data assert_verify_data '
+                            'set_cmd_ok comms_failure uc_failure')
 
 
 class Error(Exception):
@@ -45,6 +63,11 @@ class FailedFSM(Error):
     pass
 
 
+class BoardUnavailable(FailedFSM):
+    """board known to be unreachable (see HealthTracker), command failed without being sent"""
+    pass
+
+
 class NakReceived(Error):
     """NAK received instead of ACK"""
     pass
@@ -55,18 +78,133 @@ class UnexpectedByte(Error):
     pass
 
 
+class CrcMismatch(Error):
+    """received crc doesn't match crc calculated on received data"""
+    pass
+
+
+class InvalidSettings(Error):
+    """settings json file doesn't match expected schema"""
+    pass
+
+
 class Settings:
     """
     Class to get settings from json file
     """
+    # resolved relative to the package, not to the working directory
+    json_file_path = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), "settings.json")
+    comm_settings_schema = {"default_interface_type": (str,),
+                            "linux_port_name": (str,),
+                            "osx_port_name": (str,),
+                            "windows_port_name": (str,),
+                            "baud_rate": (int,),
+                            "timeout": (int, float),
+                            "arduino_ip_1": (str,),
+                            "arduino_ip_2": (str,),
+                            "arduino_ip_3": (str,),
+                            "arduino_ip_4": (str,),
+                            "udp_port": (int,),
+                            "polling_enabled": (bool,),
+                            "polling_interval": (int, float),
+                            "metrics_enabled": (bool,),
+                            "metrics_port": (int,),
+                            "adaptive_timeout": (bool,),
+                            "min_timeout": (int, float),
+                            "max_timeout": (int, float)}
+    # keys added after the first settings.json release are optional, existing files keep loading
+    comm_settings_required_keys = ("default_interface_type", "linux_port_name", "osx_port_name", "windows_port_name",
+                                   "baud_rate", "timeout", "arduino_ip_1", "arduino_ip_2", "arduino_ip_3",
+                                   "arduino_ip_4", "udp_port", "polling_enabled", "polling_interval")
+    comm_settings_defaults = {"metrics_enabled": False,
+                              "metrics_port": 9105,
+                              "adaptive_timeout": False,
+                              "min_timeout": 0.02,
+                              "max_timeout": 4}
+    board_schema = {"name": (str,),
+                    "interface_type": (str,),
+                    "ip_address": (str,),
+                    "udp_port": (int,),
+                    "timeout": (int, float),
+                    "port_name": (str,)}
+    board_required_keys = ("name",)
+    cached_json_settings = None
+    cached_mtime_ns = None
+    cache_lock = threading.Lock()
 
     @staticmethod
     def get_json():
-        """retrieve settings from json file"""
-        json_file_name = "settings.json"
-        with open(json_file_name) as f:
-            json_settings = json.load(f)
-        return json_settings
+        """
+        retrieve settings from json file
+        :return: dict - settings, shared by the whole process (don't modify)
+        :caveats: file is parsed + validated once and only re-read when its modification time changes
+        """
+        mtime_ns = os.stat(Settings.json_file_path).st_mtime_ns
+        with Settings.cache_lock:
+            if Settings.cached_json_settings is None or mtime_ns != Settings.cached_mtime_ns:
+                with open(Settings.json_file_path) as f:
+                    json_settings = json.load(f)
+                Settings.validate(json_settings)
+                Settings.apply_defaults(json_settings)
+                Settings.cached_json_settings = json_settings
+                Settings.cached_mtime_ns = mtime_ns
+                logger.debug(f"loaded settings: {Settings.json_file_path}")
+            return Settings.cached_json_settings
+
+    @staticmethod
+    def validate(json_settings):
+        """
+        validates settings against expected schema
+        :param json_settings: dict - settings
+        :caveats: raises InvalidSettings on missing key or unexpected value type
+        """
+        if not isinstance(json_settings.get('comm_settings'), dict):
+            raise InvalidSettings("missing comm_settings")
+        comm_settings = json_settings['comm_settings']
+        Settings.validate_section("comm_settings", comm_settings, Settings.comm_settings_schema,
+                                  Settings.comm_settings_required_keys)
+        if comm_settings['default_interface_type'] not in InterfaceType.__members__:
+            raise InvalidSettings(f"comm_settings: unknown default_interface_type")
+        min_timeout = comm_settings.get('min_timeout', Settings.comm_settings_defaults['min_timeout'])
+        max_timeout = comm_settings.get('max_timeout', Settings.comm_settings_defaults['max_timeout'])
+        if not 0 < min_timeout <= max_timeout:
+            raise InvalidSettings(f"comm_settings: expected 0 < min_timeout <= max_timeout")
+        boards = json_settings.get('boards', [])
+        if not isinstance(boards, list):
+            raise InvalidSettings("boards: expected a list")
+        for i, board in enumerate(boards):
+            if not isinstance(board, dict):
+                raise InvalidSettings(f"boards[{i}]: expected an object")
+            Settings.validate_section(f"boards[{i}]", board, Settings.board_schema, Settings.board_required_keys)
+            if board.get('interface_type', 'Wifi') not in InterfaceType.__members__:
+                raise InvalidSettings(f"boards[{i}]: unknown interface_type")
+
+    @staticmethod
+    def apply_defaults(json_settings):
+        """
+        adds the optional comm_settings keys missing from settings, with their default value
+        :param json_settings: dict - validated settings, modified in place
+        """
+        for key, value in Settings.comm_settings_defaults.items():
+            json_settings['comm_settings'].setdefault(key, value)
+
+    @staticmethod
+    def validate_section(section_name, section, schema, required_keys):
+        """
+        :param section_name: str - name used in error messages
+        :param section: dict - settings section to validate
+        :param schema: dict - key -> tuple of allowed types
+        :param required_keys: iterable - keys that must be present
+        """
+        for key in required_keys:
+            if key not in section:
+                raise InvalidSettings(f"{section_name}: missing key: {key}")
+        for key, value in section.items():
+            if key not in schema:
+                continue
+            # bool is a subclass of int, only accept it where bool is expected
+            if not isinstance(value, schema[key]) or (isinstance(value, bool) and bool not in schema[key]):
+                raise InvalidSettings(f"{section_name}: {key}: unexpected type: {type(value).__name__}")
 
     @staticmethod
     def write_current_settings(current_settings):
@@ -77,6 +215,28 @@ class Settings:
         with open('current_settings.json', 'w') as fp:
             json.dump(current_settings, fp)
 
+    @staticmethod
+    def get_boards(json_settings):
+        """
+        generates list of boards to communicate with
+        :param json_settings: dict - settings
+        :return: list dict - one dict per board (keys = name, interface_type, ip_address, udp_port, timeout,
+                 port_name)
+        :caveats: falls back to the single arduino_ip_1..4 board if no "boards" list is configured
+        """
+        comm_settings = json_settings['comm_settings']
+        board_list = json_settings.get('boards') or [{"name": "arduino",
+                                                      "ip_address": Settings.get_full_ip_address(json_settings)}]
+        boards = []
+        for board in board_list:
+            boards.append({"name": board['name'],
+                           "interface_type": board.get('interface_type', comm_settings['default_interface_type']),
+                           "ip_address": board.get('ip_address'),
+                           "udp_port": board.get('udp_port', comm_settings['udp_port']),
+                           "timeout": board.get('timeout', comm_settings['timeout']),
+                           "port_name": board.get('port_name')})
+        return boards
+
     @staticmethod
     def get_full_ip_address(json_settings):
         """
@@ -87,14 +247,460 @@ class Settings:
                f"{json_settings['comm_settings']['arduino_ip_3']}.{json_settings['comm_settings']['arduino_ip_4']}"
 
 
+class RetryPolicy:
+    """
+    Class to decide if and when a command is sent again: # of attempts, exponential backoff between attempts
+    and total deadline per command
+    :caveats: boards known to be unreachable are handled by the HealthTracker of the Interface
+    """
+
+    def __init__(self, max_attempts=10, base_delay=0.005, max_delay=0.2, backoff_factor=2, deadline=None):
+        """
+        :param max_attempts: int - max # of attempts per step of a command (ack, data, verify)
+        :param base_delay: float - delay before the 1st retry (sec), doubled (backoff_factor) on each retry
+        :param max_delay: float - max delay between two attempts (sec)
+        :param backoff_factor: float - multiplier applied to the delay after each failed attempt
+        :param deadline: float - max total time spent on one command (sec), if None: derived from the interface
+                         timeout so a board that never replies still gets max_attempts attempts (see get_deadline),
+                         float("inf") for no deadline
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.backoff_factor = backoff_factor
+        self.deadline = deadline
+
+    def get_deadline(self, attempt_timeout):
+        """
+        :param attempt_timeout: float - longest time one attempt waits for a reply (sec), see Interface.get_max_timeout
+        :return: float - time.monotonic() value after which a command stops retrying
+        """
+        if self.deadline is not None:
+            return time.monotonic() + self.deadline
+        backoff_time = sum(self.get_delay(failed_attempts) for failed_attempts in range(1, self.max_attempts))
+        return time.monotonic() + self.max_attempts * attempt_timeout + backoff_time
+
+    def get_delay(self, failed_attempts):
+        """
+        :param failed_attempts: int - # of attempts that already failed
+        :return: float - time to wait before next attempt (sec)
+        """
+        if failed_attempts <= 0:
+            return 0
+        return min(self.max_delay, self.base_delay * self.backoff_factor ** (failed_attempts - 1))
+
+    def allows_retry(self, failed_attempts, deadline):
+        """
+        :param failed_attempts: int - # of attempts that already failed
+        :param deadline: float - deadline of the command (see get_deadline)
+        :return: bool - True if the command should be sent again
+        """
+        if failed_attempts >= self.max_attempts:
+            return False
+        if deadline is not None and time.monotonic() + self.get_delay(failed_attempts) >= deadline:
+            return False
+        return True
+
+    def backoff(self, failed_attempts):
+        """
+        sleeps before next attempt
+        :param failed_attempts: int - # of attempts that already failed
+        """
+        delay = self.get_delay(failed_attempts)
+        if delay > 0:
+            time.sleep(delay)
+
+
+class HealthTracker:
+    """
+    Class to track if a board is reachable (circuit breaker), driven by the outcome of the commands sent to it
+
+    closed: commands are sent normally
+    open: after failure_threshold consecutive commands failed without any reply, commands fail immediately
+          (BoardUnavailable) instead of running their retries, until a probe is due
+    half_open: once probe_interval elapsed, the next command first sends a single-attempt probe (get wifi status),
+               the board is closed again if it replies, open for another probe_interval otherwise
+    :caveats: keeps the failure history of one board, use one HealthTracker per Interface
+    """
+
+    def __init__(self, failure_threshold=3, probe_interval=5.0):
+        """
+        :param failure_threshold: int - # of consecutive failed commands after which the board is open
+        :param probe_interval: float - time between two probes of an open board (sec), a fleet poller should use
+                               its polling interval or more so a dead board costs at most one probe per cycle
+        """
+        self.failure_threshold = failure_threshold
+        self.probe_interval = probe_interval
+        self.lock = threading.Lock()
+        self.state = HealthState.closed
+        self.consecutive_failures = 0
+        self.next_probe_time = None
+        # thread (or task) sending the probe, the only one allowed to send while half open
+        self.probe_owner = None
+        self.open_count = 0
+        self.probe_count = 0
+
+    def is_closed(self):
+        """
+        :return: bool - True if commands get every attempt of the RetryPolicy, False while open or probing
+        """
+        return self.state == HealthState.closed
+
+    def check(self, owner=None):
+        """
+        :param owner: hashable - identifies the caller, current thread if None (asyncio callers pass their task)
+        :return: bool - True if the caller must probe the board before its command, the tracker is then half open
+                 until record_success / record_failure
+        :caveats: raises BoardUnavailable while open and no probe is due, or while another caller probes
+        """
+        owner = threading.get_ident() if owner is None else owner
+        with self.lock:
+            if self.state == HealthState.closed:
+                return False
+            if self.state == HealthState.half_open:
+                if self.probe_owner == owner:
+                    return False
+                raise BoardUnavailable("board unavailable, probe in progress")
+            wait_time = self.next_probe_time - time.monotonic()
+            if wait_time > 0:
+                raise BoardUnavailable(f"board unavailable, next probe in {wait_time:.1f} sec")
+            self.state = HealthState.half_open
+            self.probe_owner = owner
+            self.probe_count += 1
+            return True
+
+    def before_command(self, com):
+        """
+        to call before a command is sent, probes the board if a probe is due
+        :param com: Interface object - communication interface of the board
+        :caveats: raises BoardUnavailable if the board is open or doesn't reply to the probe
+        """
+        if not self.check():
+            return
+        logger.info(f"board unreachable for {self.probe_interval} sec, probing")
+        try:
+            Arduino.get_wifi_status(com)
+        except (Error, OSError, SerialException) as e:
+            raise BoardUnavailable(f"board unavailable, probe failed ({type(e).__name__})") from e
+        finally:
+            self.end_probe()
+
+    def record_success(self):
+        """
+        to call once the board replied (even with a NAK), closes the tracker
+        """
+        with self.lock:
+            if self.state != HealthState.closed:
+                logger.info(f"board reachable again after {self.consecutive_failures} failed command(s)")
+            self.state = HealthState.closed
+            self.consecutive_failures = 0
+            self.probe_owner = None
+
+    def record_failure(self):
+        """
+        to call when a command failed without any reply from the board
+        """
+        with self.lock:
+            self.count_failure()
+
+    def end_probe(self):
+        """
+        to call once a probe ended, whatever its outcome: a probe that ended before its outcome was recorded
+        (i.e. socket error before the first attempt) counts as failed
+        """
+        with self.lock:
+            if self.state == HealthState.half_open:
+                self.count_failure()
+            self.probe_owner = None
+
+    def count_failure(self):
+        """
+        counts a failed command, opens the tracker once failure_threshold is reached or if the probe failed
+        :caveats: self.lock must be held
+        """
+        self.consecutive_failures += 1
+        if self.state == HealthState.closed and self.consecutive_failures >= self.failure_threshold:
+            self.open_count += 1
+            logger.warning(f"board unreachable after {self.consecutive_failures} failed command(s), failing fast")
+        elif self.state != HealthState.half_open:
+            return
+        self.state = HealthState.open
+        self.next_probe_time = time.monotonic() + self.probe_interval
+        self.probe_owner = None
+
+    def as_dict(self):
+        """
+        :return: dict - keys = state, consecutive_failures, open_count, probe_count
+        """
+        with self.lock:
+            return {"state": self.state.name,
+                    "consecutive_failures": self.consecutive_failures,
+                    "open_count": self.open_count,
+                    "probe_count": self.probe_count}
+
+
+class RttEstimator:
+    """
+    Class to derive the read timeout of an Interface from observed ACK latency (TCP style SRTT / RTTVAR, RFC 6298)
+    :caveats: only fed with ACKs of attempts that weren't retransmitted (Karn), a late ACK of an earlier attempt
+              would look like a very short round trip
+    """
+
+    def __init__(self, initial_timeout, min_timeout=0.02, max_timeout=4.0, alpha=0.125, beta=0.25, k=4,
+                 granularity=0.001):
+        """
+        :param initial_timeout: float - timeout used until the first round trip is measured (sec)
+        :param min_timeout: float - floor of the timeout (sec)
+        :param max_timeout: float - ceiling of the timeout (sec)
+        :param alpha: float - gain of the smoothed round trip time
+        :param beta: float - gain of the round trip time variation
+        :param k: float - # of variations added to the smoothed round trip time
+        :param granularity: float - min margin added to the smoothed round trip time (sec)
+        """
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.alpha = alpha
+        self.beta = beta
+        self.k = k
+        self.granularity = granularity
+        self.srtt = None
+        self.rttvar = None
+        self.timeout = self.clamp(initial_timeout)
+
+    def clamp(self, timeout):
+        return min(self.max_timeout, max(self.min_timeout, timeout))
+
+    def add_sample(self, rtt):
+        """
+        :param rtt: float - time between a command write and its ACK (sec)
+        :return: float - new timeout (sec)
+        """
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar = (1 - self.beta) * self.rttvar + self.beta * abs(self.srtt - rtt)
+            self.srtt = (1 - self.alpha) * self.srtt + self.alpha * rtt
+        self.timeout = self.clamp(self.srtt + max(self.granularity, self.k * self.rttvar))
+        return self.timeout
+
+    def backoff(self):
+        """
+        to call when an ACK timed out, doubles the timeout until the next sample
+        :return: float - new timeout (sec)
+        """
+        self.timeout = self.clamp(self.timeout * 2)
+        return self.timeout
+
+    def as_dict(self):
+        """
+        :return: dict - keys = srtt, rttvar, timeout (sec)
+        """
+        return {"srtt": self.srtt, "rttvar": self.rttvar, "timeout": self.timeout}
+
+
+class RawTrace:
+    """
+    Class of static methods to trace the raw bytes exchanged with the uC, off unless enable() is called
+    :caveats: records carry structured fields (direction, peer, raw_bytes, monotonic_time) for handlers / formatters,
+              when disabled the cost on the hot path is one attribute check
+    """
+    trace_logger = logger.getLogger("arduino_raw_trace")
+    trace_logger.propagate = False
+    enabled = False
+
+    @staticmethod
+    def enable(handler=None):
+        """
+        :param handler: logging Handler object - where trace records go, stderr if None
+        """
+        if handler is None:
+            handler = logger.StreamHandler()
+            handler.setFormatter(logger.Formatter("%(created).6f %(message)s"))
+        RawTrace.trace_logger.addHandler(handler)
+        RawTrace.trace_logger.setLevel(logger.DEBUG)
+        RawTrace.enabled = True
+
+    @staticmethod
+    def disable():
+        RawTrace.enabled = False
+        RawTrace.trace_logger.setLevel(logger.WARNING)
+        for handler in list(RawTrace.trace_logger.handlers):
+            RawTrace.trace_logger.removeHandler(handler)
+
+    @staticmethod
+    def record(direction, peer, raw_bytes):
+        """
+        :param direction: str - tx or rx
+        :param peer: str - ip:port or serial port name of the uC
+        :param raw_bytes: bytes object - bytes sent or received
+        """
+        raw_bytes = bytes(raw_bytes)
+        RawTrace.trace_logger.debug("%s %s %s", direction, peer, raw_bytes.hex(),
+                                    extra={"direction": direction, "peer": peer, "raw_bytes": raw_bytes,
+                                           "monotonic_time": time.monotonic()})
+
+
+class RxStream:
+    """
+    Class to reassemble received datagrams into one contiguous stream: datagrams are received in place (recv_into)
+    into a preallocated buffer and read back as memoryview slices, without intermediate bytes objects
+    """
+    max_datagram_size = 1024
+
+    def __init__(self, capacity=8192):
+        """
+        :param capacity: int - buffer size (bytes), must hold several max size datagrams
+        """
+        self.buffer = bytearray(capacity)
+        self.view = memoryview(self.buffer)
+        self.start = 0
+        self.end = 0
+
+    def __len__(self):
+        return self.end - self.start
+
+    def clear(self):
+        self.start = 0
+        self.end = 0
+
+    def free_space(self):
+        """
+        :return: int - bytes that can be received without overwriting unread bytes
+        :caveats: moves unread bytes to the front of the buffer, views returned by read_view() become invalid
+        """
+        if self.start:
+            unread = self.end - self.start
+            self.buffer[:unread] = self.view[self.start:self.end]
+            self.start = 0
+            self.end = unread
+        return len(self.buffer) - self.end
+
+    def receive(self, udp_socket, flags=0):
+        """
+        receives one datagram at the end of the stream
+        :param udp_socket: socket object - socket to receive from
+        :param flags: int - recv flags
+        :return: memoryview - datagram payload, valid until the next receive
+        :caveats: caller makes sure free_space() >= max_datagram_size, raises what recv_into raises
+        """
+        start = self.end
+        self.end += udp_socket.recv_into(self.view[start:], RxStream.max_datagram_size, flags)
+        return self.view[start:self.end]
+
+    def read_view(self, n):
+        """
+        :param n: int - # of bytes to read, at most len(self)
+        :return: memoryview - next n bytes, valid until the next receive
+        :caveats: raises ValueError if less than n bytes are unread
+        """
+        if n > self.end - self.start:
+            raise ValueError(f"expected {n} bytes, {self.end - self.start} unread")
+        start = self.start
+        self.start += n
+        if self.start == self.end:
+            self.clear()
+        return self.view[start:start + n]
+
+
+class TraceRecorder:
+    """
+    Class to record every write / read of an Interface into a compact binary trace file (see ReplayInterface)
+
+    file: header (magic, version, interface type, wall clock start time, timeout, peer name) followed by one record per
+    event: TraceEvent value (uint8), monotonic time since start of recording (float64 sec), payload length (uint16),
+    payload. Payload is the raw bytes for tx / rx, empty for timeout and the # of discarded bytes (uint32) for flush
+    """
+    magic = b'AATR'
+    version = 1
+    header_struct = struct.Struct('<4sBBddH')
+    record_struct = struct.Struct('<BdH')
+    flush_count_struct = struct.Struct('<I')
+
+    def __init__(self, file_path, interface_type, peer_name, timeout):
+        """
+        :param file_path: str - trace file to write (overwritten)
+        :param interface_type: InterfaceType (Enum) - interface recorded
+        :param peer_name: str - ip:port or serial port name of the uC
+        :param timeout: float - timeout used on interface (sec)
+        """
+        self.file_path = file_path
+        self.start_time = time.monotonic()
+        self.event_count = 0
+        peer_name = peer_name.encode("utf-8")
+        self.trace_file = open(file_path, "wb")
+        self.trace_file.write(TraceRecorder.header_struct.pack(TraceRecorder.magic, TraceRecorder.version,
+                                                               interface_type.value, time.time(), timeout,
+                                                               len(peer_name)))
+        self.trace_file.write(peer_name)
+
+    def record(self, event, payload=b''):
+        """
+        :param event: TraceEvent (Enum) - what happened on the interface
+        :param payload: bytes object - bytes sent / received
+        """
+        self.trace_file.write(TraceRecorder.record_struct.pack(event.value, time.monotonic() - self.start_time,
+                                                               len(payload)))
+        self.trace_file.write(payload)
+        self.event_count += 1
+
+    def record_flush(self, discarded):
+        """
+        :param discarded: int - # of bytes discarded by Interface.discard_pending_input()
+        """
+        self.record(TraceEvent.flush, TraceRecorder.flush_count_struct.pack(discarded))
+
+    def close(self):
+        self.trace_file.close()
+        logger.info(f"trace recorded: {self.file_path} ({self.event_count} events)")
+
+    @staticmethod
+    def load(file_path):
+        """
+        :param file_path: str - trace file written by a TraceRecorder
+        :return: tuple (dict, list) - header (keys = interface_type, start_time, timeout, peer_name),
+                 events as tuples (TraceEvent, time since start of recording (sec), payload)
+        :caveats: raises ValueError if the file isn't a trace, a record cut short (i.e. crash) ends the trace
+        """
+        with open(file_path, "rb") as trace_file:
+            data = trace_file.read()
+        header_size = TraceRecorder.header_struct.size
+        if len(data) < header_size:
+            raise ValueError(f"not a trace file: {file_path}")
+        magic, version, interface_type_value, start_time, timeout, peer_length = \
+            TraceRecorder.header_struct.unpack_from(data)
+        if magic != TraceRecorder.magic or version != TraceRecorder.version:
+            raise ValueError(f"not a trace file (or unsupported version): {file_path}")
+        header = {"interface_type": InterfaceType(interface_type_value),
+                  "start_time": start_time,
+                  "timeout": timeout,
+                  "peer_name": data[header_size:header_size + peer_length].decode("utf-8")}
+        events = []
+        offset = header_size + peer_length
+        record_size = TraceRecorder.record_struct.size
+        while offset + record_size <= len(data):
+            event_value, event_time, payload_length = TraceRecorder.record_struct.unpack_from(data, offset)
+            offset += record_size
+            if offset + payload_length > len(data):
+                break
+            events.append((TraceEvent(event_value), event_time, data[offset:offset + payload_length]))
+            offset += payload_length
+        return header, events
+
+
 class Interface:
     """
     Class to help abstract which interface (serial com or wifi udp) is being used
+
+    thread-safe: each transaction (FSM, command batch) holds the interface lock, so commands sent from several
+    threads never interleave their bytes. Hold com.lock to keep several commands back-to-back, or queue them on
+    the interface I/O worker with com.submit()
     """
     detected_os = OSDetection.get_os_type()
 
     def __init__(self, interface_type=None, ip_address=None, udp_port=None, baudrate=None, timeout=4,
-                 windows_port_name=None, linux_port_name=None, osx_port_name=None):
+                 windows_port_name=None, linux_port_name=None, osx_port_name=None, retry_policy=None,
+                 adaptive_timeout=None, health_tracker=None):
         """
         :param interface_type: InterfaceType (Enum) - interface used to communicate with arduino
         :param ip_address: str - arduino ip address
@@ -104,6 +710,11 @@ class Interface:
         :param windows_port_name: str - name of windows serial port
         :param osx_port_name: str - name of osx serial port
         :param linux_port_name: str - name of linux serial port
+        :param retry_policy: RetryPolicy object - retries of commands sent on this interface, default if None
+        :param adaptive_timeout: bool - if True, timeout follows the ACK latency of the board (see RttEstimator),
+                                 starting from timeout and bounded by min_timeout / max_timeout of settings,
+                                 from settings (adaptive_timeout) if None
+        :param health_tracker: HealthTracker object - tracks if the board is reachable, default if None
         """
         self.json_setings = Settings.get_json()
         if interface_type:
@@ -153,52 +764,394 @@ class Interface:
         logger.warning(f"interface: {self.interface_type}")
         logger.warning(f"arduino_ip: {self.arduino_ip}")
 
+        if adaptive_timeout is None:
+            adaptive_timeout = self.json_setings["comm_settings"]["adaptive_timeout"]
+        rtt_estimator = None
+        if adaptive_timeout:
+            # the ceiling never cuts the configured timeout: an unreplied attempt backs off up to it at least
+            rtt_estimator = RttEstimator(self.timeout,
+                                         min_timeout=self.json_setings["comm_settings"]["min_timeout"],
+                                         max_timeout=max(self.timeout,
+                                                         self.json_setings["comm_settings"]["max_timeout"]))
+            self.timeout = rtt_estimator.timeout
+        self.init_common_state(retry_policy, health_tracker, rtt_estimator)
+
         # open interface
         if self.interface_type == InterfaceType.Serial:
             self.interface = Serial(port=self.port_name, baudrate=self.baudrate, timeout=self.timeout)
         elif self.interface_type == InterfaceType.Wifi:
-            self.interface = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)  # UDP
-            self.interface.settimeout(self.timeout)
+            self.reset_udp_socket()
         else:
             raise RuntimeError(f"Unknown Interface Type: {self.interface_type}")
 
+    def init_common_state(self, retry_policy, health_tracker, rtt_estimator):
+        """
+        sets up everything of the interface that doesn't depend on the transport: retries, health, timeout
+        estimation, metrics, tracing, locking. No transport is open yet
+        :param retry_policy: RetryPolicy object - retries of commands sent on this interface, default if None
+        :param health_tracker: HealthTracker object - tracks if the board is reachable, default if None
+        :param rtt_estimator: RttEstimator object - adaptive timeout, timeout is fixed if None
+        :caveats: also called by interfaces replacing the transport (i.e. ReplayInterface)
+        """
+        self.retry_policy = retry_policy if retry_policy else RetryPolicy()
+        self.health_tracker = health_tracker if health_tracker else HealthTracker()
+        self.rtt_estimator = rtt_estimator
+        self.metrics = CommMetrics()
+        self.trace_recorder = None
+        self.attempt_id = 0
+        # re-entrant: a transaction may run others (command batch fallback, health probe)
+        self.lock = threading.RLock()
+        # I/O worker, started by the first submit()
+        self.executor = None
+        self.executor_lock = threading.Lock()
+        self.interface = None
+        self.udp_socket_healthy = False
+        self.rx_stream = RxStream()
+
     def close(self):
         """
         Called are the end of each communications sessions
-        :caveats: only closes serial com, wifi_socket should already be closed
+        :caveats: runs the commands already submitted, then closes serial com or the long-lived wifi udp socket,
+                  stops trace recording
+        """
+        self.shutdown_worker()
+        with self.lock:
+            self.stop_recording()
+            if self.interface_type == InterfaceType.Serial:
+                self.interface.close()
+            elif self.interface_type == InterfaceType.Wifi:
+                self.close_udp_socket()
+
+    def submit(self, function, *args, **kwargs):
+        """
+        queues function(com, *args, **kwargs) on the I/O worker of the interface, i.e.
+        com.submit(Arduino.config_io_state, "ssr", 1, True)
+
+        :param function: function - takes an Interface object as first argument
+        :return: Future object - value returned by function, or error raised by function (future.result())
+        :caveats: one worker thread per interface, queued functions run one at a time in submission order
+        """
+        with self.executor_lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"io_{self.get_peer_name()}")
+            return self.executor.submit(function, self, *args, **kwargs)
+
+    def shutdown_worker(self):
+        """
+        waits for the functions already submitted, then stops the I/O worker (started again by the next submit)
+        """
+        with self.executor_lock:
+            executor = self.executor
+            self.executor = None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def set_timeout(self, timeout):
+        """
+        :param timeout: float - timeout used on interface (sec)
         """
+        self.timeout = timeout
         if self.interface_type == InterfaceType.Serial:
-            self.interface.close()
+            self.interface.timeout = timeout
+        elif self.interface_type == InterfaceType.Wifi and self.interface is not None:
+            self.interface.settimeout(timeout)
+
+    def get_max_timeout(self):
+        """
+        :return: float - longest time one attempt may wait for a reply (sec): max_timeout if the timeout is adaptive
+                 (it backs off after each ACK timeout), timeout otherwise
+        """
+        if self.rtt_estimator is not None:
+            return self.rtt_estimator.max_timeout
+        return self.timeout
+
+    def record_rtt(self, rtt):
+        """
+        feeds the adaptive timeout (if enabled) with the ACK latency of an attempt that wasn't retransmitted
+        :param rtt: float - time between a command write and its ACK (sec)
+        """
+        if self.rtt_estimator is not None:
+            self.apply_estimated_timeout(self.rtt_estimator.add_sample(rtt))
+
+    def record_ack_timeout(self):
+        """
+        backs off the adaptive timeout (if enabled) after an ACK timeout
+        """
+        if self.rtt_estimator is not None:
+            self.apply_estimated_timeout(self.rtt_estimator.backoff())
+
+    def apply_estimated_timeout(self, timeout):
+        """
+        :param timeout: float - timeout computed by the RttEstimator (sec)
+        :caveats: only applied if it changed by more than 10%, changing a serial port timeout reconfigures the port
+        """
+        if abs(timeout - self.timeout) > 0.1 * self.timeout:
+            logger.debug("adaptive timeout: %.4f -> %.4f sec", self.timeout, timeout)
+            self.set_timeout(timeout)
+
+    def start_recording(self, file_path):
+        """
+        records every write / read from now on into a binary trace file (see TraceRecorder, ReplayInterface)
+        :param file_path: str - trace file to write (overwritten)
+        :return: TraceRecorder object
+        :caveats: waits for the running transaction, a trace only holds complete transactions
+        """
+        with self.lock:
+            self.stop_recording()
+            self.trace_recorder = TraceRecorder(file_path, self.interface_type, self.get_peer_name(), self.timeout)
+            return self.trace_recorder
+
+    def stop_recording(self):
+        with self.lock:
+            if self.trace_recorder is not None:
+                self.trace_recorder.close()
+                self.trace_recorder = None
 
     def open_udp_socket(self):
+        """
+        makes sure the long-lived udp socket is open and healthy before a transaction
+        :caveats: the socket is reused between transactions, only re-created if closed or in error
+        """
+        if not self.is_udp_socket_healthy():
+            self.reset_udp_socket()
+
+    def close_udp_socket(self):
+        if self.interface is not None:
+            self.interface.close()
+        self.udp_socket_healthy = False
+
+    def reset_udp_socket(self):
+        """
+        closes (if needed) and re-creates the udp socket used to communicate with the arduino
+        """
+        if self.interface is not None:
+            logger.debug(f"re-creating udp socket for: {self.arduino_ip}:{self.udp_port}")
+            self.close_udp_socket()
         self.interface = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)  # UDP
         self.interface.settimeout(self.timeout)
+        self.udp_socket_healthy = True
 
-    def close_udp_socket(self):
-        self.interface.close()
+    def is_udp_socket_healthy(self):
+        """
+        checks that the udp socket is still open and has no pending asynchronous error (i.e. ICMP unreachable)
+        :return: bool - True if socket can be reused
+        """
+        if self.interface is None or not self.udp_socket_healthy or self.interface.fileno() == -1:
+            return False
+        try:
+            pending_error = self.interface.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+        except OSError:
+            return False
+        return pending_error == 0
 
     def write(self, byte_cmd):
         """
         write a byte via interface (serial or wifi udp)
         :param byte_cmd: bytes object - raw string of bytes to send to uC
+        :caveats: wifi udp socket is transparently re-created once if the send fails
         """
+        if RawTrace.enabled:
+            RawTrace.record("tx", self.get_peer_name(), byte_cmd)
+        self.metrics.bytes_tx += len(byte_cmd)
         if self.interface_type == InterfaceType.Serial:
             self.interface.write(byte_cmd)
         elif self.interface_type == InterfaceType.Wifi:
-            self.interface.sendto(byte_cmd, (self.arduino_ip, self.udp_port))
+            try:
+                self.interface.sendto(byte_cmd, (self.arduino_ip, self.udp_port))
+            except OSError as e:
+                logger.warning(f"udp socket write error: {e}")
+                self.reset_udp_socket()
+                self.interface.sendto(byte_cmd, (self.arduino_ip, self.udp_port))
         else:
             raise RuntimeError(f"Unknown Interface Type: {self.interface_type}")
+        if self.trace_recorder is not None:
+            self.trace_recorder.record(TraceEvent.tx, byte_cmd)
 
     def read(self):
         """
         read a byte from interface (serial or wifi udp)
+        :caveats: wifi bytes already reassembled in rx_stream are returned first
+        """
+        if self.interface_type == InterfaceType.Serial:
+            rx_byte = self.interface.read()
+            self.metrics.bytes_rx += len(rx_byte)
+            if RawTrace.enabled and rx_byte:
+                RawTrace.record("rx", self.get_peer_name(), rx_byte)
+            if self.trace_recorder is not None:
+                # serial read returns nothing on timeout
+                self.trace_recorder.record(TraceEvent.rx if rx_byte else TraceEvent.timeout, rx_byte)
+            return rx_byte
+        elif self.interface_type == InterfaceType.Wifi:
+            # an empty datagram adds nothing to the stream, keep receiving
+            while not self.rx_stream:
+                self.receive_datagrams()
+            return bytes(self.rx_stream.read_view(1))
+        else:
+            raise RuntimeError(f"Unknown Interface Type: {self.interface_type}")
+
+    def read_exact(self, n):
+        """
+        read exactly n bytes from interface (serial or wifi udp) in as few calls as possible
+        :param n: int - number of bytes to read
+        :return: bytes object - n raw bytes
+        :caveats: raises socket.timeout (wifi) or SerialTimeoutException (serial) if n bytes are not received
+                  before timeout, partially received bytes are discarded
+        """
+        if self.interface_type == InterfaceType.Serial:
+            rx_bytes = self.interface.read(n)
+            self.metrics.bytes_rx += len(rx_bytes)
+            if RawTrace.enabled and rx_bytes:
+                RawTrace.record("rx", self.get_peer_name(), rx_bytes)
+            if self.trace_recorder is not None:
+                if rx_bytes:
+                    self.trace_recorder.record(TraceEvent.rx, rx_bytes)
+                if len(rx_bytes) < n:
+                    self.trace_recorder.record(TraceEvent.timeout)
+            if len(rx_bytes) < n:
+                raise SerialTimeoutException(f"expected {n} bytes, received: {rx_bytes}")
+            return rx_bytes
+        elif self.interface_type == InterfaceType.Wifi:
+            return bytes(self.read_view(n))
+        else:
+            raise RuntimeError(f"Unknown Interface Type: {self.interface_type}")
+
+    def read_view(self, n):
+        """
+        read exactly n bytes from interface (serial or wifi udp), zero-copy for wifi
+        :param n: int - number of bytes to read
+        :return: memoryview - n raw bytes, only valid until the next read from the interface
+        :caveats: same errors as read_exact()
+        """
+        if self.interface_type == InterfaceType.Wifi:
+            try:
+                while len(self.rx_stream) < n:
+                    self.receive_datagrams()
+            except socket.timeout:
+                self.rx_stream.clear()
+                raise
+            return self.rx_stream.read_view(n)
+        return memoryview(self.read_exact(n))
+
+    def begin_attempt(self):
+        """
+        starts a new command attempt: bytes still pending at this point answer earlier attempts (late ACK / data
+        after a timeout), they are discarded and counted instead of being parsed as the reply of the new attempt
+        :return: int - attempt id, increases with every attempt on this interface
+        """
+        late_bytes = self.discard_pending_input()
+        if late_bytes:
+            self.metrics.record_late_bytes(late_bytes)
+            logger.debug("discarded %s late byte(s) before attempt #%s", late_bytes, self.attempt_id + 1)
+        self.attempt_id += 1
+        return self.attempt_id
+
+    def flush_input(self, settle_time=0):
+        """
+        discards bytes already received but not read yet (serial or wifi udp)
+        :param settle_time: float - if > 0, keeps discarding until no byte arrived for settle_time (sec),
+                            used to get rid of replies still in flight
+        :return: int - number of discarded bytes
+        """
+        discarded = self.discard_pending_input()
+        while settle_time > 0:
+            time.sleep(settle_time)
+            discarded_late = self.discard_pending_input()
+            if not discarded_late:
+                break
+            discarded += discarded_late
+        if discarded:
+            logger.debug(f"flushed {discarded} byte(s)")
+        return discarded
+
+    def discard_pending_input(self):
+        """
+        discards bytes already received but not read yet, without waiting
+        :return: int - number of discarded bytes
         """
         if self.interface_type == InterfaceType.Serial:
-            return self.interface.read()
+            discarded = self.interface.in_waiting
+            if discarded:
+                self.interface.reset_input_buffer()
+                self.metrics.bytes_rx += discarded
         elif self.interface_type == InterfaceType.Wifi:
-            return self.interface.recv(1024)
+            discarded = len(self.rx_stream)
+            self.rx_stream.clear()
+            self.interface.setblocking(False)
+            try:
+                while True:
+                    datagram_length = self.interface.recv_into(self.rx_stream.view, RxStream.max_datagram_size)
+                    discarded += datagram_length
+                    self.metrics.bytes_rx += datagram_length
+            except BlockingIOError:
+                pass
+            except OSError as e:
+                logger.warning(f"udp socket flush error: {e}")
+                self.reset_udp_socket()
+            finally:
+                self.interface.settimeout(self.timeout)
         else:
             raise RuntimeError(f"Unknown Interface Type: {self.interface_type}")
+        if self.trace_recorder is not None:
+            self.trace_recorder.record_flush(discarded)
+        return discarded
+
+    def receive_datagrams(self):
+        """
+        waits for one datagram, then drains every datagram already pending without blocking, into rx_stream
+        :caveats: the uC sends each reply byte in its own datagram, draining turns a multi-byte reply into one
+                  blocking call instead of one per byte. If unread bytes fill the buffer, they can't be a reply
+                  (replies are a few bytes) and are discarded to make room
+        """
+        if self.rx_stream.free_space() < RxStream.max_datagram_size:
+            logger.warning(f"udp receive stream full, discarding {len(self.rx_stream)} unread byte(s)")
+            self.rx_stream.clear()
+        self.recv_datagram()
+        # a socket with a timeout polls before every recv (even with MSG_DONTWAIT), drain in non-blocking mode
+        self.interface.setblocking(False)
+        try:
+            while self.rx_stream.free_space() >= RxStream.max_datagram_size:
+                self.recv_datagram()
+        except (BlockingIOError, socket.timeout):
+            # nothing pending anymore, or socket re-created after an error: what was received is kept
+            pass
+        finally:
+            self.interface.settimeout(self.timeout)
+
+    def recv_datagram(self):
+        """
+        receive one datagram from the wifi udp socket, appended to rx_stream
+        :return: memoryview - datagram payload, valid until the next receive
+        :caveats: a udp socket error (other than timeout) re-creates the socket and is reported as a timeout
+                  so the FSM retry path handles it. Raises BlockingIOError if non-blocking and nothing is pending
+        """
+        try:
+            datagram = self.rx_stream.receive(self.interface)
+        except BlockingIOError:
+            raise
+        except socket.timeout:
+            if self.trace_recorder is not None:
+                self.trace_recorder.record(TraceEvent.timeout)
+            raise
+        except OSError as e:
+            logger.warning(f"udp socket read error: {e}")
+            self.reset_udp_socket()
+            if self.trace_recorder is not None:
+                self.trace_recorder.record(TraceEvent.timeout)
+            raise socket.timeout(f"udp socket error: {e}")
+        if self.trace_recorder is not None:
+            self.trace_recorder.record(TraceEvent.rx, datagram)
+        self.metrics.bytes_rx += len(datagram)
+        if RawTrace.enabled:
+            RawTrace.record("rx", self.get_peer_name(), datagram)
+        return datagram
+
+    def get_peer_name(self):
+        """
+        :return: str - ip:port (wifi) or serial port name of the uC
+        """
+        if self.interface_type == InterfaceType.Wifi:
+            return f"{self.arduino_ip}:{self.udp_port}"
+        return str(self.port_name)
 
     def get_settings_interface(self):
         """
@@ -279,7 +1232,7 @@ class Arduino:
                                                     output_state,
                                                     append_crc8=Arduino.tx_crc8_enabled),
                                 GenCmd.get_io_state(output_type, output_num, append_crc8=Arduino.tx_crc8_enabled),
-                                [RX.bool],
+                                ResponseSchemas.io_state,
                                 Arduino.assert_io_state,
                                 output_state,
                                 rx_crc8_enabled=Arduino.rx_crc8_enabled)
@@ -298,12 +1251,37 @@ class Arduino:
         """
         get_cmd_fsm = GetCmdFSM(com,
                                 GenCmd.get_io_state(output_type, io_num, append_crc8=Arduino.tx_crc8_enabled),
-                                [RX.bool],
+                                ResponseSchemas.io_state,
                                 rx_crc8_enabled=Arduino.rx_crc8_enabled)
         io_state = RX.get_bool_value(get_cmd_fsm)
         logger.info(f"GET:{output_type}|{io_num}->State: {io_state}")
         return io_state
 
+    @staticmethod
+    def get_io_snapshot(com):
+        """
+        reads all outputs, push buttons, analog inputs and temperature probes on arduino uC in one pipelined batch
+
+        :param com: Interface object - communication interface (serial port or wifi udp socket)
+        :return snapshot: dict - keys = ssr, opto, push_button, analog, probe -> list of values ordered by io #
+        """
+        batch = CommandBatch(com, rx_crc8_enabled=Arduino.rx_crc8_enabled)
+        snapshot_fsm_dict = {
+            "ssr": [batch.add(GenCmd.get_io_state("ssr", io_num, append_crc8=Arduino.tx_crc8_enabled),
+                              ResponseSchemas.io_state) for io_num in range(1, 5)],
+            "opto": [batch.add(GenCmd.get_io_state("opto", io_num, append_crc8=Arduino.tx_crc8_enabled),
+                               ResponseSchemas.io_state) for io_num in range(1, 5)],
+            "push_button": [batch.add(GenCmd.get_io_state("push_button", io_num, append_crc8=Arduino.tx_crc8_enabled),
+                                      ResponseSchemas.io_state) for io_num in range(1, 3)],
+            "analog": [batch.add(GenCmd.get_analog_reading(io_num, append_crc8=Arduino.tx_crc8_enabled),
+                                 ResponseSchemas.analog_reading) for io_num in range(1, 3)],
+            "probe": [batch.add(GenCmd.get_probe_reading(io_num, append_crc8=Arduino.tx_crc8_enabled),
+                                ResponseSchemas.probe_reading) for io_num in range(1, 5)]}
+        batch.run()
+        snapshot = {key: [fsm.rx_data_list[0] for fsm in fsm_list] for key, fsm_list in snapshot_fsm_dict.items()}
+        logger.info(f"GET: IO snapshot: {snapshot}")
+        return snapshot
+
     @staticmethod
     def assert_io_state(expected_io_state, rx_data_list):
         """
@@ -329,7 +1307,7 @@ class Arduino:
         """
         get_cmd_fsm = GetCmdFSM(com,
                                 GenCmd.get_input_pulse_count(input_num, append_crc8=Arduino.tx_crc8_enabled),
-                                [RX.int],
+                                ResponseSchemas.count,
                                 rx_crc8_enabled=Arduino.rx_crc8_enabled)
         input_pulse_count = RX.get_int_value(get_cmd_fsm)
         logger.info(f"GET: INPUT PULSE COUNT: {input_pulse_count}")
@@ -350,7 +1328,7 @@ class Arduino:
         set_cmd_fsm = SetCmdFSM(com,
                                 GenCmd.set_date_time(dt_obj=dt_obj, append_crc8=Arduino.tx_crc8_enabled),
                                 GenCmd.get_rtc_time(append_crc8=Arduino.tx_crc8_enabled),
-                                [RX.int, RX.byte, RX.byte, RX.byte, RX.byte, RX.byte],
+                                ResponseSchemas.rtc_time,
                                 Arduino.assert_rtc_time,
                                 dt_obj,
                                 rx_crc8_enabled=Arduino.rx_crc8_enabled)
@@ -372,7 +1350,7 @@ class Arduino:
         """
         get_cmd_fsm = GetCmdFSM(com,
                                 GenCmd.get_rtc_time(append_crc8=Arduino.tx_crc8_enabled),
-                                [RX.int, RX.byte, RX.byte, RX.byte, RX.byte, RX.byte],
+                                ResponseSchemas.rtc_time,
                                 rx_crc8_enabled=Arduino.rx_crc8_enabled)
         dt_obj = RX.get_time(get_cmd_fsm)
         logger.info(f"GET RTC Time: Date(Y/M/D): {dt_obj.year}/{dt_obj.month}/{dt_obj.day} "
@@ -417,7 +1395,7 @@ class Arduino:
         """
         get_cmd_fsm = GetCmdFSM(com,
                                 GenCmd.get_system_time(append_crc8=Arduino.tx_crc8_enabled),
-                                [RX.int, RX.byte, RX.byte, RX.byte, RX.byte, RX.byte],
+                                ResponseSchemas.rtc_time,
                                 rx_crc8_enabled=Arduino.rx_crc8_enabled)
         dt_obj = RX.get_time(get_cmd_fsm)
         logger.info(f"GET SYSTEM Time: Date(Y/M/D): {dt_obj.year}/{dt_obj.month}/{dt_obj.day} "
@@ -436,7 +1414,7 @@ class Arduino:
         """
         get_cmd_fsm = GetCmdFSM(com,
                                 GenCmd.get_rtc_config_flag(append_crc8=Arduino.tx_crc8_enabled),
-                                [RX.bool],
+                                ResponseSchemas.flag,
                                 rx_crc8_enabled=Arduino.rx_crc8_enabled)
         rtc_config_flag = RX.get_bool_value(get_cmd_fsm)
         logger.info(f"GET: RTC Config Flag->State: {rtc_config_flag}")
@@ -452,7 +1430,7 @@ class Arduino:
         """
         get_cmd_fsm = GetCmdFSM(com,
                                 GenCmd.get_rtc_parse_flag(append_crc8=Arduino.tx_crc8_enabled),
-                                [RX.bool],
+                                ResponseSchemas.flag,
                                 rx_crc8_enabled=Arduino.rx_crc8_enabled)
         rtc_parse_flag = RX.get_bool_value(get_cmd_fsm)
         logger.info(f"GET: RTC Parse Failure Flag->State: {rtc_parse_flag}")
@@ -468,7 +1446,7 @@ class Arduino:
         """
         get_cmd_fsm = GetCmdFSM(com,
                                 GenCmd.get_system_time_flag(append_crc8=Arduino.tx_crc8_enabled),
-                                [RX.bool],
+                                ResponseSchemas.flag,
                                 rx_crc8_enabled=Arduino.rx_crc8_enabled)
         system_time_flag = RX.get_bool_value(get_cmd_fsm)
         logger.info(f"GET: System Time Flag->State: {system_time_flag}")
@@ -509,7 +1487,7 @@ class Arduino:
                                                         output_num=output_num,
                                                         on_off=on_off,
                                                         append_crc8=Arduino.tx_crc8_enabled),
-                                [RX.bool, RX.byte, RX.byte, RX.byte],
+                                ResponseSchemas.alarm,
                                 Arduino.assert_output_alarm,
                                 expected_alarm_dict,
                                 rx_crc8_enabled=Arduino.rx_crc8_enabled)
@@ -541,7 +1519,7 @@ class Arduino:
                                                         output_num=output_num,
                                                         on_off=on_off,
                                                         append_crc8=Arduino.tx_crc8_enabled),
-                                [RX.bool, RX.byte, RX.byte, RX.byte],
+                                ResponseSchemas.alarm,
                                 rx_crc8_enabled=Arduino.rx_crc8_enabled)
         alarm_dict = RX.get_output_alarm(get_cmd_fsm)
         get_epoch = alarm_dict['dt_obj'].timestamp()
@@ -620,7 +1598,7 @@ class Arduino:
                                                         output_num=output_num,
                                                         on_off=cycle_duration,
                                                         append_crc8=Arduino.tx_crc8_enabled),
-                                [RX.bool, RX.byte, RX.byte, RX.byte],
+                                ResponseSchemas.alarm,
                                 Arduino.assert_output_alarm,
                                 expected_alarm_dict,
                                 rx_crc8_enabled=Arduino.rx_crc8_enabled)
@@ -651,7 +1629,7 @@ class Arduino:
                                                              mode=mode,
                                                              append_crc8=Arduino.tx_crc8_enabled),
                                 GenCmd.get_output_alarm_mode(output_num, append_crc8=Arduino.tx_crc8_enabled),
-                                [RX.bool],
+                                ResponseSchemas.flag,
                                 Arduino.assert_alarm_mode,
                                 mode,
                                 rx_crc8_enabled=Arduino.rx_crc8_enabled)
@@ -669,7 +1647,7 @@ class Arduino:
         """
         get_cmd_fsm = GetCmdFSM(com,
                                 GenCmd.get_output_alarm_mode(output_num, append_crc8=Arduino.tx_crc8_enabled),
-                                [RX.bool],
+                                ResponseSchemas.flag,
                                 rx_crc8_enabled=Arduino.rx_crc8_enabled)
         set_mode = RX.get_bool_value(get_cmd_fsm)
         logger.info(f"GET:ssr|{output_num}->Mode: {set_mode}")
@@ -702,7 +1680,7 @@ class Arduino:
                                 GenCmd.set_master_alarm_enable(master_alarm_enable,
                                                                append_crc8=Arduino.tx_crc8_enabled),
                                 GenCmd.get_master_alarm_enable(append_crc8=Arduino.tx_crc8_enabled),
-                                [RX.bool],
+                                ResponseSchemas.flag,
                                 Arduino.assert_master_alarm_enable_state,
                                 master_alarm_enable,
                                 rx_crc8_enabled=Arduino.rx_crc8_enabled)
@@ -719,7 +1697,7 @@ class Arduino:
         """
         get_cmd_fsm = GetCmdFSM(com,
                                 GenCmd.get_master_alarm_enable(append_crc8=Arduino.tx_crc8_enabled),
-                                [RX.bool],
+                                ResponseSchemas.flag,
                                 rx_crc8_enabled=Arduino.rx_crc8_enabled)
         master_alarm_enable = RX.get_bool_value(get_cmd_fsm)
         logger.info(f"GET: Master Alarm->State: {master_alarm_enable}")
@@ -753,7 +1731,7 @@ class Arduino:
         set_cmd_fsm = SetCmdFSM(com,
                                 GenCmd.set_clear_eeprom(append_crc8=Arduino.tx_crc8_enabled),
                                 GenCmd.get_clear_eeprom_count(append_crc8=Arduino.tx_crc8_enabled),
-                                [RX.int],
+                                ResponseSchemas.count,
                                 Arduino.assert_clear_eeprom_count,
                                 clear_eeprom_count + 1,
                                 rx_crc8_enabled=Arduino.rx_crc8_enabled)
@@ -771,7 +1749,7 @@ class Arduino:
         """
         get_cmd_fsm = GetCmdFSM(com,
                                 GenCmd.get_clear_eeprom_count(append_crc8=Arduino.tx_crc8_enabled),
-                                [RX.int],
+                                ResponseSchemas.count,
                                 rx_crc8_enabled=Arduino.rx_crc8_enabled)
         clear_eeprom_count = RX.get_int_value(get_cmd_fsm)
         logger.info(f"GET:EEPROM CLEAR COUNT: {clear_eeprom_count}")
@@ -806,7 +1784,7 @@ class Arduino:
         set_cmd_fsm = SetCmdFSM(com,
                                 GenCmd.pulse_opto_output(output_num, n, append_crc8=Arduino.tx_crc8_enabled),
                                 GenCmd.get_opto_pulse_count(output_num, append_crc8=Arduino.tx_crc8_enabled),
-                                [RX.int],
+                                ResponseSchemas.count,
                                 Arduino.assert_clear_eeprom_count,
                                 opto_pulse_count + n,
                                 rx_crc8_enabled=Arduino.rx_crc8_enabled)
@@ -825,7 +1803,7 @@ class Arduino:
         """
         get_cmd_fsm = GetCmdFSM(com,
                                 GenCmd.get_opto_pulse_count(output_num, append_crc8=Arduino.tx_crc8_enabled),
-                                [RX.int],
+                                ResponseSchemas.count,
                                 rx_crc8_enabled=Arduino.rx_crc8_enabled)
         opto_pulse_count = RX.get_int_value(get_cmd_fsm)
         logger.info(f"GET: OPTO PULSE COUNT: {opto_pulse_count}")
@@ -861,7 +1839,7 @@ class Arduino:
                                 GenCmd.set_expected_io_state(output_type=output_type, output_num=output_num,
                                                              append_crc8=Arduino.tx_crc8_enabled),
                                 GenCmd.get_set_expected_io_count(append_crc8=Arduino.tx_crc8_enabled),
-                                [RX.int],
+                                ResponseSchemas.count,
                                 Arduino.assert_set_expected_io_count,
                                 set_expected_io_count + 1,
                                 rx_crc8_enabled=Arduino.rx_crc8_enabled)
@@ -880,7 +1858,7 @@ class Arduino:
         """
         get_cmd_fsm = GetCmdFSM(com,
                                 GenCmd.get_set_expected_io_count(append_crc8=Arduino.tx_crc8_enabled),
-                                [RX.int],
+                                ResponseSchemas.count,
                                 rx_crc8_enabled=Arduino.rx_crc8_enabled)
         set_expected_io_count = RX.get_int_value(get_cmd_fsm)
         logger.info(f"GET:SET EXPECTED IO COUNT: {set_expected_io_count}")
@@ -912,7 +1890,7 @@ class Arduino:
         """
         get_cmd_fsm = GetCmdFSM(com,
                                 GenCmd.get_analog_reading(input_num=input_num, append_crc8=Arduino.tx_crc8_enabled),
-                                [RX.float],
+                                ResponseSchemas.analog_reading,
                                 rx_crc8_enabled=Arduino.rx_crc8_enabled)
         reading_value = RX.get_float_value(get_cmd_fsm)
         logger.info(f"GET:Analog|{input_num}->Value: {reading_value}")
@@ -928,7 +1906,7 @@ class Arduino:
         """
         get_cmd_fsm = GetCmdFSM(com,
                                 GenCmd.get_number_probes(append_crc8=Arduino.tx_crc8_enabled),
-                                [RX.int],
+                                ResponseSchemas.count,
                                 rx_crc8_enabled=Arduino.rx_crc8_enabled)
         number_probes = RX.get_int_value(get_cmd_fsm)
         logger.info(f"GET: # of Recognized Probes: {number_probes}")
@@ -945,7 +1923,7 @@ class Arduino:
         """
         get_cmd_fsm = GetCmdFSM(com,
                                 GenCmd.get_probe_recognition(input_num=input_num, append_crc8=Arduino.tx_crc8_enabled),
-                                [RX.bool],
+                                ResponseSchemas.flag,
                                 rx_crc8_enabled=Arduino.rx_crc8_enabled)
         probe_recognition_flag = RX.get_bool_value(get_cmd_fsm)
         logger.info(f"GET: Probe #:{input_num} Recognition: {probe_recognition_flag}")
@@ -961,7 +1939,7 @@ class Arduino:
         :return probe_reading: float - reading measured on uC
         """
         get_cmd_fsm = GetCmdFSM(com, GenCmd.get_probe_reading(input_num=input_num, append_crc8=Arduino.tx_crc8_enabled),
-                                [RX.float],
+                                ResponseSchemas.probe_reading,
                                 rx_crc8_enabled=Arduino.rx_crc8_enabled)
         probe_reading = RX.get_float_value(get_cmd_fsm)
         logger.info(f"GET:Probe #:{input_num} Temperature(C): {probe_reading}")
@@ -977,7 +1955,7 @@ class Arduino:
         """
         get_cmd_fsm = GetCmdFSM(com,
                                 GenCmd.get_wifi_status(append_crc8=Arduino.tx_crc8_enabled),
-                                [RX.int],
+                                ResponseSchemas.wifi_status,
                                 rx_crc8_enabled=Arduino.rx_crc8_enabled)
         wifi_status_int = RX.get_int_value(get_cmd_fsm)
         wifi_status_def = InterpretOutput.wifi_status_definition(wifi_status_int)
@@ -995,7 +1973,7 @@ class Arduino:
         """
         get_cmd_fsm = GetCmdFSM(com,
                                 GenCmd.get_wifi_ip_address(append_crc8=Arduino.tx_crc8_enabled),
-                                [RX.byte, RX.byte, RX.byte, RX.byte],
+                                ResponseSchemas.ip_address,
                                 rx_crc8_enabled=Arduino.rx_crc8_enabled)
         wifi_ip_bytes = RX.get_wifi_ip_address(get_cmd_fsm)
         logger.info(f"GET:Wifi IP Address: {wifi_ip_bytes}")
@@ -1011,7 +1989,7 @@ class Arduino:
         """
         get_cmd_fsm = GetCmdFSM(com,
                                 GenCmd.get_wifi_rssi(append_crc8=Arduino.tx_crc8_enabled),
-                                [RX.long],
+                                ResponseSchemas.wifi_rssi,
                                 rx_crc8_enabled=Arduino.rx_crc8_enabled)
         rssi_dbm = RX.get_long_value(get_cmd_fsm)
         logger.info(f"GET:Wifi IP RSSI (dBm): {rssi_dbm}")
@@ -1023,9 +2001,12 @@ class RX:
     Class of static methods to handle received bytes from arduino uC via communication interface
     """
     detected_os = OSDetection.get_os_type()
+    # multi-byte values are sent MSB first by the uC
+    int_struct = struct.Struct('>H')
+    float_struct = struct.Struct('>f')
+    long_struct = struct.Struct('>l')
 
     @staticmethod
-    @retry(tries=10, delay=0)
     def ack(com):
         """
         rx and validates ACK from a command sent to arduino uC
@@ -1034,17 +2015,27 @@ class RX:
         :caveats: raise error if NAK or anything else is received (could timeout)
         """
         rec_byte = com.read()
-        logger.debug(rec_byte)
-        logger.debug(int.from_bytes(rec_byte, 'big'))
-        if int.from_bytes(rec_byte, 'big') == 6:
+        if not rec_byte:
+            # serial read returns nothing on timeout
+            raise SerialTimeoutException("ack timeout")
+        RX.validate_ack(rec_byte)
+
+    @staticmethod
+    def validate_ack(rec_byte):
+        """
+        validates the byte received in place of an ACK, shared by the sync and asyncio clients
+
+        :param rec_byte: byte string - single byte received
+        :caveats: raise error if NAK or anything else is received
+        """
+        if rec_byte == b'\x06':
             logger.debug("ACK DETECTED")
-        elif int.from_bytes(rec_byte, 'big') == 21:
+        elif rec_byte == b'\x15':
             raise NakReceived("NAK RECEIVED")
         else:
             raise UnexpectedByte(f"received: {rec_byte}")
 
     @staticmethod
-    @retry(tries=10, delay=0)
     def bool(com):
         """
         rx and validates bool value response from a command sent to arduino uC
@@ -1054,9 +2045,8 @@ class RX:
         :caveats: raise error anything else than 1 or 0 is received
         """
         rec_byte = com.read()
-        logger.debug(rec_byte)
         int_conversion = int.from_bytes(rec_byte, 'big')
-        logger.debug(f"Detected State: {int_conversion}")
+        logger.debug("Detected State: %s raw: %s", int_conversion, rec_byte)
         if int_conversion == 1:
             return True, rec_byte
         elif int_conversion == 0:
@@ -1065,7 +2055,6 @@ class RX:
             raise UnexpectedByte(f"received: {rec_byte}")
 
     @staticmethod
-    @retry(tries=10, delay=0)
     def byte(com):
         """
         rx and validates byte value response from a command sent to arduino
@@ -1076,9 +2065,8 @@ class RX:
         :caveats: won't raise an error and just interpret whatever value of byte as an int
         """
         rec_byte = com.read()
-        logger.debug(rec_byte)
         int_conversion = int.from_bytes(rec_byte, 'big')
-        logger.debug(f"(int)Byte: {int_conversion}")
+        logger.debug("(int)Byte: %s raw: %s", int_conversion, rec_byte)
         return int_conversion, rec_byte
 
     @staticmethod
@@ -1090,14 +2078,9 @@ class RX:
         :return tuple(int, byte string) - value sent by arduino, raw bytes
         :caveats: won't raise an error and just interpret whatever combined value of bytes as an int
         """
-        rx_high_byte = com.read()
-        logger.debug(f"high byte: {rx_high_byte}")
-        rx_low_byte = com.read()
-        logger.debug(f"low byte: {rx_low_byte}")
-        rx_total_byte = rx_high_byte + rx_low_byte
-        logger.debug(f"total byte: {rx_total_byte}")
-        int_conversion = int.from_bytes(rx_total_byte, 'big')
-        logger.debug(f"(int): {int_conversion}")
+        rx_total_byte = com.read_exact(RX.int_struct.size)
+        int_conversion = RX.int_struct.unpack(rx_total_byte)[0]
+        logger.debug("total byte: %s -> (int): %s", rx_total_byte, int_conversion)
         return int_conversion, rx_total_byte
 
     @staticmethod
@@ -1109,18 +2092,9 @@ class RX:
         :return: tuple(float, byte string) - temperature celsius read from probe, raw bytes
         :caveats: won't raise an error and just interpret whatever combined value of bytes as a float
         """
-        rec_byte_4 = com.read()
-        logger.debug(f"byte 4: {rec_byte_4}")
-        rec_byte_3 = com.read()
-        logger.debug(f"byte 3: {rec_byte_3}")
-        rec_byte_2 = com.read()
-        logger.debug(f"byte 2: {rec_byte_2}")
-        rec_byte_1 = com.read()
-        logger.debug(f"byte 1: {rec_byte_1}")
-        rx_total_byte = rec_byte_4 + rec_byte_3 + rec_byte_2 + rec_byte_1
-        logger.debug(f"total byte: {rx_total_byte}")
-        float_conversion = struct.unpack('>f', rx_total_byte)[0]
-        logger.debug(f"(float): {float_conversion}")
+        rx_total_byte = com.read_exact(RX.float_struct.size)
+        float_conversion = RX.float_struct.unpack(rx_total_byte)[0]
+        logger.debug("total byte: %s -> (float): %s", rx_total_byte, float_conversion)
         return float_conversion, rx_total_byte
 
     @staticmethod
@@ -1132,18 +2106,9 @@ class RX:
         :return: tuple(long, byte string) - value returned from arduino uC, raw bytes
         :caveats: won't raise an error and just interpret whatever combined value of bytes as a float
         """
-        rec_byte_4 = com.read()
-        logger.debug(f"byte 4: {rec_byte_4}")
-        rec_byte_3 = com.read()
-        logger.debug(f"byte 3: {rec_byte_3}")
-        rec_byte_2 = com.read()
-        logger.debug(f"byte 2: {rec_byte_2}")
-        rec_byte_1 = com.read()
-        logger.debug(f"byte 1: {rec_byte_1}")
-        rx_total_byte = rec_byte_4 + rec_byte_3 + rec_byte_2 + rec_byte_1
-        logger.debug(f"total byte: {rx_total_byte}")
-        long_conversion = struct.unpack('>l', rx_total_byte)[0]
-        logger.debug(f"(long): {long_conversion}")
+        rx_total_byte = com.read_exact(RX.long_struct.size)
+        long_conversion = RX.long_struct.unpack(rx_total_byte)[0]
+        logger.debug("total byte: %s -> (long): %s", rx_total_byte, long_conversion)
         return long_conversion, rx_total_byte
 
     @staticmethod
@@ -1230,19 +2195,7 @@ class RX:
         """
         fsm.start_fsm()
         if fsm.literal_state == "get_cmd_ok" or fsm.literal_state == "set_cmd_ok":
-            year = fsm.rx_data_list[0]
-            logger.debug(f"Year: {year}")
-            month = fsm.rx_data_list[1]
-            logger.debug(f"Month: {month}")
-            day = fsm.rx_data_list[2]
-            logger.debug(f"Day: {day}")
-            hour = fsm.rx_data_list[3]
-            logger.debug(f"Hour: {hour}")
-            minute = fsm.rx_data_list[4]
-            logger.debug(f"Minute: {minute}")
-            second = fsm.rx_data_list[5]
-            logger.debug(f"Second: {second}")
-            return datetime(year, month, day, hour, minute, second)
+            return RX.parse_time(fsm.rx_data_list)
         else:
             raise FailedFSM(f"State: {fsm.literal_state}")
 
@@ -1256,446 +2209,838 @@ class RX:
         """
         fsm.start_fsm()
         if fsm.literal_state == "get_cmd_ok" or fsm.literal_state == "set_cmd_ok":
-            alarm_dict = {}
-            alarm_dict.update({"enable": fsm.rx_data_list[0]})
-            logger.info(f"Enable: {alarm_dict['enable']}")
-            alarm_dict.update({"hour": fsm.rx_data_list[1]})
-            logger.info(f"Hour: {alarm_dict['hour']}")
-            alarm_dict.update({"minute": fsm.rx_data_list[2]})
-            logger.info(f"Minute: {alarm_dict['minute']}")
-            alarm_dict.update({"second": fsm.rx_data_list[3]})
-            logger.info(f"Second: {alarm_dict['second']}")
-            dt_obj = datetime(year=1971,
-                              month=1,
-                              day=1,
-                              hour=alarm_dict['hour'],
-                              minute=alarm_dict['minute'],
-                              second=alarm_dict['second'])
-            alarm_dict.update({"dt_obj": dt_obj})
-            return alarm_dict
+            return RX.parse_output_alarm(fsm.rx_data_list)
         else:
             raise FailedFSM(f"State: {fsm.literal_state}")
 
+    @staticmethod
+    def parse_time(rx_data_list):
+        """
+        parses time data returned by uC
+
+        :param rx_data_list: list - year/month/day/hour/minute/second @ positions [0-5]
+        :return: datetime object - parsed time
+        """
+        year, month, day, hour, minute, second = rx_data_list[:6]
+        logger.debug("Year: %s Month: %s Day: %s Hour: %s Minute: %s Second: %s",
+                     year, month, day, hour, minute, second)
+        return datetime(year, month, day, hour, minute, second)
 
-class GetCmdFSM:
+    @staticmethod
+    def parse_output_alarm(rx_data_list):
+        """
+        parses alarm data returned by uC
+
+        :param rx_data_list: list - enable flag/hour/minute/second @ positions [0-3]
+        :return: dict - of alarm values
+        """
+        alarm_dict = {}
+        alarm_dict.update({"enable": rx_data_list[0]})
+        alarm_dict.update({"hour": rx_data_list[1]})
+        alarm_dict.update({"minute": rx_data_list[2]})
+        alarm_dict.update({"second": rx_data_list[3]})
+        logger.info("Enable: %s Hour: %s Minute: %s Second: %s",
+                    alarm_dict['enable'], alarm_dict['hour'], alarm_dict['minute'], alarm_dict['second'])
+        dt_obj = datetime(year=1971,
+                          month=1,
+                          day=1,
+                          hour=alarm_dict['hour'],
+                          minute=alarm_dict['minute'],
+                          second=alarm_dict['second'])
+        alarm_dict.update({"dt_obj": dt_obj})
+        return alarm_dict
+
+
+class ResponseSchema:
     """
-    uC communications finite state machine for Get Commands
+    Class describing the data portion of a uC response, compiled once into a fixed length struct format
+    """
+    # multi-byte values are sent MSB first by the uC
+    rx_type_formats = {RxType.bool: 'B',
+                       RxType.byte: 'B',
+                       RxType.int: 'H',
+                       RxType.float: 'f',
+                       RxType.long: 'l'}
+
+    def __init__(self, name, fields, field_ranges=None):
+        """
+        :param name: str - command family described by the schema
+        :param fields: list tuple(str, RxType) - name and type of each field, in the order sent by uC
+        :param field_ranges: dict - field name -> tuple(int, int) min / max value the uC can send (i.e. month 1-12)
+        """
+        self.name = name
+        self.field_names = tuple(field_name for field_name, _ in fields)
+        self.rx_struct = struct.Struct('>' + ''.join(ResponseSchema.rx_type_formats[rx_type] for _, rx_type in fields))
+        self.length = self.rx_struct.size
+        self.bool_indexes = tuple(i for i, (_, rx_type) in enumerate(fields) if rx_type == RxType.bool)
+        field_ranges = field_ranges if field_ranges else {}
+        self.range_checks = tuple((self.field_names.index(field_name), min_value, max_value)
+                                  for field_name, (min_value, max_value) in field_ranges.items())
+
+    def unpack(self, rx_raw):
+        """
+        decodes a whole response in one pass
+
+        :param rx_raw: bytes-like object - raw data bytes received from uC (self.length bytes)
+        :return: list - decoded values, in field order
+        :caveats: raise error if a bool field is anything else than 1 or 0, or a field is out of its range
+                  (bytes of another reply, i.e. late reply without crc8), the attempt is then retried
+        """
+        rx_data_list = list(self.rx_struct.unpack(rx_raw))
+        for i in self.bool_indexes:
+            if rx_data_list[i] > 1:
+                raise UnexpectedByte(f"received: {bytes(rx_raw)}")
+            rx_data_list[i] = rx_data_list[i] == 1
+        for i, min_value, max_value in self.range_checks:
+            if not min_value <= rx_data_list[i] <= max_value:
+                raise UnexpectedByte(f"{self.field_names[i]} out of range, received: {bytes(rx_raw)}")
+        return rx_data_list
+
+    def get_frame_length(self, rx_crc8_enabled):
+        """
+        :param rx_crc8_enabled : bool - if true, a crc byte follows the data
+        :return: int - # of bytes sent by uC after the ACK
+        """
+        return self.length + 1 if rx_crc8_enabled else self.length
+
+    def unpack_frame(self, rx_frame, rx_crc8_enabled):
+        """
+        decodes data and checks crc of a reply received after the ACK, shared by the sync and asyncio clients
+
+        :param rx_frame: bytes-like object - get_frame_length() bytes, a memoryview is decoded in place
+        :param rx_crc8_enabled : bool - if true, the last byte is the crc of the data
+        :return: tuple (list, int) - decoded values in field order, received crc (None if crc8 disabled)
+        :caveats: raise error on unexpected byte (see unpack) or crc mismatch
+        """
+        length = self.length
+        rx_data_list = self.unpack(rx_frame[:length])
+        if not rx_crc8_enabled:
+            return rx_data_list, None
+        rx_crc = rx_frame[length]
+        if not CRC8.is_valid(rx_frame[:length], rx_crc):
+            raise CrcMismatch(f"received: {rx_crc} != calculated: {CRC8.compute(rx_frame[:length])} "
+                              f"data: {bytes(rx_frame[:length])}")
+        return rx_data_list, rx_crc
+
+
+class ResponseSchemas:
+    """
+    Registry of response schemas, one per command family
     """
+    io_state = ResponseSchema("io_state", [("state", RxType.bool)])
+    flag = ResponseSchema("flag", [("flag", RxType.bool)])
+    count = ResponseSchema("count", [("count", RxType.int)])
+    alarm = ResponseSchema("alarm", [("enable", RxType.bool),
+                                     ("hour", RxType.byte),
+                                     ("minute", RxType.byte),
+                                     ("second", RxType.byte)],
+                           field_ranges={"hour": (0, 23), "minute": (0, 59), "second": (0, 59)})
+    rtc_time = ResponseSchema("rtc_time", [("year", RxType.int),
+                                           ("month", RxType.byte),
+                                           ("day", RxType.byte),
+                                           ("hour", RxType.byte),
+                                           ("minute", RxType.byte),
+                                           ("second", RxType.byte)],
+                              field_ranges={"year": (1, 9999), "month": (1, 12), "day": (1, 31), "hour": (0, 23),
+                                            "minute": (0, 59), "second": (0, 59)})
+    ip_address = ResponseSchema("ip_address", [("ip_1", RxType.byte),
+                                               ("ip_2", RxType.byte),
+                                               ("ip_3", RxType.byte),
+                                               ("ip_4", RxType.byte)])
+    probe_reading = ResponseSchema("probe_reading", [("celsius", RxType.float)])
+    analog_reading = ResponseSchema("analog_reading", [("value", RxType.float)])
+    wifi_status = ResponseSchema("wifi_status", [("status", RxType.int)])
+    wifi_rssi = ResponseSchema("wifi_rssi", [("dbm", RxType.long)])
+
+
+class CmdFSM:
+    """
+    Table-driven, loop based finite state machine engine shared by GetCmdFSM and SetCmdFSM
 
-    def __init__(self, com, byte_cmd, rx_function_list, rx_crc8_enabled=False):
+    each state function performs its action and returns the event that occurred, the transition table
+    (state, event) -> next state decides which state function runs next. Stack depth is constant whatever the
+    # of retries
+    """
+    state_enum = None
+    initial_state = None
+    terminal_states = frozenset()
+    ok_state = None
+    transition_table = {}
+    # label of the FSM in CommMetrics (get or set)
+    metrics_kind = None
+    # default hook for every FSM: function(fsm, from_state, event, to_state), called on each state change
+    default_state_change_hook = None
+    # events after which the next ACK may answer an earlier attempt
+    ambiguous_rtt_events = frozenset({FsmEvent.timeout_ack_not_rx, FsmEvent.timeout_data_not_rx,
+                                      FsmEvent.ack_not_rx_tx_verify_get_cmd, FsmEvent.crc_mismatch_rx,
+                                      FsmEvent.late_ack_rx, FsmEvent.late_data_rx,
+                                      FsmEvent.late_ack_rx_tx_verify_get_cmd, FsmEvent.invalid_assert_tx_set_cmd})
+    ack_timeout_events = frozenset({FsmEvent.timeout_ack_not_rx, FsmEvent.ack_not_rx_tx_verify_get_cmd})
+
+    def __init__(self, com, rx_crc8_enabled=False, state_change_hook=None):
         """
         :param com: Interface object - communication interface (serial port or wifi udp socket)
-        :param byte_cmd: byte string - get command used
-        :param rx_function_list: list function - list of receiving function used to parse data
         :param rx_crc8_enabled : bool - if true, expects to receive crc byte after data
+        :param state_change_hook: function - overrides CmdFSM.default_state_change_hook for this FSM
         """
         self.com = com
-        self.byte_cmd = byte_cmd
-        self.rx_function_list = rx_function_list
         self.rx_data_list = []
-        self.rx_raw = b''
         self.rx_crc = None
-        self.rx_calculated_crc = None
         self.rx_crc_is_valid = False
         self.rx_crc8_enabled = rx_crc8_enabled
-
-        self.literal_state = "comms_start"
-        self.wait_get_ack_failure_counter = 0
-        self.wait_data_failure_counter = 0
-        self.wait_failure_limit = 10
+        if state_change_hook is not None:
+            self.state_change_hook = state_change_hook
+        else:
+            self.state_change_hook = CmdFSM.default_state_change_hook
+        self.state = self.initial_state
+        self.last_event = None
+        self.retry_policy = com.retry_policy
+        self.health_tracker = com.health_tracker
+        self.metrics = com.metrics
+        # command the transaction is reported under in CommMetrics
+        self.metrics_byte_cmd = b''
+        self.deadline = None
+        # attempt (see Interface.begin_attempt) the FSM is waiting a reply for
+        self.attempt_id = None
+        self.attempt_sent_at = None
+        # Karn: round trips are only measured until the first timeout / late reply of the transaction
+        self.rtt_sample_valid = True
+
+    @property
+    def literal_state(self):
+        return self.state.name
 
     def start_fsm(self):
-        # open socket at start of transaction
-        if self.com.interface_type == InterfaceType.Wifi:
-            self.com.open_udp_socket()
-        self.comms_start("start_comms")
+        # the interface is held for the whole transaction
+        with self.com.lock:
+            # make sure long-lived socket is open and healthy at start of transaction
+            if self.com.interface_type == InterfaceType.Wifi:
+                self.com.open_udp_socket()
+            self.run()
 
     def restart_fsm(self):
-        # open socket at restart of transaction
-        if self.com.interface_type == InterfaceType.Wifi:
-            self.com.open_udp_socket()
+        with self.com.lock:
+            # make sure long-lived socket is open and healthy at restart of transaction
+            if self.com.interface_type == InterfaceType.Wifi:
+                self.com.open_udp_socket()
+            self.reset_counters()
+            self.run()
+
+    def reset_counters(self):
+        pass
+
+    def run(self):
+        """
+        runs state functions until a terminal state is reached
+        :caveats: transitions and transaction latency are recorded in the interface CommMetrics, raises
+                  BoardUnavailable without sending anything while the board is known to be unreachable
+        """
+        try:
+            self.health_tracker.before_command(self.com)
+        except BoardUnavailable:
+            self.metrics.record_rejected()
+            raise
+        transition_table = self.transition_table
+        state_change_hook = self.state_change_hook
+        metrics = self.metrics
+        start = time.perf_counter()
+        self.deadline = self.retry_policy.get_deadline(self.com.get_max_timeout())
+        self.rtt_sample_valid = True
+        state = self.initial_state
+        event = FsmEvent.start_comms
+        self.state = state
+        while state not in self.terminal_states:
+            event = getattr(self, state.name)(event)
+            if event in CmdFSM.ambiguous_rtt_events:
+                self.rtt_sample_valid = False
+                if event in CmdFSM.ack_timeout_events:
+                    self.com.record_ack_timeout()
+            next_state = transition_table[(state, event)]
+            metrics.record_transition(self.metrics_kind, state, event, next_state)
+            if state_change_hook is not None:
+                state_change_hook(self, state, event, next_state)
+            state = next_state
+            self.state = state
+        self.last_event = event
+        getattr(self, state.name)(event)
+        metrics.record_command(self.metrics_kind, self.metrics_byte_cmd, time.perf_counter() - start,
+                               state == self.ok_state)
+
+    def send(self, byte_cmd):
+        """
+        starts a new attempt (late bytes of earlier attempts are discarded) and writes byte_cmd
+        :param byte_cmd: byte string - command to send
+        """
+        self.attempt_id = self.com.begin_attempt()
+        # logged here, GenCmd builders are memoized and only run once per command
+        logger.debug("tx: %s (attempt #%s)", byte_cmd, self.attempt_id)
+        self.com.write(byte_cmd)
+        self.attempt_sent_at = time.perf_counter()
+
+    def ack_received(self):
+        """
+        to call once the ACK of the current attempt was received, feeds the interface adaptive timeout
+        """
+        if self.rtt_sample_valid:
+            self.com.record_rtt(time.perf_counter() - self.attempt_sent_at)
+
+    def late_reply(self, error):
+        """
+        an unexpected byte is the reply of an earlier attempt (or transaction) arriving late: the attempt is
+        retried instead of failing the command
+        :param error: UnexpectedByte - error raised while decoding
+        """
+        logger.debug("late reply during attempt #%s: %s", self.attempt_id, error)
+
+    def retry_allowed(self, failed_attempts):
+        """
+        :param failed_attempts: int - # of attempts of current step that already failed
+        :return: bool - True once backoff delay is over, False if the command must give up
+        :caveats: a probe of an unreachable board (see HealthTracker) gets a single attempt
+        """
+        if not self.health_tracker.is_closed():
+            return False
+        if not self.retry_policy.allows_retry(failed_attempts, self.deadline):
+            return False
+        self.retry_policy.backoff(failed_attempts)
+        return True
+
+    def rx_data(self):
+        """
+        rx and decodes data (+ crc) of a get command, once ACK was received
+        :caveats: raise error on timeout, unexpected byte or crc mismatch
+        """
+        # data and crc received as one frame, decoded and checked in place from the interface buffer
+        rx_view = self.com.read_view(self.rx_schema.get_frame_length(self.rx_crc8_enabled))
+        self.rx_data_list, self.rx_crc = self.rx_schema.unpack_frame(rx_view, self.rx_crc8_enabled)
+        self.rx_crc_is_valid = self.rx_crc8_enabled
+
+
+class GetCmdFSM(CmdFSM):
+    """
+    uC communications finite state machine for Get Commands
+    """
+    state_enum = GetState
+    initial_state = GetState.comms_start
+    terminal_states = frozenset({GetState.get_cmd_ok, GetState.comms_failure})
+    ok_state = GetState.get_cmd_ok
+    metrics_kind = "get"
+    transition_table = {
+        (GetState.comms_start, FsmEvent.tx_get_cmd): GetState.wait_get_ack,
+        (GetState.wait_get_ack, FsmEvent.ack_rx): GetState.wait_data,
+        (GetState.wait_get_ack, FsmEvent.timeout_ack_not_rx): GetState.increment_retry_get,
+        (GetState.wait_get_ack, FsmEvent.nak_rx): GetState.comms_failure,
+        (GetState.wait_get_ack, FsmEvent.late_ack_rx): GetState.increment_retry_get,
+        (GetState.increment_retry_get, FsmEvent.tx_get_cmd): GetState.wait_get_ack,
+        (GetState.increment_retry_get, FsmEvent.retry_get_ack_limit): GetState.comms_failure,
+        (GetState.increment_retry_get, FsmEvent.retry_get_data_limit): GetState.comms_failure,
+        (GetState.wait_data, FsmEvent.data_rx): GetState.get_cmd_ok,
+        (GetState.wait_data, FsmEvent.timeout_data_not_rx): GetState.increment_retry_get,
+        (GetState.wait_data, FsmEvent.crc_mismatch_rx): GetState.increment_retry_get,
+        (GetState.wait_data, FsmEvent.late_data_rx): GetState.increment_retry_get,
+    }
+
+    def __init__(self, com, byte_cmd, rx_schema, rx_crc8_enabled=False, state_change_hook=None):
+        """
+        :param com: Interface object - communication interface (serial port or wifi udp socket)
+        :param byte_cmd: byte string - get command used
+        :param rx_schema: ResponseSchema object - describes data returned by uC
+        :param rx_crc8_enabled : bool - if true, expects to receive crc byte after data
+        :param state_change_hook: function - overrides CmdFSM.default_state_change_hook for this FSM
+        """
+        super().__init__(com, rx_crc8_enabled=rx_crc8_enabled, state_change_hook=state_change_hook)
+        self.byte_cmd = byte_cmd
+        self.rx_schema = rx_schema
+        self.metrics_byte_cmd = byte_cmd
+
+        self.wait_get_ack_failure_counter = 0
+        self.wait_data_failure_counter = 0
+
+    def reset_counters(self):
         self.wait_get_ack_failure_counter = 0
         self.wait_data_failure_counter = 0
-        self.comms_start("start_comms")
 
     # ===============================================================================
     # State Functions
     # ===============================================================================
 
-    def comms_start(self, transition):
-        self.literal_state = "comms_start"
-        if transition == 'start_comms':
-            self.com.write(self.byte_cmd)
-            self.wait_get_ack("tx_get_cmd")
-
-    def wait_get_ack(self, transition):
-        self.literal_state = "wait_get_ack"
-        if transition == 'tx_get_cmd':
-            try:
-                RX.ack(self.com)
-                self.wait_get_ack_failure_counter = 0
-                self.wait_data("ack_rx")
-            except (socket.timeout, SerialException):
-                logger.debug(f"get ack timeout")
-                self.increment_retry_get("nth_timeout_ack_not_rx")
-            except NakReceived:
-                logger.warning(f"get ack got Nak instead")
-                self.comms_failure("nak_rx")
-            except UnexpectedByte:
-                logger.warning("unexpected byte received")
-                self.comms_failure("unexpected_byte_rx")
-
-    def increment_retry_get(self, transition):
-        self.literal_state = "increment_retry_get"
-        if transition == "nth_timeout_ack_not_rx":
+    def comms_start(self, event):
+        self.send(self.byte_cmd)
+        return FsmEvent.tx_get_cmd
+
+    def wait_get_ack(self, event):
+        try:
+            RX.ack(self.com)
+            self.ack_received()
+            self.wait_get_ack_failure_counter = 0
+            return FsmEvent.ack_rx
+        except (socket.timeout, SerialException):
+            logger.debug("get ack timeout")
+            return FsmEvent.timeout_ack_not_rx
+        except NakReceived:
+            logger.warning("get ack got Nak instead")
+            return FsmEvent.nak_rx
+        except UnexpectedByte as e:
+            self.late_reply(e)
+            return FsmEvent.late_ack_rx
+
+    def increment_retry_get(self, event):
+        if event in (FsmEvent.timeout_ack_not_rx, FsmEvent.late_ack_rx):
             self.wait_get_ack_failure_counter += 1
-            if self.wait_get_ack_failure_counter < self.wait_failure_limit:
-                self.com.write(self.byte_cmd)
-                self.wait_get_ack("tx_get_cmd")
-            else:
-                self.comms_failure("retry_get_ack>limit")
-        elif transition == "nth_timeout_data_not_rx":
+            if not self.retry_allowed(self.wait_get_ack_failure_counter):
+                return FsmEvent.retry_get_ack_limit
+        else:
             self.wait_data_failure_counter += 1
-            if self.wait_data_failure_counter < self.wait_failure_limit:
-                self.com.write(self.byte_cmd)
-                self.wait_get_ack("tx_get_cmd")
-            else:
-                self.comms_failure("retry_get_data>limit")
+            if not self.retry_allowed(self.wait_data_failure_counter):
+                return FsmEvent.retry_get_data_limit
+        self.send(self.byte_cmd)
+        return FsmEvent.tx_get_cmd
+
+    def wait_data(self, event):
+        try:
+            self.rx_data()
+            self.wait_data_failure_counter = 0
+            return FsmEvent.data_rx
+        except (socket.timeout, SerialException):
+            logger.debug("data timeout")
+            return FsmEvent.timeout_data_not_rx
+        except CrcMismatch as e:
+            # data corrupted on the way, handled like lost data
+            logger.warning("crc mismatch: %s", e)
+            return FsmEvent.crc_mismatch_rx
+        except UnexpectedByte as e:
+            self.late_reply(e)
+            return FsmEvent.late_data_rx
+
+    def get_cmd_ok(self, event):
+        self.health_tracker.record_success()
+
+    def comms_failure(self, event):
+        logger.debug("last transition: %s", event.name)
+        if event == FsmEvent.nak_rx:
+            # board did reply
+            self.health_tracker.record_success()
+        else:
+            self.health_tracker.record_failure()
 
-    def wait_data(self, transition):
-        self.literal_state = "wait_data"
-        if transition == "ack_rx":
-            try:
-                # receive values
-                for rx_func in self.rx_function_list:
-                    rx_tuple = rx_func(self.com)
-                    self.rx_data_list.append(rx_tuple[0])
-                    self.rx_raw = self.rx_raw + rx_tuple[1]
-                # receive CRC
-                if self.rx_crc8_enabled:
-                    self.rx_crc = RX.byte(self.com)[1]
-                    self.rx_calculated_crc = GenCmd.compute_crc8(self.rx_raw)
-                    assert self.rx_crc == self.rx_calculated_crc
-                    self.rx_crc_is_valid = True
-                self.wait_data_failure_counter = 0
-                self.get_cmd_ok()
-            except (socket.timeout, SerialException):
-                logger.debug(f"data timeout")
-                self.rx_raw = b''
-                self.increment_retry_get("nth_timeout_data_not_rx")
-            except UnexpectedByte:
-                logger.warning("unexpected byte received")
-                self.comms_failure("unexpected_byte_rx")
-
-    def get_cmd_ok(self):
-        self.literal_state = "get_cmd_ok"
-        # close socket at end of transaction
-        if self.com.interface_type == InterfaceType.Wifi:
-            self.com.close_udp_socket()
-
-    def comms_failure(self, transition):
-        self.literal_state = "comms_failure"
-        if transition == "retry_get_ack>limit":
-            logger.debug(f"last transition: {transition}")
-        elif transition == "retry_get_data>limit":
-            logger.debug(f"last transition: {transition}")
-        elif transition == "nak_rx":
-            logger.debug(f"last transition: {transition}")
-        elif transition == "unexpected_byte_rx":
-            logger.debug(f"last transition: {transition}")
-        # close socket at end of transaction
-        if self.com.interface_type == InterfaceType.Wifi:
-            self.com.close_udp_socket()
-
-
-class SetCmdFSM:
+    # ===============================================================================
+    # Helper Functions
+    # ===============================================================================
+
+    def rx_reply(self):
+        """
+        rx ACK + data (+ crc) of a get command already sent, in a single attempt (used by CommandBatch)
+        :caveats: raise error on timeout, NAK, unexpected byte or crc mismatch
+        """
+        RX.ack(self.com)
+        self.rx_data()
+        self.state = GetState.get_cmd_ok
+
+
+class SetCmdFSM(CmdFSM):
     """
     uC communications finite state machine for SET Commands
     """
-
-    def __init__(self, com, set_byte_cmd, get_byte_cmd, rx_function_list, assertion_function, expected_data,
-                 rx_crc8_enabled=False):
+    state_enum = SetState
+    initial_state = SetState.comms_start
+    terminal_states = frozenset({SetState.set_cmd_ok, SetState.comms_failure, SetState.uc_failure})
+    ok_state = SetState.set_cmd_ok
+    metrics_kind = "set"
+    transition_table = {
+        (SetState.comms_start, FsmEvent.tx_set_cmd): SetState.wait_set_ack,
+        (SetState.wait_set_ack, FsmEvent.ack_rx_tx_get_cmd): SetState.wait_get_ack,
+        (SetState.wait_set_ack, FsmEvent.ack_not_rx_tx_verify_get_cmd): SetState.wait_verify_get_ack,
+        (SetState.wait_set_ack, FsmEvent.nak_rx): SetState.comms_failure,
+        (SetState.wait_set_ack, FsmEvent.late_ack_rx_tx_verify_get_cmd): SetState.wait_verify_get_ack,
+        (SetState.wait_get_ack, FsmEvent.ack_rx): SetState.wait_data,
+        (SetState.wait_get_ack, FsmEvent.timeout_ack_not_rx): SetState.increment_retry_get,
+        (SetState.wait_get_ack, FsmEvent.nak_rx): SetState.comms_failure,
+        (SetState.wait_get_ack, FsmEvent.late_ack_rx): SetState.increment_retry_get,
+        (SetState.wait_verify_get_ack, FsmEvent.ack_rx): SetState.wait_verify_data,
+        (SetState.wait_verify_get_ack, FsmEvent.timeout_ack_not_rx): SetState.increment_retry_verify_get,
+        (SetState.wait_verify_get_ack, FsmEvent.nak_rx): SetState.comms_failure,
+        (SetState.wait_verify_get_ack, FsmEvent.late_ack_rx): SetState.increment_retry_verify_get,
+        (SetState.increment_retry_get, FsmEvent.tx_get_cmd): SetState.wait_get_ack,
+        (SetState.increment_retry_get, FsmEvent.retry_get_ack_limit): SetState.comms_failure,
+        (SetState.increment_retry_get, FsmEvent.retry_get_data_limit): SetState.comms_failure,
+        (SetState.increment_retry_verify_get, FsmEvent.tx_verify_get_cmd): SetState.wait_verify_get_ack,
+        (SetState.increment_retry_verify_get, FsmEvent.retry_verify_get_ack_limit): SetState.comms_failure,
+        (SetState.increment_retry_verify_get, FsmEvent.retry_verify_get_data_limit): SetState.comms_failure,
+        (SetState.wait_data, FsmEvent.data_rx): SetState.assert_data,
+        (SetState.wait_data, FsmEvent.timeout_data_not_rx): SetState.increment_retry_get,
+        (SetState.wait_data, FsmEvent.crc_mismatch_rx): SetState.increment_retry_get,
+        (SetState.wait_data, FsmEvent.late_data_rx): SetState.increment_retry_get,
+        (SetState.wait_verify_data, FsmEvent.data_rx): SetState.assert_verify_data,
+        (SetState.wait_verify_data, FsmEvent.timeout_data_not_rx): SetState.increment_retry_verify_get,
+        (SetState.wait_verify_data, FsmEvent.crc_mismatch_rx): SetState.increment_retry_verify_get,
+        (SetState.wait_verify_data, FsmEvent.late_data_rx): SetState.increment_retry_verify_get,
+        (SetState.assert_data, FsmEvent.assert_ok): SetState.set_cmd_ok,
+        (SetState.assert_data, FsmEvent.invalid_assert): SetState.uc_failure,
+        (SetState.assert_verify_data, FsmEvent.assert_ok): SetState.set_cmd_ok,
+        (SetState.assert_verify_data, FsmEvent.invalid_assert_tx_set_cmd): SetState.wait_set_ack,
+        (SetState.assert_verify_data, FsmEvent.retry_verify_assert_data_limit): SetState.comms_failure,
+    }
+
+    def __init__(self, com, set_byte_cmd, get_byte_cmd, rx_schema, assertion_function, expected_data,
+                 rx_crc8_enabled=False, state_change_hook=None):
         """
         :param com: Interface object - communication interface (serial port or wifi udp socket)
         :param set_byte_cmd: byte string - set command used
         :param get_byte_cmd: byte string - get command used
-        :param rx_function_list: list function - list of receiving function used to parse data
+        :param rx_schema: ResponseSchema object - describes data returned by uC on get command
         :param assertion_function: function - used with expected_data to assert configured resource on uC
         :param expected_data: variable data type - expected value of resource configured on uC
         :param rx_crc8_enabled : bool - if true, expects to receive crc byte after data
+        :param state_change_hook: function - overrides CmdFSM.default_state_change_hook for this FSM
         """
-        self.com = com
+        super().__init__(com, rx_crc8_enabled=rx_crc8_enabled, state_change_hook=state_change_hook)
         self.set_byte_cmd = set_byte_cmd
         self.get_byte_cmd = get_byte_cmd
-        self.rx_function_list = rx_function_list
-        self.rx_data_list = []
-        self.rx_raw = b''
-        self.rx_crc = None
-        self.rx_calculated_crc = None
-        self.rx_crc_is_valid = False
-        self.rx_crc8_enabled = rx_crc8_enabled
+        self.metrics_byte_cmd = set_byte_cmd
+        self.rx_schema = rx_schema
         self.assertion_function = assertion_function
         self.expected_data = expected_data
 
-        self.literal_state = "comms_start"
         self.wait_get_ack_failure_counter = 0
         self.wait_data_failure_counter = 0
         self.wait_verify_get_ack_failure_counter = 0
         self.wait_verify_data_failure_counter = 0
         self.assert_verify_data_failure_counter = 0
-        self.wait_failure_limit = 10
-        self.wait_verify_failure_limit = 10
-        self.assert_verify_data_failure_limit = 10
-        logger.warning(f"Set cmd: {set_byte_cmd}")
-
-    def start_fsm(self):
-        # open socket at start of transaction
-        if self.com.interface_type == InterfaceType.Wifi:
-            self.com.open_udp_socket()
-        self.comms_start("start_comms")
+        logger.debug("Set cmd: %s", set_byte_cmd)
 
-    def restart_fsm(self):
-        # open socket at restart of transaction
-        if self.com.interface_type == InterfaceType.Wifi:
-            self.com.open_udp_socket()
+    def reset_counters(self):
         self.wait_get_ack_failure_counter = 0
         self.wait_data_failure_counter = 0
         self.wait_verify_get_ack_failure_counter = 0
         self.wait_verify_data_failure_counter = 0
         self.assert_verify_data_failure_counter = 0
-        self.comms_start("start_comms")
 
     # ===============================================================================
     # State Functions
     # ===============================================================================
 
-    def comms_start(self, transition):
-        self.literal_state = "comms_start"
-        if transition == 'start_comms':
-            self.com.write(self.set_byte_cmd)
-            self.wait_set_ack("tx_set_cmd")
-
-    def wait_set_ack(self, transition):
-        self.literal_state = "wait_set_ack"
-        if transition == "tx_set_cmd":
-            try:
-                RX.ack(self.com)
-                self.com.write(self.get_byte_cmd)
-                self.wait_get_ack("ack_rx+tx_get_cmd")
-            except (socket.timeout, SerialException):
-                logger.debug(f"set ack timeout")
-                self.com.write(self.get_byte_cmd)
-                self.wait_verify_get_ack("ack_not_rx+tx_verify_get_cmd")
-            except NakReceived:
-                logger.warning(f"get ack got Nak instead")
-                self.comms_failure("nak_rx")
-            except UnexpectedByte:
-                logger.warning("unexpected byte received")
-                self.comms_failure("unexpected_byte_rx")
-        elif transition == "invalid_assert+tx_set_cmd":
-            # 2nd time around because packet lost
-            try:
-                RX.ack(self.com)
-                self.com.write(self.get_byte_cmd)
-                self.wait_get_ack("ack_rx+tx_get_cmd")
-            except (socket.timeout, SerialException):
-                logger.debug(f"set ack timeout")
-                self.com.write(self.get_byte_cmd)
-                self.wait_verify_get_ack("ack_not_rx+tx_verify_get_cmd")
-            except NakReceived:
-                logger.warning(f"get ack got Nak instead")
-                self.comms_failure("nak_rx")
-            except UnexpectedByte:
-                logger.warning("unexpected byte received")
-                self.comms_failure("unexpected_byte_rx")
-
-    def wait_get_ack(self, transition):
-        self.literal_state = "wait_get_ack"
-        if transition == 'ack_rx+tx_get_cmd' or transition == 'tx_get_cmd':
-            try:
-                RX.ack(self.com)
-                self.wait_get_ack_failure_counter = 0
-                self.wait_data("ack_rx")
-            except (socket.timeout, SerialException):
-                logger.debug(f"get ack timeout")
-                self.increment_retry_get("nth_timeout_ack_not_rx")
-            except NakReceived:
-                logger.warning(f"get ack got Nak instead")
-                self.comms_failure("nak_rx")
-            except UnexpectedByte:
-                logger.warning("unexpected byte received")
-                self.comms_failure("unexpected_byte_rx")
-
-    def wait_verify_get_ack(self, transition):
-        self.literal_state = "wait_verify_get_ack"
-        if transition == "ack_not_rx+tx_verify_get_cmd" or transition == "tx_verify_get_cmd":
-            try:
-                RX.ack(self.com)
-                self.wait_verify_get_ack_failure_counter = 0
-                self.wait_verify_data("ack_rx")
-            except (socket.timeout, SerialException):
-                logger.debug(f"verify get ack timeout")
-                self.increment_retry_verify_get("nth_timeout_ack_not_rx")
-            except NakReceived:
-                logger.warning(f"get ack got Nak instead")
-                self.comms_failure("nak_rx")
-            except UnexpectedByte:
-                logger.warning("unexpected byte received")
-                self.comms_failure("unexpected_byte_rx")
-
-    def increment_retry_get(self, transition):
-        self.literal_state = "increment_retry_get"
-        if transition == "nth_timeout_ack_not_rx":
+    def comms_start(self, event):
+        self.send(self.set_byte_cmd)
+        return FsmEvent.tx_set_cmd
+
+    def wait_set_ack(self, event):
+        # event is tx_set_cmd, or invalid_assert_tx_set_cmd on 2nd time around because packet lost
+        try:
+            RX.ack(self.com)
+            self.ack_received()
+            self.send(self.get_byte_cmd)
+            return FsmEvent.ack_rx_tx_get_cmd
+        except (socket.timeout, SerialException):
+            logger.debug("set ack timeout")
+            self.send(self.get_byte_cmd)
+            return FsmEvent.ack_not_rx_tx_verify_get_cmd
+        except NakReceived:
+            logger.warning("get ack got Nak instead")
+            return FsmEvent.nak_rx
+        except UnexpectedByte as e:
+            # like a lost set ACK, the verify get command decides whether the set command was applied
+            self.late_reply(e)
+            self.send(self.get_byte_cmd)
+            return FsmEvent.late_ack_rx_tx_verify_get_cmd
+
+    def wait_get_ack(self, event):
+        try:
+            RX.ack(self.com)
+            self.ack_received()
+            self.wait_get_ack_failure_counter = 0
+            return FsmEvent.ack_rx
+        except (socket.timeout, SerialException):
+            logger.debug("get ack timeout")
+            return FsmEvent.timeout_ack_not_rx
+        except NakReceived:
+            logger.warning("get ack got Nak instead")
+            return FsmEvent.nak_rx
+        except UnexpectedByte as e:
+            self.late_reply(e)
+            return FsmEvent.late_ack_rx
+
+    def wait_verify_get_ack(self, event):
+        try:
+            RX.ack(self.com)
+            self.ack_received()
+            self.wait_verify_get_ack_failure_counter = 0
+            return FsmEvent.ack_rx
+        except (socket.timeout, SerialException):
+            logger.debug("verify get ack timeout")
+            return FsmEvent.timeout_ack_not_rx
+        except NakReceived:
+            logger.warning("get ack got Nak instead")
+            return FsmEvent.nak_rx
+        except UnexpectedByte as e:
+            self.late_reply(e)
+            return FsmEvent.late_ack_rx
+
+    def increment_retry_get(self, event):
+        if event in (FsmEvent.timeout_ack_not_rx, FsmEvent.late_ack_rx):
             self.wait_get_ack_failure_counter += 1
-            if self.wait_get_ack_failure_counter < self.wait_failure_limit:
-                self.com.write(self.get_byte_cmd)
-                self.wait_get_ack("tx_get_cmd")
-            else:
-                self.comms_failure("retry_get_ack>limit")
-        elif transition == "nth_timeout_data_not_rx":
+            if not self.retry_allowed(self.wait_get_ack_failure_counter):
+                return FsmEvent.retry_get_ack_limit
+        else:
             self.wait_data_failure_counter += 1
-            if self.wait_data_failure_counter < self.wait_failure_limit:
-                self.com.write(self.get_byte_cmd)
-                self.wait_get_ack("tx_get_cmd")
-            else:
-                self.comms_failure("retry_get_data>limit")
+            if not self.retry_allowed(self.wait_data_failure_counter):
+                return FsmEvent.retry_get_data_limit
+        self.send(self.get_byte_cmd)
+        return FsmEvent.tx_get_cmd
 
-    def increment_retry_verify_get(self, transition):
-        self.literal_state = "increment_retry_verify_get"
-        if transition == "nth_timeout_ack_not_rx":
+    def increment_retry_verify_get(self, event):
+        if event in (FsmEvent.timeout_ack_not_rx, FsmEvent.late_ack_rx):
             self.wait_verify_get_ack_failure_counter += 1
-            if self.wait_verify_get_ack_failure_counter < self.wait_verify_failure_limit:
-                self.com.write(self.get_byte_cmd)
-                self.wait_verify_get_ack("tx_verify_get_cmd")
-            else:
-                self.comms_failure("retry_verify_get_ack>limit")
-        elif transition == "nth_timeout_data_not_rx":
+            if not self.retry_allowed(self.wait_verify_get_ack_failure_counter):
+                return FsmEvent.retry_verify_get_ack_limit
+        else:
             self.wait_verify_data_failure_counter += 1
-            if self.wait_verify_data_failure_counter < self.wait_failure_limit:
-                self.com.write(self.get_byte_cmd)
-                self.wait_verify_get_ack("tx_verify_get_cmd")
+            if not self.retry_allowed(self.wait_verify_data_failure_counter):
+                return FsmEvent.retry_verify_get_data_limit
+        self.send(self.get_byte_cmd)
+        return FsmEvent.tx_verify_get_cmd
+
+    def wait_data(self, event):
+        try:
+            self.rx_data()
+            self.wait_data_failure_counter = 0
+            return FsmEvent.data_rx
+        except (socket.timeout, SerialException):
+            logger.debug("data timeout")
+            return FsmEvent.timeout_data_not_rx
+        except CrcMismatch as e:
+            # data corrupted on the way, handled like lost data
+            logger.warning("crc mismatch: %s", e)
+            return FsmEvent.crc_mismatch_rx
+        except UnexpectedByte as e:
+            self.late_reply(e)
+            return FsmEvent.late_data_rx
+
+    def wait_verify_data(self, event):
+        try:
+            self.rx_data()
+            self.wait_verify_data_failure_counter = 0
+            return FsmEvent.data_rx
+        except (socket.timeout, SerialException):
+            logger.debug("verfiy data timeout")
+            return FsmEvent.timeout_data_not_rx
+        except CrcMismatch as e:
+            # data corrupted on the way, handled like lost data
+            logger.warning("crc mismatch: %s", e)
+            return FsmEvent.crc_mismatch_rx
+        except UnexpectedByte as e:
+            self.late_reply(e)
+            return FsmEvent.late_data_rx
+
+    def assert_data(self, event):
+        try:
+            assert self.assertion_function(self.expected_data, self.rx_data_list)
+            return FsmEvent.assert_ok
+        except Exception as e:
+            logger.info("assertion failure: e: %s", e)
+            return FsmEvent.invalid_assert
+
+    def assert_verify_data(self, event):
+        try:
+            assert self.assertion_function(self.expected_data, self.rx_data_list)
+            self.assert_verify_data_failure_counter = 0
+            return FsmEvent.assert_ok
+        except Exception as e:
+            logger.info("assertion failure: e: %s", e)
+            self.assert_verify_data_failure_counter += 1
+            if self.retry_allowed(self.assert_verify_data_failure_counter):
+                self.send(self.set_byte_cmd)
+                return FsmEvent.invalid_assert_tx_set_cmd
             else:
-                self.comms_failure("retry_verify_get_data>limit")
+                return FsmEvent.retry_verify_assert_data_limit
 
-    def wait_data(self, transition):
-        self.literal_state = "wait_data"
-        if transition == "ack_rx":
-            try:
-                # receive values
-                for rx_func in self.rx_function_list:
-                    rx_tuple = rx_func(self.com)
-                    self.rx_data_list.append(rx_tuple[0])
-                    self.rx_raw = self.rx_raw + rx_tuple[1]
-                # receive CRC
-                if self.rx_crc8_enabled:
-                    self.rx_crc = RX.byte(self.com)[1]
-                    self.rx_calculated_crc = GenCmd.compute_crc8(self.rx_raw)
-                    assert self.rx_crc == self.rx_calculated_crc
-                    self.rx_crc_is_valid = True
-                self.wait_data_failure_counter = 0
-                self.assert_data("data_rx")
-            except (socket.timeout, SerialException):
-                logger.debug(f"data timeout")
-                self.rx_raw = b''
-                self.increment_retry_get("nth_timeout_data_not_rx")
-            except UnexpectedByte:
-                logger.warning("unexpected byte received")
-                self.comms_failure("unexpected_byte_rx")
-
-    def wait_verify_data(self, transition):
-        self.literal_state = "wait_verify_data"
-        if transition == "ack_rx":
-            try:
-                # receive values
-                for rx_func in self.rx_function_list:
-                    rx_tuple = rx_func(self.com)
-                    self.rx_data_list.append(rx_tuple[0])
-                    self.rx_raw = self.rx_raw + rx_tuple[1]
-                # receive CRC
-                if self.rx_crc8_enabled:
-                    self.rx_crc = RX.byte(self.com)[1]
-                    self.rx_calculated_crc = GenCmd.compute_crc8(self.rx_raw)
-                    assert self.rx_crc == self.rx_calculated_crc
-                    self.rx_crc_is_valid = True
-                self.wait_verify_data_failure_counter = 0
-                self.assert_verify_data("data_rx")
-            except (socket.timeout, SerialException):
-                logger.debug(f"verfiy data timeout")
-                self.rx_raw = b''
-                self.increment_retry_verify_get("nth_timeout_data_not_rx")
-            except UnexpectedByte:
-                logger.warning("unexpected byte received")
-                self.comms_failure("unexpected_byte_rx")
-
-    def assert_data(self, transition):
-        self.literal_state = "assert_data"
-        if transition == "data_rx":
+    def set_cmd_ok(self, event):
+        self.health_tracker.record_success()
+
+    def comms_failure(self, event):
+        if event == FsmEvent.nak_rx:
+            logger.debug("last transition: %s", event.name)
+        else:
+            logger.info("last transition: %s", event.name)
+        if event in (FsmEvent.nak_rx, FsmEvent.retry_verify_assert_data_limit):
+            # board did reply
+            self.health_tracker.record_success()
+        else:
+            self.health_tracker.record_failure()
+
+    def uc_failure(self, event):
+        self.health_tracker.record_success()
+
+
+class CommandBatch:
+    """
+    Pipelines several get commands: writes the byte commands back-to-back, then matches the ACK/data
+    stream to each request in the order they were sent
+    """
+    # error raised while reading a pipelined reply -> CommMetrics counter, timeouts otherwise
+    reply_error_counters = ((NakReceived, "naks"), (CrcMismatch, "crc_failures"), (UnexpectedByte, "late_replies"))
+
+    def __init__(self, com, rx_crc8_enabled=False, max_in_flight=8, window_retry_limit=1):
+        """
+        :param com: Interface object - communication interface (serial port or wifi udp socket)
+        :param rx_crc8_enabled : bool - if true, expects to receive crc byte after data
+        :param max_in_flight: int - max # of commands written before reading replies (uC serial rx buffer is small)
+        :param window_retry_limit: int - # of times a failed window is pipelined again before falling back to
+                                   one GetCmdFSM per command
+        """
+        self.com = com
+        self.rx_crc8_enabled = rx_crc8_enabled
+        self.max_in_flight = max_in_flight
+        self.window_retry_limit = window_retry_limit
+        self.fsm_list = []
+
+    def add(self, byte_cmd, rx_schema):
+        """
+        queues a get command
+        :param byte_cmd: byte string - get command used
+        :param rx_schema: ResponseSchema object - describes data returned by uC
+        :return: GetCmdFSM object - holds rx_data_list once batch has run
+        """
+        fsm = GetCmdFSM(self.com, byte_cmd, rx_schema, rx_crc8_enabled=self.rx_crc8_enabled)
+        self.fsm_list.append(fsm)
+        return fsm
+
+    def run(self):
+        """
+        runs all queued get commands
+        :return: list - rx_data_list of each queued command, in the order they were added
+        :caveats: raises FailedFSM if a command still fails after falling back to its own GetCmdFSM, or
+                  BoardUnavailable once the board is known to be unreachable
+        """
+        # the interface is held for the whole batch, fallback FSMs included
+        with self.com.lock:
             try:
-                assert self.assertion_function(self.expected_data, self.rx_data_list)
-                self.set_cmd_ok()
-            except Exception as e:
-                logger.info(f"assertion failure: e: {e}")
-                self.rx_raw = b''
-                self.uc_failure()
-
-    def assert_verify_data(self, transition):
-        self.literal_state = "assert_verify_data"
-        if transition == "data_rx":
+                self.com.health_tracker.before_command(self.com)
+            except BoardUnavailable:
+                self.com.metrics.record_rejected()
+                raise
+            if self.com.interface_type == InterfaceType.Wifi:
+                self.com.open_udp_socket()
+            for start in range(0, len(self.fsm_list), self.max_in_flight):
+                fsm_window = self.fsm_list[start:start + self.max_in_flight]
+                for _ in range(1 + self.window_retry_limit):
+                    window_ok = self.run_window(fsm_window)
+                    # don't pipeline again to a board known to be down, fallback fails fast (BoardUnavailable)
+                    if window_ok or not self.com.health_tracker.is_closed():
+                        break
+                if not window_ok:
+                    self.com.flush_input(settle_time=self.com.timeout)
+                    for fsm in fsm_window:
+                        fsm.start_fsm()
+        for fsm in self.fsm_list:
+            if fsm.literal_state != "get_cmd_ok":
+                raise FailedFSM(f"State: {fsm.literal_state} cmd: {fsm.byte_cmd}")
+        return [fsm.rx_data_list for fsm in self.fsm_list]
+
+    def run_window(self, fsm_window):
+        """
+        writes a window of get commands back-to-back and matches the replies
+        :param fsm_window: list GetCmdFSM - commands to pipeline
+        :return: bool - True if every reply of the window was received and valid
+        :caveats: replies are not tagged by the uC, a lost command shifts every following reply, so a window is
+                  only accepted when the complete stream was received. Otherwise none of its replies are kept
+        """
+        # replies of earlier attempts still pending would shift the whole window
+        self.com.begin_attempt()
+        start = time.perf_counter()
+        for fsm in fsm_window:
+            logger.debug("batch tx: %s", fsm.byte_cmd)
+            self.com.write(fsm.byte_cmd)
+        for i, fsm in enumerate(fsm_window):
             try:
-                assert self.assertion_function(self.expected_data, self.rx_data_list)
-                self.assert_verify_data_failure_counter = 0
-                self.set_cmd_ok()
-            except Exception as e:
-                logger.info(f"assertion failure: e: {e}")
-                self.rx_raw = b''
-                self.assert_verify_data_failure_counter += 1
-                if self.assert_verify_data_failure_counter < self.assert_verify_data_failure_limit:
-                    self.com.write(self.set_byte_cmd)
-                    self.wait_set_ack("invalid_assert+tx_set_cmd")
+                fsm.rx_reply()
+            except (socket.timeout, SerialException, NakReceived, UnexpectedByte, CrcMismatch) as e:
+                logger.debug("batch reply #%s of %s failed (%s), dropping window", i, len(fsm_window),
+                             type(e).__name__)
+                self.com.metrics.increment(next((counter_name for error_type, counter_name in
+                                                 CommandBatch.reply_error_counters if isinstance(e, error_type)),
+                                                "timeouts"))
+                self.com.metrics.record_batch_window(len(fsm_window), time.perf_counter() - start, False)
+                for failed_fsm in fsm_window:
+                    failed_fsm.state = GetState.comms_start
+                # let replies still in flight land before the window is sent again
+                self.com.flush_input(settle_time=self.com.timeout)
+                return False
+        self.com.metrics.record_batch_window(len(fsm_window), time.perf_counter() - start, True)
+        self.com.health_tracker.record_success()
+        return True
+
+
+class CRC8:
+    """
+    Class of static methods to compute CRC-8 with a 256-entry lookup table
+    same parameters as the uC (Comms::prep_crc_generator): polynomial 0x07, init 0x00, not reflected, no final xor
+    """
+    polynomial = 0x07
+    # filled right after class definition (CRC8.generate_table)
+    table = b''
+
+    @staticmethod
+    def generate_table(polynomial):
+        """
+        :param polynomial: int - crc polynomial (without the x^8 term)
+        :return: bytes - crc of every single byte value, indexed by byte value
+        """
+        table = bytearray(256)
+        for byte_value in range(256):
+            crc = byte_value
+            for _ in range(8):
+                if crc & 0x80:
+                    crc = ((crc << 1) ^ polynomial) & 0xFF
                 else:
-                    self.comms_failure("retry_verify_assert_data>limit")
-
-    def set_cmd_ok(self):
-        self.literal_state = "set_cmd_ok"
-        # close socket at end of transaction
-        if self.com.interface_type == InterfaceType.Wifi:
-            self.com.close_udp_socket()
-
-    def comms_failure(self, transition):
-        self.literal_state = "comms_failure"
-        if transition == "retry_get_ack>limit":
-            logger.info(f"last transition: {transition}")
-        elif transition == "retry_get_data>limit":
-            logger.info(f"last transition: {transition}")
-        if transition == "retry_verify_get_ack>limit":
-            logger.info(f"last transition: {transition}")
-        elif transition == "retry_verify_get_data>limit":
-            logger.info(f"last transition: {transition}")
-        elif transition == "retry_verify_assert_data>limit":
-            logger.info(f"last transition: {transition}")
-        elif transition == "nak_rx":
-            logger.debug(f"last transition: {transition}")
-        elif transition == "unexpected_byte_rx":
-            logger.debug(f"last transition: {transition}")
-        # close socket at end of transaction
-        if self.com.interface_type == InterfaceType.Wifi:
-            self.com.close_udp_socket()
-
-    def uc_failure(self):
-        self.literal_state = "uc_failure"
-        # close socket at end of transaction
-        if self.com.interface_type == InterfaceType.Wifi:
-            self.com.close_udp_socket()
+                    crc = (crc << 1) & 0xFF
+            table[byte_value] = crc
+        return bytes(table)
+
+    @staticmethod
+    def update(crc, data):
+        """
+        :param crc: int - crc of the data processed so far (0 to start)
+        :param data: bytes / bytearray / memoryview - next chunk of data
+        :return: int - crc including data
+        :caveats: doesn't copy data, a memoryview slice of a larger buffer can be passed as is
+        """
+        table = CRC8.table
+        for byte_value in data:
+            crc = table[crc ^ byte_value]
+        return crc
+
+    @staticmethod
+    def compute(data):
+        """
+        :param data: bytes / bytearray / memoryview - payload
+        :return: int - crc value
+        """
+        return CRC8.update(0, data)
+
+    @staticmethod
+    def is_valid(data, rx_crc):
+        """
+        :param data: bytes / bytearray / memoryview - received payload
+        :param rx_crc: int - received crc byte
+        :return: bool - True if payload matches crc
+        """
+        return CRC8.update(0, data) == rx_crc
+
+
+CRC8.table = CRC8.generate_table(CRC8.polynomial)
 
 
 class GenCmd:
     """
     Class of static methods to generate byte commands to be send to
     arduino uC via communication interface
+    :caveats: commands that only depend on their arguments are memoized (lru_cache), the same byte string is
+              returned for the same arguments. Commands holding a time (date/time, alarm, timer) are always rebuilt
     """
     detected_os = OSDetection.get_os_type()
 
     @staticmethod
+    @lru_cache(maxsize=128)
     def get_system_time(append_crc8=False):
         """
         generates command to get system time
@@ -1705,6 +3050,7 @@ class GenCmd:
         return GenCmd.generate_byte_string_cmd('TGT', append_crc8=append_crc8)
 
     @staticmethod
+    @lru_cache(maxsize=128)
     def get_rtc_time(append_crc8=False):
         """
         generates command to get rtc time
@@ -1714,6 +3060,7 @@ class GenCmd:
         return GenCmd.generate_byte_string_cmd('TGR', append_crc8=append_crc8)
 
     @staticmethod
+    @lru_cache(maxsize=128)
     def get_rtc_config_flag(append_crc8=False):
         """
         generates command to get rtc config flag
@@ -1723,6 +3070,7 @@ class GenCmd:
         return GenCmd.generate_byte_string_cmd('TGC', append_crc8=append_crc8)
 
     @staticmethod
+    @lru_cache(maxsize=128)
     def get_rtc_parse_flag(append_crc8=False):
         """
         generates command to get rtc parse flag
@@ -1732,6 +3080,7 @@ class GenCmd:
         return GenCmd.generate_byte_string_cmd('TGP', append_crc8=append_crc8)
 
     @staticmethod
+    @lru_cache(maxsize=128)
     def get_master_alarm_enable(append_crc8=False):
         """
         generates command to get master alarm enable flag
@@ -1741,6 +3090,7 @@ class GenCmd:
         return GenCmd.generate_byte_string_cmd('EGM', append_crc8=append_crc8)
 
     @staticmethod
+    @lru_cache(maxsize=128)
     def get_system_time_flag(append_crc8=False):
         """
         generates command to get system time flag
@@ -1750,6 +3100,7 @@ class GenCmd:
         return GenCmd.generate_byte_string_cmd('TGS', append_crc8=append_crc8)
 
     @staticmethod
+    @lru_cache(maxsize=128)
     def get_number_probes(append_crc8=False):
         """
         generates command to get number of temperature probes
@@ -1759,6 +3110,7 @@ class GenCmd:
         return GenCmd.generate_byte_string_cmd('KGN', append_crc8=append_crc8)
 
     @staticmethod
+    @lru_cache(maxsize=128)
     def get_wifi_status(append_crc8=False):
         """
         generates command to get wifi status
@@ -1768,6 +3120,7 @@ class GenCmd:
         return GenCmd.generate_byte_string_cmd('WGS', append_crc8=append_crc8)
 
     @staticmethod
+    @lru_cache(maxsize=128)
     def get_wifi_ip_address(append_crc8=False):
         """
         generates command to get wifi status
@@ -1777,6 +3130,7 @@ class GenCmd:
         return GenCmd.generate_byte_string_cmd('WGI', append_crc8=append_crc8)
 
     @staticmethod
+    @lru_cache(maxsize=128)
     def get_wifi_rssi(append_crc8=False):
         """
         generates command to get wifi rssi (dbm signal strength)
@@ -1786,6 +3140,7 @@ class GenCmd:
         return GenCmd.generate_byte_string_cmd('WGT', append_crc8=append_crc8)
 
     @staticmethod
+    @lru_cache(maxsize=128)
     def get_clear_eeprom_count(append_crc8=False):
         """
         generates command to get clear eeprom count
@@ -1795,6 +3150,7 @@ class GenCmd:
         return GenCmd.generate_byte_string_cmd('EGK', append_crc8=append_crc8)
 
     @staticmethod
+    @lru_cache(maxsize=128)
     def set_clear_eeprom(append_crc8=False):
         """
         generates command to set clear eeprom
@@ -1804,6 +3160,7 @@ class GenCmd:
         return GenCmd.generate_byte_string_cmd('ESA', append_crc8=append_crc8)
 
     @staticmethod
+    @lru_cache(maxsize=128)
     def get_set_expected_io_count(append_crc8=False):
         """
         generates command to get set expectd io count
@@ -1813,6 +3170,7 @@ class GenCmd:
         return GenCmd.generate_byte_string_cmd('EGX', append_crc8=append_crc8)
 
     @staticmethod
+    @lru_cache(maxsize=128)
     def get_io_state(io_type="ssr", io_num=1, append_crc8=False):
         """
         generates command to get io state in bytes format
@@ -1836,10 +3194,10 @@ class GenCmd:
             raise UnexpectedIONum(f"unexpected output #: {io_num}")
         cmd_string = f"{type_char}G{io_num}"
         cmd_byte = GenCmd.generate_byte_string_cmd(cmd_string, append_crc8=append_crc8)
-        logger.debug(cmd_byte)
         return cmd_byte
 
     @staticmethod
+    @lru_cache(maxsize=128)
     def set_io_state(output_type="ssr", output_num=1, output_state=True, append_crc8=False):
         """
         generates command to set io state in bytes format
@@ -1864,10 +3222,10 @@ class GenCmd:
             state_char = "0"
         cmd_string = f"{type_char}S{output_num}{state_char}"
         cmd_byte = GenCmd.generate_byte_string_cmd(cmd_string, append_crc8=append_crc8)
-        logger.debug(cmd_byte)
         return cmd_byte
 
     @staticmethod
+    @lru_cache(maxsize=128)
     def get_input_pulse_count(input_num=1, append_crc8=False):
         """
         generates command to get push/latch button pulse (falling edge) count in bytes format
@@ -1880,10 +3238,10 @@ class GenCmd:
             raise UnexpectedIONum(f"unexpected input #: {input_num}")
         cmd_string = f"IG{input_num}"
         cmd_byte = GenCmd.generate_byte_string_cmd(cmd_string, append_crc8=append_crc8)
-        logger.debug(cmd_byte)
         return cmd_byte
 
     @staticmethod
+    @lru_cache(maxsize=128)
     def get_opto_pulse_count(output_num=1, append_crc8=False):
         """
         generates command to get opto pulse count in bytes format
@@ -1896,10 +3254,10 @@ class GenCmd:
             raise UnexpectedIONum(f"unexpected output #: {output_num}")
         cmd_string = f"LG{output_num}"
         cmd_byte = GenCmd.generate_byte_string_cmd(cmd_string, append_crc8=append_crc8)
-        logger.debug(cmd_byte)
         return cmd_byte
 
     @staticmethod
+    @lru_cache(maxsize=128)
     def pulse_opto_output(output_num=1, n=1, append_crc8=False):
         """
         generates command to pulse opto output (n # of times) in bytes format
@@ -1915,10 +3273,10 @@ class GenCmd:
             raise InvalidPulseAmount(f"unexpected n #: {n}")
         cmd_string = f"LS{output_num}{n}"
         cmd_byte = GenCmd.generate_byte_string_cmd(cmd_string, append_crc8=append_crc8)
-        logger.debug(cmd_byte)
         return cmd_byte
 
     @staticmethod
+    @lru_cache(maxsize=128)
     def get_analog_reading(input_num=1, append_crc8=False):
         """
         generates command to get analog reading in bytes format
@@ -1932,10 +3290,10 @@ class GenCmd:
 
         cmd_string = f"AGR{input_num}"
         cmd_byte = GenCmd.generate_byte_string_cmd(cmd_string, append_crc8=append_crc8)
-        logger.debug(cmd_byte)
         return cmd_byte
 
     @staticmethod
+    @lru_cache(maxsize=128)
     def get_probe_recognition(input_num=1, append_crc8=False):
         """
         generates command to get temperature probe recognition flag in bytes format
@@ -1949,10 +3307,10 @@ class GenCmd:
 
         cmd_string = f"KGR{input_num}"
         cmd_byte = GenCmd.generate_byte_string_cmd(cmd_string, append_crc8=append_crc8)
-        logger.debug(cmd_byte)
         return cmd_byte
 
     @staticmethod
+    @lru_cache(maxsize=128)
     def get_probe_reading(input_num=1, append_crc8=False):
         """
         generates command to get probe temperature reading (celsius) in bytes format
@@ -1966,7 +3324,6 @@ class GenCmd:
 
         cmd_string = f"KGC{input_num}"
         cmd_byte = GenCmd.generate_byte_string_cmd(cmd_string, append_crc8=append_crc8)
-        logger.debug(cmd_byte)
         return cmd_byte
 
     @staticmethod
@@ -2031,6 +3388,7 @@ class GenCmd:
         return full_byte_cmd
 
     @staticmethod
+    @lru_cache(maxsize=128)
     def get_output_alarm(output_type="ssr", output_num=1, on_off=True, append_crc8=False):
         """
         generates full command to get output alarm in bytes format
@@ -2053,10 +3411,10 @@ class GenCmd:
             state_char = "0"
         cmd_string = f"EG{type_char}{output_num}{state_char}"
         cmd_byte = GenCmd.generate_byte_string_cmd(cmd_string, append_crc8=append_crc8)
-        logger.debug(cmd_byte)
         return cmd_byte
 
     @staticmethod
+    @lru_cache(maxsize=128)
     def set_master_alarm_enable(master_alarm_enable=True, append_crc8=False):
         """
         generates full command to set master alarm enable
@@ -2070,10 +3428,10 @@ class GenCmd:
             enable_char = "0"
         cmd_string = f"ESM{enable_char}"
         cmd_byte = GenCmd.generate_byte_string_cmd(cmd_string, append_crc8=append_crc8)
-        logger.debug(cmd_byte)
         return cmd_byte
 
     @staticmethod
+    @lru_cache(maxsize=128)
     def set_output_alarm_mode(output_num=1, mode=True, append_crc8=False):
         """
         generates full command to set output alarm mode in bytes format
@@ -2093,10 +3451,10 @@ class GenCmd:
             mode_char = "0"
         cmd_string = f"ESO{output_num}{mode_char}"
         cmd_byte = GenCmd.generate_byte_string_cmd(cmd_string, append_crc8=append_crc8)
-        logger.debug(cmd_byte)
         return cmd_byte
 
     @staticmethod
+    @lru_cache(maxsize=128)
     def get_output_alarm_mode(io_num=1, append_crc8=False):
         """
         generates command to get io alarm mode in bytes format
@@ -2109,7 +3467,6 @@ class GenCmd:
             raise UnexpectedIONum(f"unexpected output #: {io_num}")
         cmd_string = f"EGO{io_num}"
         cmd_byte = GenCmd.generate_byte_string_cmd(cmd_string, append_crc8=append_crc8)
-        logger.debug(cmd_byte)
         return cmd_byte
 
     @staticmethod
@@ -2145,6 +3502,7 @@ class GenCmd:
         return full_byte_cmd
 
     @staticmethod
+    @lru_cache(maxsize=128)
     def set_expected_io_state(output_type="ssr", output_num=1, append_crc8=False):
         """
         generates command to set expected io state depending on configured alarms
@@ -2162,7 +3520,6 @@ class GenCmd:
             raise UnexpectedIONum(f"unexpected output #: {output_num}")
         cmd_string = f"ESX{type_char}{output_num}"
         cmd_byte = GenCmd.generate_byte_string_cmd(cmd_string, append_crc8=append_crc8)
-        logger.debug(cmd_byte)
         return cmd_byte
 
     # helper functions
@@ -2256,11 +3613,7 @@ class GenCmd:
         :param payload: byte string - command payload
         :return:  byte string - crc value
         """
-        crc_generator = crc8()
-        crc_generator.update(payload)
-        calculated_crc = crc_generator.digest()
-        logger.debug(f"Calculated CRC: {calculated_crc}")
-        return calculated_crc
+        return bytes((CRC8.compute(payload),))
 
     @staticmethod
     def generate_byte_string_cmd(cmd_string, append_crc8=False):
@@ -2269,11 +3622,11 @@ class GenCmd:
         :param append_crc8: bool - if true, calculate and append crc8 at end of command
         :return:  byte string - with crc appended or not
         """
+        payload = bytes(cmd_string, "ascii")
         if append_crc8:
-            calculated_crc = GenCmd.compute_crc8(bytes(cmd_string, "ascii"))
-            return b'[' + bytes(cmd_string, "ascii") + calculated_crc + b']'
+            return b'[' + payload + bytes((CRC8.compute(payload),)) + b']'
         else:
-            return b'[' + bytes(cmd_string, "ascii") + b']'
+            return b'[' + payload + b']'
 
 
 class InterpretOutput:
@@ -0,0 +1,517 @@
+# general libraries
+import logging as logger
+import os
+import random
+import select
+import socket
+import struct
+import threading
+import time
+from datetime import datetime, timedelta
+# custom libraries
+from tools.arduino_resources import CRC8
+
+
+class LinkConditions:
+    """
+    Class to describe how a simulated link misbehaves: reply latency, packet loss and reordering
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, loss=0.0, reorder=0.0, seed=None):
+        """
+        :param latency: float - delay before the board replies to a command (sec)
+        :param jitter: float - random extra delay added to latency, uniform in [0, jitter] (sec)
+        :param loss: float - probability [0-1] of dropping a command, and of dropping each reply datagram (udp only)
+        :param reorder: float - probability [0-1] of swapping a reply datagram with the next one (udp only)
+        :param seed: int - random seed, to replay the same losses
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self.reorder = reorder
+        self.rng = random.Random(seed)
+
+    def get_delay(self):
+        """
+        :return: float - delay before reply (sec)
+        """
+        if self.jitter:
+            return self.latency + self.rng.uniform(0, self.jitter)
+        return self.latency
+
+    def is_lost(self):
+        """
+        :return: bool - True if packet must be dropped
+        """
+        return self.loss > 0 and self.rng.random() < self.loss
+
+    def is_reordered(self):
+        """
+        :return: bool - True if datagram must be swapped with next one
+        """
+        return self.reorder > 0 and self.rng.random() < self.reorder
+
+
+class SimulatedBoard:
+    """
+    Class to simulate the uC command parser (src/Comms.cpp) and the state of the resources it controls
+    :caveats: replies are returned as a list of byte strings, one per byte, like the uC sends them
+    """
+    ack = b'\x06'
+    nak = b'\x15'
+    start_marker = ord('[')
+    end_marker = ord(']')
+    max_data_length = 32
+    float_struct = struct.Struct('>f')
+    long_struct = struct.Struct('>l')
+
+    def __init__(self, rx_crc8_enabled=False, tx_crc8_enabled=False, ip_address="127.0.0.1", wifi_rssi=-55,
+                 probe_readings=None, analog_readings=None):
+        """
+        :param rx_crc8_enabled: bool - if true, commands must end with a crc byte (NAK otherwise)
+        :param tx_crc8_enabled: bool - if true, data replies end with a crc byte
+        :param ip_address: str - ip address reported by wifi ip command
+        :param wifi_rssi: int - rssi reported by wifi rssi command (dBm)
+        :param probe_readings: list float - temperature of the 4 probes (celsius)
+        :param analog_readings: list float - value of the 2 analog inputs
+        """
+        self.rx_crc8_enabled = rx_crc8_enabled
+        self.tx_crc8_enabled = tx_crc8_enabled
+        self.lock = threading.Lock()
+        self.ip_address = [int(x) for x in ip_address.split(".")]
+        self.wifi_status = 3  # WL_CONNECTED
+        self.wifi_rssi = wifi_rssi
+        self.ssr_outputs = [False] * 4
+        self.opto_outputs = [False] * 4
+        self.opto_pulse_counts = [0] * 4
+        self.input_states = [True] * 2
+        self.input_pulse_counts = [0] * 2
+        self.probe_readings = probe_readings if probe_readings else [21.5] * 4
+        self.analog_readings = analog_readings if analog_readings else [1.5] * 2
+        self.rtc_configured = True
+        self.time_set = True
+        self.parsing_failure = False
+        self.time_offset = timedelta()
+        self.master_alarm_enable = True
+        self.alarm_modes = [0] * 4
+        # (output, on_off) -> [enable, hour, minute, second]
+        self.alarms = {(output, on_off): [0, 0, 0, 0] for output in range(1, 5) for on_off in (True, False)}
+        self.clear_eeprom_count = 0
+        self.set_expected_io_count = 0
+        self.command_count = 0
+        self.nak_count = 0
+
+    # ===============================================================================
+    # Framing
+    # ===============================================================================
+
+    def handle_udp_packet(self, packet):
+        """
+        same framing as Comms::get_udp_packet, the whole command is in one datagram
+
+        :param packet: byte string - received datagram
+        :return: list byte string - reply bytes
+        """
+        if not packet or packet[0] != self.start_marker:
+            return []
+        num_byte_rx = 0
+        command = bytearray()
+        packet_size = len(packet)
+        while num_byte_rx < packet_size - 1 and num_byte_rx < self.max_data_length:
+            rc = packet[num_byte_rx + 1]
+            if rc != self.end_marker:
+                command.append(rc)
+                num_byte_rx += 1
+            else:
+                # check for case where crc = end marker ']'
+                if self.rx_crc8_enabled and num_byte_rx + 2 < packet_size and packet[num_byte_rx + 2] == rc:
+                    command.append(rc)
+                return self.handle_command(bytes(command))
+        return []
+
+    def handle_command(self, command):
+        """
+        checks crc of a complete command (markers removed) and parses it
+
+        :param command: byte string - command, with crc byte as last byte if rx crc is enabled
+        :return: list byte string - reply bytes
+        """
+        with self.lock:
+            self.command_count += 1
+            if self.rx_crc8_enabled:
+                if len(command) < 2 or not CRC8.is_valid(memoryview(command)[:-1], command[-1]):
+                    return self.reply_nak()
+                command = command[:-1]
+            return self.parse_packet(command.decode("ascii", errors="replace"))
+
+    # ===============================================================================
+    # Parsing (one function per command family, see Comms::parse_packet)
+    # ===============================================================================
+
+    def parse_packet(self, rx_chars):
+        """
+        :param rx_chars: str - command without markers and crc, i.e. CG1
+        :return: list byte string - reply bytes
+        """
+        # pad so short commands read as invalid chars instead of raising IndexError
+        padded = rx_chars + "\0" * 8
+        parsers = {'T': self.parse_rtc_time_packet,
+                   'E': self.parse_alarm_packet,
+                   'K': self.parse_temperature_packet,
+                   'P': self.parse_pushbutton_state_packet,
+                   'I': self.parse_pushbutton_pulse_cnt_packet,
+                   'C': self.parse_ssr_packet,
+                   'D': self.parse_opto_packet,
+                   'L': self.parse_opto_pulse_cnt_packet,
+                   'A': self.parse_probe_packet,
+                   'W': self.parse_network_info_packet}
+        parser = parsers.get(padded[0])
+        if parser is None:
+            return self.reply_nak()
+        return parser(len(rx_chars), padded)
+
+    def parse_rtc_time_packet(self, num_byte_rx, rx_chars):
+        if rx_chars[1] == 'G':
+            if rx_chars[2] in ('T', 'R'):
+                now = datetime.now() + self.time_offset
+                return self.send_packet([now.year >> 8, now.year & 0xFF, now.month, now.day,
+                                         now.hour, now.minute, now.second])
+            elif rx_chars[2] == 'C':
+                return self.send_packet([int(self.rtc_configured)])
+            elif rx_chars[2] == 'P':
+                return self.send_packet([int(self.parsing_failure)])
+            elif rx_chars[2] == 'S':
+                return self.send_packet([int(self.time_set)])
+        elif rx_chars[1] == 'S' and num_byte_rx == 22:
+            # TSMar 03 2021|11:47:42
+            try:
+                dt_obj = datetime.strptime(f"{rx_chars[2:13]} {rx_chars[14:22]}", "%b %d %Y %H:%M:%S")
+            except ValueError:
+                self.parsing_failure = True
+                return self.reply_nak()
+            self.time_offset = dt_obj - datetime.now()
+            self.parsing_failure = False
+            self.time_set = True
+            return [self.ack]
+        return self.reply_nak()
+
+    def parse_alarm_packet(self, num_byte_rx, rx_chars):
+        io_num = self.char_to_int(rx_chars[3])
+        if rx_chars[1] == 'G':
+            if rx_chars[2] == 'C' and 1 <= io_num <= 4:
+                return self.send_packet(self.alarms[(io_num, self.char_to_bool(rx_chars[4]))])
+            elif rx_chars[2] == 'M':
+                return self.send_packet([int(self.master_alarm_enable)])
+            elif rx_chars[2] == 'K':
+                return self.send_packet([self.clear_eeprom_count >> 8, self.clear_eeprom_count & 0xFF])
+            elif rx_chars[2] == 'X':
+                return self.send_packet([self.set_expected_io_count >> 8, self.set_expected_io_count & 0xFF])
+            elif rx_chars[2] == 'O' and 1 <= io_num <= 4:
+                return self.send_packet([self.alarm_modes[io_num - 1]])
+        elif rx_chars[1] == 'S':
+            if rx_chars[2] in ('C', 'T') and num_byte_rx == 15 and 1 <= io_num <= 4:
+                # ESC110|11:15:03 or EST311|02:30:00
+                self.config_alarm_or_timer(rx_chars, alarm_timer=rx_chars[2] == 'C')
+                self.ssr_outputs[io_num - 1] = False
+                return [self.ack]
+            elif rx_chars[2] == 'M':
+                self.master_alarm_enable = self.char_to_bool(rx_chars[3])
+                return [self.ack]
+            elif rx_chars[2] == 'A':
+                self.clear_eeprom_count += 1
+                for key in self.alarms:
+                    self.alarms[key] = [0, 0, 0, 0]
+                return [self.ack]
+            elif rx_chars[2] == 'X' and rx_chars[3] == 'C':
+                io_num = self.char_to_int(rx_chars[4])
+                if 1 <= io_num <= 4:
+                    self.set_expected_io_count += 1
+                    return [self.ack]
+            elif rx_chars[2] == 'O' and 1 <= io_num <= 4:
+                self.alarm_modes[io_num - 1] = int(self.char_to_bool(rx_chars[4]))
+                return [self.ack]
+        return self.reply_nak()
+
+    def parse_temperature_packet(self, num_byte_rx, rx_chars):
+        io_num = self.char_to_int(rx_chars[3])
+        if rx_chars[1] == 'G':
+            if rx_chars[2] == 'N':
+                return self.send_packet([0, len(self.probe_readings)])
+            elif rx_chars[2] == 'R' and 1 <= io_num <= 4:
+                return self.send_packet([1])
+            elif rx_chars[2] == 'C' and 1 <= io_num <= 4:
+                return self.send_packet(self.float_struct.pack(self.probe_readings[io_num - 1]))
+            return self.reply_nak()
+        # no reply at all from the uC on an unknown K command
+        return []
+
+    def parse_pushbutton_state_packet(self, num_byte_rx, rx_chars):
+        io_num = self.char_to_int(rx_chars[2])
+        if rx_chars[1] == 'G' and io_num in (1, 2):
+            return self.send_packet([int(self.input_states[io_num - 1])])
+        return self.reply_nak()
+
+    def parse_pushbutton_pulse_cnt_packet(self, num_byte_rx, rx_chars):
+        io_num = self.char_to_int(rx_chars[2])
+        if rx_chars[1] == 'G' and io_num in (1, 2):
+            count = self.input_pulse_counts[io_num - 1]
+            return self.send_packet([(count >> 8) & 0xFF, count & 0xFF])
+        return self.reply_nak()
+
+    def parse_ssr_packet(self, num_byte_rx, rx_chars):
+        return self.parse_output_packet(rx_chars, self.ssr_outputs)
+
+    def parse_opto_packet(self, num_byte_rx, rx_chars):
+        return self.parse_output_packet(rx_chars, self.opto_outputs)
+
+    def parse_output_packet(self, rx_chars, outputs):
+        io_num = self.char_to_int(rx_chars[2])
+        if 1 <= io_num <= 4:
+            if rx_chars[1] == 'G':
+                return self.send_packet([int(outputs[io_num - 1])])
+            elif rx_chars[1] == 'S':
+                outputs[io_num - 1] = self.char_to_bool(rx_chars[3])
+                return [self.ack]
+        return self.reply_nak()
+
+    def parse_opto_pulse_cnt_packet(self, num_byte_rx, rx_chars):
+        io_num = self.char_to_int(rx_chars[2])
+        if 1 <= io_num <= 4:
+            if rx_chars[1] == 'G':
+                count = self.opto_pulse_counts[io_num - 1]
+                return self.send_packet([(count >> 8) & 0xFF, count & 0xFF])
+            elif rx_chars[1] == 'S' and 1 <= self.char_to_int(rx_chars[3]) <= 9:
+                self.opto_pulse_counts[io_num - 1] += self.char_to_int(rx_chars[3])
+                return [self.ack]
+        return self.reply_nak()
+
+    def parse_probe_packet(self, num_byte_rx, rx_chars):
+        io_num = self.char_to_int(rx_chars[3])
+        if rx_chars[1] == 'G' and rx_chars[2] == 'R' and io_num in (1, 2):
+            return self.send_packet(self.float_struct.pack(self.analog_readings[io_num - 1]))
+        return self.reply_nak()
+
+    def parse_network_info_packet(self, num_byte_rx, rx_chars):
+        if rx_chars[1] == 'G':
+            if rx_chars[2] == 'S':
+                return self.send_packet([self.wifi_status >> 8, self.wifi_status & 0xFF])
+            elif rx_chars[2] == 'I':
+                return self.send_packet(self.ip_address)
+            elif rx_chars[2] == 'T':
+                return self.send_packet(self.long_struct.pack(self.wifi_rssi))
+        return self.reply_nak()
+
+    # ===============================================================================
+    # Helper Functions
+    # ===============================================================================
+
+    def config_alarm_or_timer(self, rx_chars, alarm_timer):
+        """
+        :param rx_chars: str - alarm or timer set command, i.e. ESC110|11:15:03
+        :param alarm_timer: bool - True for an alarm, False for a timer
+        :caveats: like the uC, an invalid time disables the alarm instead of being refused
+        """
+        io_num = self.char_to_int(rx_chars[3])
+        on_off = self.char_to_bool(rx_chars[4])
+        enable = int(self.char_to_bool(rx_chars[5]))
+        try:
+            hms = [int(x) for x in rx_chars[7:15].split(":")]
+            valid = len(hms) == 3 and (not alarm_timer or (hms[0] <= 23 and hms[1] <= 59 and hms[2] <= 59))
+        except ValueError:
+            valid = False
+        if valid and self.time_set:
+            self.alarms[(io_num, on_off)] = [enable] + hms
+        else:
+            self.alarms[(io_num, on_off)] = [0, 0, 0, 0]
+
+    def send_packet(self, data):
+        """
+        :param data: list int / byte string - data bytes of the reply
+        :return: list byte string - ACK, data bytes (+ crc)
+        """
+        data = bytes(data)
+        reply = [self.ack] + [data[i:i + 1] for i in range(len(data))]
+        if self.tx_crc8_enabled:
+            reply.append(bytes((CRC8.compute(data),)))
+        return reply
+
+    def reply_nak(self):
+        self.nak_count += 1
+        return [self.nak]
+
+    @staticmethod
+    def char_to_int(character):
+        return ord(character) - ord('0')
+
+    @staticmethod
+    def char_to_bool(character):
+        return SimulatedBoard.char_to_int(character) != 0
+
+
+class UdpSimulator:
+    """
+    Class to serve a SimulatedBoard on a local udp port, each reply byte is sent in its own datagram like the uC
+    """
+
+    def __init__(self, board=None, ip_address="127.0.0.1", udp_port=2390, link=None):
+        """
+        :param board: SimulatedBoard object - board to serve, default board if None
+        :param ip_address: str - address to listen on
+        :param udp_port: int - port to listen on, 0 picks a free port
+        :param link: LinkConditions object - latency / loss / reordering applied, perfect link if None
+        """
+        self.board = board if board else SimulatedBoard()
+        self.link = link if link else LinkConditions()
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((ip_address, udp_port))
+        self.ip_address, self.udp_port = self.sock.getsockname()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.rx_dropped = 0
+        self.tx_dropped = 0
+
+    def start(self):
+        """
+        :return: UdpSimulator object - self, serving in a background thread
+        """
+        self.thread = threading.Thread(target=self.serve, name=f"udp_sim_{self.udp_port}", daemon=True)
+        self.thread.start()
+        logger.info(f"simulated board listening on udp {self.ip_address}:{self.udp_port}")
+        return self
+
+    def serve(self):
+        self.sock.settimeout(0.1)
+        while not self.stop_event.is_set():
+            try:
+                packet, address = self.sock.recvfrom(255)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            if self.link.is_lost():
+                self.rx_dropped += 1
+                continue
+            reply = self.board.handle_udp_packet(packet)
+            delay = self.link.get_delay()
+            if delay:
+                time.sleep(delay)
+            self.send_reply(reply, address)
+
+    def send_reply(self, reply, address):
+        """
+        :param reply: list byte string - one datagram per entry
+        :param address: tuple - (ip, port) of client
+        """
+        i = 0
+        while i < len(reply):
+            if i + 1 < len(reply) and self.link.is_reordered():
+                datagrams = [reply[i + 1], reply[i]]
+                i += 2
+            else:
+                datagrams = [reply[i]]
+                i += 1
+            for datagram in datagrams:
+                if self.link.is_lost():
+                    self.tx_dropped += 1
+                    continue
+                try:
+                    self.sock.sendto(datagram, address)
+                except OSError as e:
+                    logger.warning(f"simulator send failed: {e}")
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+        self.sock.close()
+
+
+class PtySimulator:
+    """
+    Class to serve a SimulatedBoard on a pseudo-terminal, clients open port_name like a real serial port
+    :caveats: linux / osx only. Loss drops whole commands, reordering doesn't apply to a serial link
+    """
+
+    def __init__(self, board=None, link=None):
+        """
+        :param board: SimulatedBoard object - board to serve, default board if None
+        :param link: LinkConditions object - latency / loss applied, perfect link if None
+        """
+        self.board = board if board else SimulatedBoard()
+        self.link = link if link else LinkConditions()
+        # posix only, imported here so the udp simulator also runs on windows
+        import tty
+        self.master_fd, self.slave_fd = os.openpty()
+        tty.setraw(self.slave_fd)
+        self.port_name = os.ttyname(self.slave_fd)
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.rx_dropped = 0
+        self.rx_in_progress = False
+        self.command = bytearray()
+
+    def start(self):
+        """
+        :return: PtySimulator object - self, serving in a background thread
+        """
+        self.thread = threading.Thread(target=self.serve, name="pty_sim", daemon=True)
+        self.thread.start()
+        logger.info(f"simulated board listening on {self.port_name}")
+        return self
+
+    def serve(self):
+        pending = bytearray()
+        while not self.stop_event.is_set():
+            readable, _, _ = select.select([self.master_fd], [], [], 0.1)
+            if not readable:
+                continue
+            try:
+                pending += os.read(self.master_fd, 255)
+            except OSError:
+                break
+            for command in self.extract_commands(pending):
+                if self.link.is_lost():
+                    self.rx_dropped += 1
+                    continue
+                reply = self.board.handle_command(command)
+                delay = self.link.get_delay()
+                if delay:
+                    time.sleep(delay)
+                os.write(self.master_fd, b''.join(reply))
+
+    def extract_commands(self, pending):
+        """
+        same framing as Comms::get_serial_packet, consumes complete commands from pending
+
+        :param pending: bytearray - bytes received so far, consumed in place
+        :return: list byte string - complete commands (markers removed)
+        """
+        commands = []
+        i = 0
+        while i < len(pending):
+            rc = pending[i]
+            if not self.rx_in_progress:
+                self.rx_in_progress = rc == SimulatedBoard.start_marker
+            elif rc != SimulatedBoard.end_marker:
+                if len(self.command) < SimulatedBoard.max_data_length:
+                    self.command.append(rc)
+            else:
+                # check for case where crc = end marker ']'
+                # the uC also drops the next byte when it isn't ']', at 9600 bauds it hasn't arrived yet, so the
+                # simulator keeps it (back-to-back commands would lose every other command otherwise)
+                if self.board.rx_crc8_enabled and i + 1 < len(pending) and pending[i + 1] == rc:
+                    self.command.append(rc)
+                    i += 1
+                commands.append(bytes(self.command))
+                self.command.clear()
+                self.rx_in_progress = False
+            i += 1
+        del pending[:i]
+        return commands
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+        os.close(self.master_fd)
+        os.close(self.slave_fd)
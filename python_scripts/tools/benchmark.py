@@ -0,0 +1,180 @@
+# general libraries
+import json
+import logging as logger
+import math
+import platform
+import time
+from datetime import datetime
+from serial import SerialException
+# custom libraries
+from tools.OSDetection import OSDetection, OSType
+from tools.arduino_resources import Arduino, Interface, InterfaceType, Error
+from tools.arduino_simulator import SimulatedBoard, LinkConditions, UdpSimulator, PtySimulator
+
+
+class Benchmark:
+    """
+    Class to measure end-to-end command latency and throughput of the Arduino static API against simulated boards
+    """
+    # command family -> function(com, i), i = iteration # (used to alternate set values)
+    command_families = {
+        "get_io": lambda com, i: Arduino.get_io_state(com, "ssr", 1),
+        "set_io": lambda com, i: Arduino.config_io_state(com, "ssr", 1, i % 2 == 0),
+        "rtc_time": lambda com, i: Arduino.get_rtc_time(com),
+        "alarm": lambda com, i: Arduino.get_output_alarm(com, "ssr", 1, True),
+        "probe": lambda com, i: Arduino.get_probe_reading(com, 1),
+    }
+
+    def __init__(self, iterations=200, timeout=0.05, latency=0.0, families=None):
+        """
+        :param iterations: int - # of commands sent per command family and scenario
+        :param timeout: float - interface timeout (sec)
+        :param latency: float - simulated board reply latency (sec)
+        :param families: list str - command families to run (keys of command_families), all if None
+        """
+        self.iterations = iterations
+        self.timeout = timeout
+        self.latency = latency
+        self.families = families if families else list(Benchmark.command_families)
+        self.results = []
+
+    @staticmethod
+    def percentile(sorted_values, percent):
+        """
+        :param sorted_values: list float - values sorted ascending
+        :param percent: float - percentile [0-100]
+        :return: float - nearest rank percentile, None if no values
+        """
+        if not sorted_values:
+            return None
+        rank = max(1, math.ceil(percent / 100 * len(sorted_values)))
+        return sorted_values[min(rank, len(sorted_values)) - 1]
+
+    @staticmethod
+    def summarize(latencies, failure_count, elapsed, decode_error_count=0):
+        """
+        :param latencies: list float - latency of each successful command (sec)
+        :param failure_count: int - # of commands that raised an error
+        :param elapsed: float - total wall time of the run (sec)
+        :param decode_error_count: int - # of commands whose reply passed the FSM but couldn't be decoded
+        :return: dict - count, failure_count, decode_error_count, p50/p95/p99/mean/max latency (ms), cmds_per_sec
+        """
+        latencies = sorted(latencies)
+
+        def to_ms(value):
+            return None if value is None else round(value * 1000, 3)
+        return {"count": len(latencies) + failure_count + decode_error_count,
+                "failure_count": failure_count,
+                "decode_error_count": decode_error_count,
+                "p50_ms": to_ms(Benchmark.percentile(latencies, 50)),
+                "p95_ms": to_ms(Benchmark.percentile(latencies, 95)),
+                "p99_ms": to_ms(Benchmark.percentile(latencies, 99)),
+                "mean_ms": to_ms(sum(latencies) / len(latencies) if latencies else None),
+                "max_ms": to_ms(latencies[-1] if latencies else None),
+                "cmds_per_sec": round(len(latencies) / elapsed, 1) if elapsed else None}
+
+    def run_scenario(self, interface_type, crc8_enabled, loss):
+        """
+        runs every command family against a fresh simulated board
+
+        :param interface_type: InterfaceType (Enum) - transport used
+        :param crc8_enabled: bool - crc8 on commands and replies
+        :param loss: float - simulated packet loss probability [0-1]
+        :return: list dict - one result per command family
+        """
+        board = SimulatedBoard(rx_crc8_enabled=crc8_enabled, tx_crc8_enabled=crc8_enabled)
+        link = LinkConditions(latency=self.latency, loss=loss, seed=0)
+        saved_crc8 = (Arduino.tx_crc8_enabled, Arduino.rx_crc8_enabled)
+        Arduino.tx_crc8_enabled = Arduino.rx_crc8_enabled = crc8_enabled
+        if interface_type == InterfaceType.Wifi:
+            simulator = UdpSimulator(board, udp_port=0, link=link).start()
+            com = Interface(interface_type, ip_address=simulator.ip_address, udp_port=simulator.udp_port,
+                            timeout=self.timeout)
+        else:
+            simulator = PtySimulator(board, link=link).start()
+            com = Interface(interface_type, timeout=self.timeout, windows_port_name=simulator.port_name,
+                            linux_port_name=simulator.port_name, osx_port_name=simulator.port_name)
+        scenario_results = []
+        # measure the protocol, not log formatting / file writes
+        logger.disable(logger.WARNING)
+        try:
+            for family in self.families:
+                function = Benchmark.command_families[family]
+                latencies = []
+                failure_count = 0
+                decode_error_count = 0
+                start = time.perf_counter()
+                for i in range(self.iterations):
+                    command_start = time.perf_counter()
+                    try:
+                        function(com, i)
+                        latencies.append(time.perf_counter() - command_start)
+                    except (Error, OSError, SerialException):
+                        failure_count += 1
+                    except ValueError as e:
+                        # reply of another command accepted by the FSM (i.e. Feb 30), kept apart from link failures
+                        logger.error(f"{family}: decode error: {e}")
+                        decode_error_count += 1
+                elapsed = time.perf_counter() - start
+                result = {"transport": interface_type.name, "crc8": crc8_enabled, "loss": loss, "family": family}
+                result.update(Benchmark.summarize(latencies, failure_count, elapsed, decode_error_count))
+                scenario_results.append(result)
+        finally:
+            logger.disable(logger.NOTSET)
+            Arduino.tx_crc8_enabled, Arduino.rx_crc8_enabled = saved_crc8
+            com.close()
+            simulator.stop()
+        for result in scenario_results:
+            logger.info(f"{result['transport']:<6} crc8: {result['crc8']!s:<5} loss: {result['loss']:<5} "
+                        f"{result['family']:<8} p50: {result['p50_ms']} ms p95: {result['p95_ms']} ms "
+                        f"p99: {result['p99_ms']} ms {result['cmds_per_sec']} cmds/s "
+                        f"failures: {result['failure_count']}/{result['count']} "
+                        f"decode errors: {result['decode_error_count']}")
+        return scenario_results
+
+    @staticmethod
+    def get_default_interface_types():
+        """
+        :return: tuple InterfaceType (Enum) - transports that can be simulated on this OS (no pty on windows)
+        """
+        if OSDetection.get_os_type() == OSType.windows:
+            return (InterfaceType.Wifi,)
+        return (InterfaceType.Wifi, InterfaceType.Serial)
+
+    def run(self, interface_types=None, crc8_options=(False, True), loss_options=(0.0, 0.05)):
+        """
+        runs every combination of transport, crc8 and packet loss
+
+        :param interface_types: list InterfaceType (Enum) - transports to benchmark, every transport that can be
+                                simulated on this OS if None
+        :param crc8_options: list bool - crc8 settings to benchmark
+        :param loss_options: list float - packet loss probabilities to benchmark
+        :return: list dict - every result
+        """
+        if interface_types is None:
+            interface_types = Benchmark.get_default_interface_types()
+        for interface_type in interface_types:
+            for crc8_enabled in crc8_options:
+                for loss in loss_options:
+                    self.results += self.run_scenario(interface_type, crc8_enabled, loss)
+        return self.results
+
+    def to_dict(self):
+        """
+        :return: dict - run metadata + results, JSON serializable
+        """
+        return {"metadata": {"timestamp": datetime.now().isoformat(timespec="seconds"),
+                             "python": platform.python_version(),
+                             "platform": platform.platform(),
+                             "iterations": self.iterations,
+                             "timeout": self.timeout,
+                             "latency": self.latency},
+                "results": self.results}
+
+    def save_json(self, file_path):
+        """
+        :param file_path: str - JSON file to write
+        """
+        with open(file_path, "w") as json_file:
+            json.dump(self.to_dict(), json_file, indent=2)
+        logger.info(f"benchmark results saved to: {file_path}")
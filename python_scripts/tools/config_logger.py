@@ -1,14 +1,40 @@
 import logging as logger
+import atexit
 import os
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    QueueHandler that drops records when the queue is full instead of blocking or raising
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped_count = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped_count += 1
 
 
 # noinspection PyArgumentList
-def config_logger(use_stream_handler, filename="debug.log"):
+def config_logger(use_stream_handler, filename="debug.log", use_queue=False, max_bytes=10 * 1024 * 1024,
+                  backup_count=5, queue_size=10000):
     """
     Configures logger module
     if use stream handler = true -> output to BOTH log file and std out
     :param use_stream_handler - built-in param for pytest info
     :param filename - file to store logs
+    :param use_queue - if true, records go through a bounded queue to a background thread writing to a rotating log
+                       file (+ std out), logging calls never wait on disk / terminal I/O
+    :param max_bytes - size of log file before rotation (use_queue only)
+    :param backup_count - # of rotated log files kept (use_queue only)
+    :param queue_size - max # of records waiting to be written, new records are dropped when full (use_queue only)
+    :return QueueListener object - background writer (use_queue only, stopped at exit), None otherwise
     """
     '''
     # relative to source directory
@@ -17,6 +43,20 @@ def config_logger(use_stream_handler, filename="debug.log"):
     '''
     # relative to working directory
     fullpath = '/'.join([os.getcwd(), filename])
+    if use_queue:
+        sink_handlers = [RotatingFileHandler(fullpath, mode='a', maxBytes=max_bytes, backupCount=backup_count)]
+        if use_stream_handler:
+            sink_handlers.append(logger.StreamHandler())
+        log_queue = queue.Queue(maxsize=queue_size)
+        listener = QueueListener(log_queue, *sink_handlers, respect_handler_level=True)
+        listener.start()
+        atexit.register(listener.stop)
+        # records are formatted by the queue handler, sink handlers write the message as is
+        logger.basicConfig(level=logger.INFO,
+                           format='%(asctime)s - %(message)s',
+                           datefmt='%d-%b-%y %H:%M:%S',
+                           handlers=[DroppingQueueHandler(log_queue)])
+        return listener
     if use_stream_handler:
         # Configure logger module to log to file AND print out to STD out
         # noinspection PyArgumentList
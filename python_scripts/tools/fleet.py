@@ -0,0 +1,143 @@
+# general libraries
+import logging as logger
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from serial import SerialException
+# custom libraries
+from tools.arduino_resources import Settings, Interface, InterfaceType, Error, InvalidSettings
+
+
+class LatencyStats:
+    """
+    Class to accumulate command latency statistics of one board
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.count = 0
+        self.failure_count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.last = None
+
+    def add(self, latency, success=True):
+        """
+        :param latency: float - duration of the call (sec)
+        :param success: bool - False if the call raised an error
+        """
+        with self.lock:
+            self.count += 1
+            if not success:
+                self.failure_count += 1
+            self.total += latency
+            self.last = latency
+            self.min = latency if self.min is None else min(self.min, latency)
+            self.max = latency if self.max is None else max(self.max, latency)
+
+    def as_dict(self):
+        """
+        :return: dict - snapshot of statistics (keys = count, failure_count, mean, min, max, last)
+        """
+        with self.lock:
+            return {"count": self.count,
+                    "failure_count": self.failure_count,
+                    "mean": self.total / self.count if self.count else None,
+                    "min": self.min,
+                    "max": self.max,
+                    "last": self.last}
+
+
+class Fleet:
+    """
+    Class to communicate with several arduino boards concurrently, one Interface per board
+    """
+
+    def __init__(self, boards=None, max_workers=None):
+        """
+        :param boards: list dict - boards to use (see Settings.get_boards), loaded from settings if None
+        :param max_workers: int - # of boards polled at the same time, defaults to one thread per board
+        :caveats: raises InvalidSettings if boards is empty
+        """
+        if boards is None:
+            boards = Settings.get_boards(Settings.get_json())
+        if not boards:
+            raise InvalidSettings("fleet: no board to communicate with")
+        self.boards = boards
+        self.interfaces = {}
+        self.latency_stats = {}
+        for board in boards:
+            self.interfaces[board['name']] = Fleet.open_interface(board)
+            self.latency_stats[board['name']] = LatencyStats()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers or len(boards), thread_name_prefix="fleet")
+        self.last_sweep_time = None
+
+    @staticmethod
+    def open_interface(board):
+        """
+        :param board: dict - board settings (see Settings.get_boards)
+        :return: Interface object - interface used to communicate with board
+        """
+        return Interface(InterfaceType[board['interface_type']],
+                         ip_address=board['ip_address'],
+                         udp_port=board['udp_port'],
+                         timeout=board['timeout'],
+                         windows_port_name=board['port_name'],
+                         linux_port_name=board['port_name'],
+                         osx_port_name=board['port_name'])
+
+    def poll(self, function, *args, **kwargs):
+        """
+        runs function(com, *args, **kwargs) on every board concurrently, i.e. fleet.poll(Arduino.get_io_snapshot)
+
+        :param function: function - takes an Interface object as first argument
+        :return: dict - board name -> value returned by function, or error raised by function
+        :caveats: total sweep time is the time of the slowest board
+        """
+        start = time.perf_counter()
+        futures = {name: self.executor.submit(self.timed_call, name, function, *args, **kwargs)
+                   for name in self.interfaces}
+        results = {name: future.result() for name, future in futures.items()}
+        self.last_sweep_time = time.perf_counter() - start
+        logger.debug(f"fleet sweep: {len(results)} board(s) in {self.last_sweep_time:.3f} sec")
+        return results
+
+    def timed_call(self, name, function, *args, **kwargs):
+        """
+        runs function on one board and records its latency
+
+        :param name: str - board name
+        :param function: function - takes an Interface object as first argument
+        :return: value returned by function, or error raised by function
+        """
+        start = time.perf_counter()
+        success = False
+        try:
+            result = function(self.interfaces[name], *args, **kwargs)
+            success = True
+        except (Error, OSError, SerialException) as e:
+            logger.warning(f"board: {name} failed: {type(e).__name__}: {e}")
+            result = e
+        self.latency_stats[name].add(time.perf_counter() - start, success)
+        return result
+
+    def get_latency_stats(self):
+        """
+        :return: dict - board name -> latency statistics dict
+        """
+        return {name: stats.as_dict() for name, stats in self.latency_stats.items()}
+
+    def get_health(self):
+        """
+        :return: dict - board name -> health dict (see HealthTracker.as_dict)
+        """
+        return {name: com.health_tracker.as_dict() for name, com in self.interfaces.items()}
+
+    def close(self):
+        """
+        closes every board interface and stops the worker threads
+        """
+        self.executor.shutdown(wait=True)
+        for com in self.interfaces.values():
+            com.close()
@@ -0,0 +1,325 @@
+# general libraries
+import logging as logger
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class Histogram:
+    """
+    Class to count observations in fixed buckets (prometheus style: each bucket is an upper bound)
+    """
+    # command latency buckets (sec), from a pipelined serial reply to a command retried up to its deadline
+    default_buckets = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+    def __init__(self, buckets=default_buckets):
+        """
+        :param buckets: tuple float - bucket upper bounds, ascending, +Inf bucket is implicit
+        """
+        self.buckets = buckets
+        self.bucket_counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        """
+        :param value: float - observation (i.e. latency in sec)
+        """
+        self.bucket_counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def as_dict(self):
+        """
+        :return: dict - keys = buckets (list of [upper bound, cumulative count], last bound is "+Inf"), count, sum
+        """
+        cumulative_count = 0
+        buckets = []
+        for upper_bound, bucket_count in zip(self.buckets + ("+Inf",), self.bucket_counts):
+            cumulative_count += bucket_count
+            buckets.append([upper_bound, cumulative_count])
+        return {"buckets": buckets, "count": self.count, "sum": self.sum}
+
+
+class CommMetrics:
+    """
+    Class to accumulate communication metrics of one Interface: command latency per command type,
+    retries per FSM state, timeout / NAK / crc / late reply counters and bytes in / out
+
+    updated by the Interface (bytes) and by the command FSMs running on it (see CmdFSM.run)
+    """
+    # FsmEvent name -> counter incremented when the event occurs
+    event_counters = {"timeout_ack_not_rx": "timeouts",
+                      "timeout_data_not_rx": "timeouts",
+                      "ack_not_rx_tx_verify_get_cmd": "timeouts",
+                      "nak_rx": "naks",
+                      "crc_mismatch_rx": "crc_failures",
+                      "late_ack_rx": "late_replies",
+                      "late_data_rx": "late_replies",
+                      "late_ack_rx_tx_verify_get_cmd": "late_replies"}
+    counter_names = ("commands_ok", "commands_failed", "commands_rejected", "timeouts", "naks", "crc_failures",
+                     "late_replies", "late_bytes", "batch_windows_ok", "batch_windows_failed")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latency_histograms = {}
+        self.retries = {}
+        self.counters = dict.fromkeys(CommMetrics.counter_names, 0)
+        # only incremented by the thread running transactions on the interface
+        self.bytes_tx = 0
+        self.bytes_rx = 0
+
+    @staticmethod
+    def get_command_type(byte_cmd):
+        """
+        :param byte_cmd: byte string - command sent to uC, i.e. b'[CG1]'
+        :return: str - command type, i.e. CG (the 2 letters identifying the command, without its arguments)
+        """
+        return byte_cmd[1:3].decode("ascii", "replace")
+
+    def record_transition(self, fsm_kind, from_state, event, to_state):
+        """
+        :param fsm_kind: str - get or set
+        :param from_state: Enum - state the event occurred in
+        :param event: FsmEvent (Enum) - event that occurred
+        :param to_state: Enum - next state
+        """
+        counter_name = CommMetrics.event_counters.get(event.name)
+        if counter_name is None and not to_state.name.startswith("increment_retry"):
+            return
+        with self.lock:
+            if counter_name is not None:
+                self.counters[counter_name] += 1
+            if to_state.name.startswith("increment_retry"):
+                key = (fsm_kind, from_state.name)
+                self.retries[key] = self.retries.get(key, 0) + 1
+
+    def record_command(self, fsm_kind, byte_cmd, latency, success):
+        """
+        :param fsm_kind: str - get or set
+        :param byte_cmd: byte string - command sent to uC (set command for set FSMs)
+        :param latency: float - duration of the transaction, retries included (sec)
+        :param success: bool - True if the FSM ended in its ok state
+        """
+        key = (fsm_kind, CommMetrics.get_command_type(byte_cmd))
+        with self.lock:
+            histogram = self.latency_histograms.get(key)
+            if histogram is None:
+                histogram = self.latency_histograms[key] = Histogram()
+            histogram.observe(latency)
+            self.counters["commands_ok" if success else "commands_failed"] += 1
+
+    def record_batch_window(self, command_count, latency, success):
+        """
+        :param command_count: int - # of commands pipelined in the window
+        :param latency: float - duration of the window (sec)
+        :param success: bool - True if every reply of the window was received and valid
+        """
+        with self.lock:
+            if success:
+                self.counters["batch_windows_ok"] += 1
+                self.counters["commands_ok"] += command_count
+                histogram = self.latency_histograms.get(("batch", "window"))
+                if histogram is None:
+                    histogram = self.latency_histograms[("batch", "window")] = Histogram()
+                histogram.observe(latency)
+            else:
+                self.counters["batch_windows_failed"] += 1
+
+    def record_late_bytes(self, byte_count):
+        """
+        :param byte_count: int - # of bytes of earlier attempts discarded before a new attempt
+        """
+        with self.lock:
+            self.counters["late_bytes"] += byte_count
+
+    def increment(self, counter_name):
+        """
+        :param counter_name: str - one of counter_names, for events not reported as an FSM transition
+                             (i.e. errors of a CommandBatch window)
+        """
+        with self.lock:
+            self.counters[counter_name] += 1
+
+    def record_rejected(self):
+        """
+        to call when a command fails without being sent because the board is known to be unreachable
+        """
+        with self.lock:
+            self.counters["commands_rejected"] += 1
+
+    def reset(self):
+        with self.lock:
+            self.latency_histograms.clear()
+            self.retries.clear()
+            self.counters = dict.fromkeys(CommMetrics.counter_names, 0)
+            self.bytes_tx = 0
+            self.bytes_rx = 0
+
+    def snapshot(self):
+        """
+        :return: dict - JSON serializable copy of every metric, keys = counters, bytes_tx, bytes_rx,
+                 retries (list of {kind, state, count}), latency (list of {kind, command, histogram})
+        """
+        with self.lock:
+            return {"counters": dict(self.counters),
+                    "bytes_tx": self.bytes_tx,
+                    "bytes_rx": self.bytes_rx,
+                    "retries": [{"kind": kind, "state": state, "count": count}
+                                for (kind, state), count in sorted(self.retries.items())],
+                    "latency": [{"kind": kind, "command": command, "histogram": histogram.as_dict()}
+                                for (kind, command), histogram in sorted(self.latency_histograms.items())]}
+
+
+class PrometheusExporter:
+    """
+    Class of static methods to render CommMetrics snapshots in the prometheus text exposition format
+    """
+    prefix = "arduino"
+    counter_help = {"commands_ok": "commands that completed successfully",
+                    "commands_failed": "commands that ended in a failure state",
+                    "commands_rejected": "commands failed without being sent, board unreachable",
+                    "timeouts": "ACK or data not received before timeout",
+                    "naks": "NAK received instead of ACK",
+                    "crc_failures": "replies dropped because of a crc8 mismatch",
+                    "late_replies": "unexpected bytes received instead of ACK / data (late reply), attempt retried",
+                    "late_bytes": "bytes of earlier attempts discarded before a new attempt",
+                    "batch_windows_ok": "pipelined windows with every reply received",
+                    "batch_windows_failed": "pipelined windows dropped and sent again"}
+    # names of arduino_resources.HealthState, every state gets a series so none appears / disappears on change
+    health_states = ("closed", "open", "half_open")
+
+    @staticmethod
+    def format_labels(labels):
+        """
+        :param labels: dict - label name -> value
+        :return: str - {name="value",...}
+        """
+        return "{" + ",".join(f'{name}="{PrometheusExporter.escape(value)}"' for name, value in labels.items()) + "}"
+
+    @staticmethod
+    def escape(value):
+        """
+        :param value: label value
+        :return: str - value with backslash, new line and double quote escaped
+        """
+        return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+    @staticmethod
+    def render(snapshots):
+        """
+        :param snapshots: dict - board name -> CommMetrics.snapshot(), with the HealthTracker state of the board
+                          under key health (optional)
+        :return: str - prometheus text format
+        """
+        prefix = PrometheusExporter.prefix
+        lines = []
+        for counter_name, help_text in PrometheusExporter.counter_help.items():
+            metric_name = f"{prefix}_{counter_name}_total"
+            lines += [f"# HELP {metric_name} {help_text}", f"# TYPE {metric_name} counter"]
+            for board, snapshot in snapshots.items():
+                labels = PrometheusExporter.format_labels({"board": board})
+                lines.append(f"{metric_name}{labels} {snapshot['counters'][counter_name]}")
+        for direction, key in (("sent", "bytes_tx"), ("received", "bytes_rx")):
+            metric_name = f"{prefix}_bytes_{direction}_total"
+            lines += [f"# HELP {metric_name} bytes {direction} on the interface", f"# TYPE {metric_name} counter"]
+            for board, snapshot in snapshots.items():
+                lines.append(f"{metric_name}{PrometheusExporter.format_labels({'board': board})} {snapshot[key]}")
+
+        metric_name = f"{prefix}_board_up"
+        lines += [f"# HELP {metric_name} 1 if the board is reachable (health closed), 0 while open or probing",
+                  f"# TYPE {metric_name} gauge"]
+        for board, snapshot in snapshots.items():
+            if "health" in snapshot:
+                labels = PrometheusExporter.format_labels({"board": board})
+                lines.append(f"{metric_name}{labels} {int(snapshot['health'] == 'closed')}")
+        metric_name = f"{prefix}_board_health_state"
+        lines += [f"# HELP {metric_name} 1 for the current health state of the board, 0 for the others",
+                  f"# TYPE {metric_name} gauge"]
+        for board, snapshot in snapshots.items():
+            if "health" in snapshot:
+                for state in PrometheusExporter.health_states:
+                    labels = PrometheusExporter.format_labels({"board": board, "state": state})
+                    lines.append(f"{metric_name}{labels} {int(snapshot['health'] == state)}")
+
+        metric_name = f"{prefix}_retries_total"
+        lines += [f"# HELP {metric_name} retries, by state whose failure caused the retry",
+                  f"# TYPE {metric_name} counter"]
+        for board, snapshot in snapshots.items():
+            for retry in snapshot["retries"]:
+                labels = PrometheusExporter.format_labels({"board": board, "kind": retry["kind"],
+                                                           "state": retry["state"]})
+                lines.append(f"{metric_name}{labels} {retry['count']}")
+
+        metric_name = f"{prefix}_command_latency_seconds"
+        lines += [f"# HELP {metric_name} command duration, retries included",
+                  f"# TYPE {metric_name} histogram"]
+        for board, snapshot in snapshots.items():
+            for latency in snapshot["latency"]:
+                labels = {"board": board, "kind": latency["kind"], "command": latency["command"]}
+                histogram = latency["histogram"]
+                for upper_bound, cumulative_count in histogram["buckets"]:
+                    bucket_labels = PrometheusExporter.format_labels(dict(labels, le=upper_bound))
+                    lines.append(f"{metric_name}_bucket{bucket_labels} {cumulative_count}")
+                lines.append(f"{metric_name}_sum{PrometheusExporter.format_labels(labels)} {histogram['sum']}")
+                lines.append(f"{metric_name}_count{PrometheusExporter.format_labels(labels)} {histogram['count']}")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """
+    Class to serve the metrics of several interfaces over http (GET /metrics, prometheus text format)
+    """
+
+    def __init__(self, interfaces, host="127.0.0.1", port=9105):
+        """
+        :param interfaces: dict - board name -> Interface object (i.e. Fleet.interfaces)
+        :param host: str - address to listen on
+        :param port: int - port to listen on, 0 picks a free port
+        """
+        self.interfaces = interfaces
+        self.host = host
+        self.port = port
+        self.http_server = None
+        self.thread = None
+
+    def get_snapshots(self):
+        """
+        :return: dict - board name -> CommMetrics.snapshot() + health (HealthTracker state)
+        """
+        return {name: dict(com.metrics.snapshot(), health=com.health_tracker.state.name)
+                for name, com in self.interfaces.items()}
+
+    def start(self):
+        """
+        :return: MetricsServer object - self, serving in a daemon thread
+        """
+        metrics_server = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = PrometheusExporter.render(metrics_server.get_snapshots()).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logger.debug("metrics http: " + format, *args)
+
+        self.http_server = ThreadingHTTPServer((self.host, self.port), MetricsHandler)
+        self.port = self.http_server.server_address[1]
+        self.thread = threading.Thread(target=self.http_server.serve_forever, name="metrics_server", daemon=True)
+        self.thread.start()
+        logger.info(f"metrics served on: http://{self.host}:{self.port}/metrics")
+        return self
+
+    def stop(self):
+        if self.http_server is not None:
+            self.http_server.shutdown()
+            self.http_server.server_close()
+            self.http_server = None
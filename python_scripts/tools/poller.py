@@ -0,0 +1,123 @@
+# general libraries
+import logging as logger
+import threading
+import time
+from collections import deque
+# custom libraries
+from tools.arduino_resources import Arduino
+
+
+class Poller:
+    """
+    Class to periodically snapshot all IOs, analog inputs, probes and wifi rssi of every board of a fleet
+    into an in-memory ring buffer, and optionally into a TelemetryStore for long-term history
+    """
+
+    def __init__(self, fleet, polling_interval=5, history_length=720, telemetry_store=None):
+        """
+        :param fleet: Fleet object - boards to poll
+        :param polling_interval: float - time between two polling cycles (sec)
+        :param history_length: int - # of snapshots kept per board (oldest dropped first)
+        :param telemetry_store: TelemetryStore object - probe / analog readings are appended to it, None = disabled
+        """
+        self.fleet = fleet
+        self.telemetry_store = telemetry_store
+        self.polling_interval = polling_interval
+        self.history = {name: deque(maxlen=history_length) for name in fleet.interfaces}
+        self.skipped_cycles = {name: 0 for name in fleet.interfaces}
+        self.missed_ticks = 0
+        self.busy_boards = set()
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+
+    @staticmethod
+    def snapshot(com):
+        """
+        reads everything polled on one board
+
+        :param com: Interface object - communication interface (serial port or wifi udp socket)
+        :return: dict - io snapshot (see Arduino.get_io_snapshot) + wifi_rssi + timestamp (epoch sec)
+        :caveats: commands sent to the board by other threads wait until the snapshot is complete
+        """
+        timestamp = time.time()
+        with com.lock:
+            snapshot = Arduino.get_io_snapshot(com)
+            snapshot["wifi_rssi"] = Arduino.get_wifi_rssi(com)
+        snapshot["timestamp"] = timestamp
+        return snapshot
+
+    def run(self, cycles=None):
+        """
+        polls the fleet every polling_interval until stop() is called
+
+        :param cycles: int - # of cycles to run, runs forever if None
+        :caveats: cycles are scheduled on absolute deadlines so the interval doesn't drift, ticks missed because
+                  the host was late are skipped (not bunched up)
+        """
+        next_deadline = time.monotonic()
+        cycle_count = 0
+        while not self.stop_event.is_set():
+            self.run_cycle()
+            cycle_count += 1
+            if cycles is not None and cycle_count >= cycles:
+                break
+            next_deadline += self.polling_interval
+            now = time.monotonic()
+            if now > next_deadline:
+                missed = int((now - next_deadline) // self.polling_interval) + 1
+                self.missed_ticks += missed
+                next_deadline += missed * self.polling_interval
+                logger.warning(f"poller late, skipped {missed} tick(s)")
+            self.stop_event.wait(next_deadline - now)
+
+    def run_cycle(self):
+        """
+        starts polling every board that isn't still busy with the previous cycle
+        :caveats: doesn't wait for boards to reply, a slow board only skips its own cycles
+        """
+        for name in self.fleet.interfaces:
+            with self.lock:
+                if name in self.busy_boards:
+                    self.skipped_cycles[name] += 1
+                    logger.warning(f"board: {name} still busy, skipping cycle")
+                    continue
+                self.busy_boards.add(name)
+            self.fleet.executor.submit(self.poll_board, name)
+
+    def poll_board(self, name):
+        """
+        :param name: str - board name
+        """
+        try:
+            result = self.fleet.timed_call(name, Poller.snapshot)
+            if isinstance(result, Exception):
+                return
+            with self.lock:
+                self.history[name].append(result)
+            if self.telemetry_store is not None:
+                try:
+                    self.telemetry_store.append_snapshot(name, result)
+                except OSError as e:
+                    logger.error(f"board: {name} telemetry not stored: {e}")
+        finally:
+            with self.lock:
+                self.busy_boards.discard(name)
+
+    def stop(self):
+        self.stop_event.set()
+
+    def get_latest(self, name):
+        """
+        :param name: str - board name
+        :return: dict - most recent snapshot of board, None if no snapshot yet
+        """
+        with self.lock:
+            return self.history[name][-1] if self.history[name] else None
+
+    def get_history(self, name):
+        """
+        :param name: str - board name
+        :return: list dict - snapshots of board, oldest first
+        """
+        with self.lock:
+            return list(self.history[name])
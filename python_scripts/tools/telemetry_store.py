@@ -0,0 +1,178 @@
+# general libraries
+import logging as logger
+import mmap
+import os
+import struct
+import threading
+import numpy as np
+
+
+class TelemetryStore:
+    """
+    Class to store per board, per channel samples (i.e. probe_1, analog_2) in append-only binary files
+    and query them through a memory-mapped reader
+
+    one file per board and channel: <directory>/<board>/<channel>.bin
+    one fixed-width record per sample: timestamp (float64, epoch sec) + value (float32), little endian
+    """
+    record_struct = struct.Struct('<df')
+    record_dtype = np.dtype([('timestamp', '<f8'), ('value', '<f4')])
+    file_extension = ".bin"
+    # snapshot key (see Poller.snapshot) -> channel name prefix, ssr states are stored as 0.0 / 1.0
+    snapshot_channels = {"probe": "probe", "analog": "analog", "ssr": "ssr"}
+
+    def __init__(self, directory="telemetry"):
+        """
+        :param directory: str - root directory of the store, created if needed
+        """
+        self.directory = directory
+        self.lock = threading.Lock()
+        self.files = {}
+        self.last_timestamps = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def get_file_path(self, board, channel):
+        """
+        :param board: str - board name
+        :param channel: str - channel name, i.e. probe_1
+        :return: str - path of channel file
+        """
+        return os.path.join(self.directory, board, channel + TelemetryStore.file_extension)
+
+    def open_channel(self, board, channel):
+        """
+        opens channel file for appending, a partial record left by a crash is cut off
+        :param board: str - board name
+        :param channel: str - channel name, i.e. probe_1
+        :return: file object - opened in binary append mode
+        """
+        file_path = self.get_file_path(board, channel)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        last_timestamp = None
+        if os.path.exists(file_path):
+            record_size = TelemetryStore.record_struct.size
+            file_size = os.path.getsize(file_path)
+            if file_size % record_size:
+                logger.warning(f"telemetry: {file_path} ends with a partial record, truncating")
+                os.truncate(file_path, file_size - file_size % record_size)
+                file_size -= file_size % record_size
+            if file_size:
+                with open(file_path, "rb") as channel_file:
+                    channel_file.seek(file_size - record_size)
+                    last_timestamp = TelemetryStore.record_struct.unpack(channel_file.read(record_size))[0]
+        self.last_timestamps[(board, channel)] = last_timestamp
+        channel_file = open(file_path, "ab")
+        self.files[(board, channel)] = channel_file
+        return channel_file
+
+    def append(self, board, channel, timestamp, value):
+        """
+        :param board: str - board name
+        :param channel: str - channel name, i.e. probe_1
+        :param timestamp: float - sample time (epoch sec)
+        :param value: float - sample value
+        :return: bool - False if sample was dropped because it's older than the last sample of the channel
+        :caveats: data is buffered, call flush() to make it visible to readers
+        """
+        with self.lock:
+            channel_file = self.files.get((board, channel))
+            if channel_file is None:
+                channel_file = self.open_channel(board, channel)
+            last_timestamp = self.last_timestamps[(board, channel)]
+            # records are kept in time order so queries can binary search them
+            if last_timestamp is not None and timestamp < last_timestamp:
+                logger.warning(f"telemetry: {board}/{channel} sample older than last sample, dropped")
+                return False
+            channel_file.write(TelemetryStore.record_struct.pack(timestamp, value))
+            self.last_timestamps[(board, channel)] = timestamp
+            return True
+
+    def append_snapshot(self, board, snapshot):
+        """
+        stores probe readings, analog readings and ssr states of a poller snapshot, then flushes them
+
+        :param board: str - board name
+        :param snapshot: dict - see Poller.snapshot (keys used: timestamp, probe, analog, ssr)
+        """
+        timestamp = snapshot["timestamp"]
+        for key, prefix in TelemetryStore.snapshot_channels.items():
+            for io_num, value in enumerate(snapshot.get(key, []), start=1):
+                self.append(board, f"{prefix}_{io_num}", timestamp, value)
+        self.flush()
+
+    def flush(self):
+        with self.lock:
+            for channel_file in self.files.values():
+                channel_file.flush()
+
+    def close(self):
+        with self.lock:
+            for channel_file in self.files.values():
+                channel_file.close()
+            self.files.clear()
+
+    def get_boards(self):
+        """
+        :return: list str - boards with stored samples
+        """
+        return sorted(entry.name for entry in os.scandir(self.directory) if entry.is_dir())
+
+    def get_channels(self, board):
+        """
+        :param board: str - board name
+        :return: list str - channels of board with stored samples
+        """
+        board_directory = os.path.join(self.directory, board)
+        if not os.path.isdir(board_directory):
+            return []
+        return sorted(entry.name[:-len(TelemetryStore.file_extension)] for entry in os.scandir(board_directory)
+                      if entry.name.endswith(TelemetryStore.file_extension))
+
+    def load(self, board, channel, start=None, end=None):
+        """
+        :param board: str - board name
+        :param channel: str - channel name, i.e. probe_1
+        :param start: float - first timestamp included (epoch sec), from first sample if None
+        :param end: float - last timestamp excluded (epoch sec), up to last sample if None
+        :return: numpy structured array (fields: timestamp, value) - read-only view on the memory-mapped file
+        :caveats: only flushed samples are visible
+        """
+        file_path = self.get_file_path(board, channel)
+        if not os.path.exists(file_path):
+            return np.empty(0, dtype=TelemetryStore.record_dtype)
+        record_count = os.path.getsize(file_path) // TelemetryStore.record_struct.size
+        if not record_count:
+            return np.empty(0, dtype=TelemetryStore.record_dtype)
+        with open(file_path, "rb") as channel_file:
+            # the array keeps the mapping alive, no copy of the file is made
+            file_map = mmap.mmap(channel_file.fileno(), 0, access=mmap.ACCESS_READ)
+        records = np.frombuffer(file_map, dtype=TelemetryStore.record_dtype, count=record_count)
+        timestamps = records['timestamp']
+        first = 0 if start is None else int(np.searchsorted(timestamps, start, side='left'))
+        last = record_count if end is None else int(np.searchsorted(timestamps, end, side='left'))
+        return records[first:last]
+
+    def downsample(self, board, channel, bucket_seconds, start=None, end=None):
+        """
+        :param board: str - board name
+        :param channel: str - channel name, i.e. probe_1
+        :param bucket_seconds: float - bucket width (sec), buckets are aligned on multiples of bucket_seconds
+        :param start: float - first timestamp included (epoch sec), from first sample if None
+        :param end: float - last timestamp excluded (epoch sec), up to last sample if None
+        :return: list dict - one dict per non empty bucket, keys = bucket_start, min, max, mean, count
+        """
+        records = self.load(board, channel, start, end)
+        if not len(records):
+            return []
+        values = records['value'].astype(np.float64)
+        bucket_ids = np.floor(records['timestamp'] / bucket_seconds).astype(np.int64)
+        bucket_starts = np.concatenate(([0], np.flatnonzero(np.diff(bucket_ids)) + 1))
+        counts = np.diff(np.append(bucket_starts, len(values)))
+        mins = np.minimum.reduceat(values, bucket_starts)
+        maxs = np.maximum.reduceat(values, bucket_starts)
+        means = np.add.reduceat(values, bucket_starts) / counts
+        return [{"bucket_start": bucket_id * bucket_seconds, "min": bucket_min, "max": bucket_max,
+                 "mean": bucket_mean, "count": count}
+                for bucket_id, bucket_min, bucket_max, bucket_mean, count
+                in zip(bucket_ids[bucket_starts].tolist(), mins.tolist(), maxs.tolist(), means.tolist(),
+                       counts.tolist())]
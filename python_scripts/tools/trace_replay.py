@@ -0,0 +1,205 @@
+# general libraries
+import logging as logger
+import socket
+import time
+from serial import SerialTimeoutException
+# custom libraries
+from tools.arduino_resources import Interface, InterfaceType, TraceRecorder, TraceEvent, Error
+
+
+class TraceMismatch(Error):
+    """command written during replay differs from the recorded one"""
+    pass
+
+
+class TraceExhausted(Error):
+    """replay needs more events than the trace holds"""
+    pass
+
+
+class ReplayInterface(Interface):
+    """
+    Class to feed a trace recorded with Interface.start_recording() back through the command FSMs (GetCmdFSM,
+    SetCmdFSM, CommandBatch), in place of a serial / wifi Interface
+
+    reads return the recorded datagrams / serial chunks and timeouts in the recorded order, writes are checked
+    against the recorded commands. Chunks recorded before a write / flush (drained ahead of time by
+    Interface.receive_datagrams) are buffered, as they were when recorded
+    :caveats: commands must be replayed in the recorded order with the same crc8 settings. A command that gave up
+              on its retry deadline when recorded may retry further when replayed as fast as possible, use realtime.
+              Probes of an unreachable board are sent on a timer, they are only replayed in step in realtime
+    """
+
+    def __init__(self, file_path, realtime=False, retry_policy=None, strict=True, health_tracker=None):
+        """
+        :param file_path: str - trace file written by a TraceRecorder
+        :param realtime: bool - if True, each reply is held back until it's as late after the last write as it was
+                         when recorded (reproduces late ACKs / timing), if False the trace is replayed as fast as
+                         possible (profiling decoder and FSM paths)
+        :param retry_policy: RetryPolicy object - retries of commands replayed, default if None
+        :param strict: bool - if True, raise TraceMismatch when a written command differs from the recorded one
+        :param health_tracker: HealthTracker object - tracks if the replayed board is reachable, default if None
+        """
+        header, self.events = TraceRecorder.load(file_path)
+        self.file_path = file_path
+        self.interface_type = header["interface_type"]
+        self.peer_name = header["peer_name"]
+        self.realtime = realtime
+        self.strict = strict
+        self.timeout = header["timeout"]
+        self.port_name = self.peer_name
+        self.arduino_ip, _, udp_port = self.peer_name.rpartition(":")
+        self.udp_port = int(udp_port) if udp_port.isdigit() else None
+        # recorded timeouts are replayed as recorded
+        self.init_common_state(retry_policy, health_tracker, rtt_estimator=None)
+        self.rx_buffer = bytearray()
+        self.event_index = 0
+        # time of the last write, during replay and when recorded
+        self.last_tx_time = time.monotonic()
+        self.last_tx_event_time = 0.0
+
+    def close(self):
+        self.shutdown_worker()
+        if self.event_index < len(self.events):
+            logger.info(f"replay closed with {len(self.events) - self.event_index} event(s) left in trace")
+
+    def open_udp_socket(self):
+        pass
+
+    def reset_udp_socket(self):
+        pass
+
+    def is_udp_socket_healthy(self):
+        return True
+
+    def get_peer_name(self):
+        return self.peer_name
+
+    def is_finished(self):
+        """
+        :return: bool - True once every recorded event was replayed
+        """
+        return self.event_index >= len(self.events)
+
+    def next_event(self, expected_events):
+        """
+        :param expected_events: tuple TraceEvent (Enum) - events the caller can handle
+        :return: tuple (TraceEvent, float, bytes) - next recorded event
+        :caveats: raises TraceExhausted at end of trace, TraceMismatch if the next event isn't expected
+                  (i.e. replay took a different FSM path than the recording)
+        """
+        if self.event_index >= len(self.events):
+            raise TraceExhausted(f"end of trace: {self.file_path}")
+        event = self.events[self.event_index]
+        if event[0] not in expected_events:
+            raise TraceMismatch(f"event #{self.event_index}: recorded: {event[0].name}, "
+                                f"expected: {', '.join(e.name for e in expected_events)}")
+        self.event_index += 1
+        if self.realtime and event[0] != TraceEvent.tx:
+            delay = self.last_tx_time + (event[1] - self.last_tx_event_time) - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        return event
+
+    def absorb_received(self):
+        """
+        buffers the chunks recorded before the next write / flush, they were received while draining datagrams
+        """
+        while self.event_index < len(self.events) and self.events[self.event_index][0] == TraceEvent.rx:
+            payload = self.events[self.event_index][2]
+            self.rx_buffer += payload
+            self.metrics.bytes_rx += len(payload)
+            self.event_index += 1
+
+    def write(self, byte_cmd):
+        """
+        :param byte_cmd: bytes object - command the FSM sends, checked against the recorded command
+        """
+        self.absorb_received()
+        _, event_time, payload = self.next_event((TraceEvent.tx,))
+        if payload != byte_cmd:
+            if self.strict:
+                raise TraceMismatch(f"event #{self.event_index - 1}: recorded tx: {payload} != tx: {byte_cmd}")
+            logger.warning(f"replay: recorded tx: {payload} != tx: {byte_cmd}")
+        self.metrics.bytes_tx += len(byte_cmd)
+        self.last_tx_time = time.monotonic()
+        self.last_tx_event_time = event_time
+
+    def receive(self):
+        """
+        :return: bytes object - next recorded chunk (datagram or serial read)
+        :caveats: raises socket.timeout (wifi) or SerialTimeoutException (serial) on a recorded timeout
+        """
+        event, _, payload = self.next_event((TraceEvent.rx, TraceEvent.timeout))
+        if event == TraceEvent.timeout:
+            if self.interface_type == InterfaceType.Wifi:
+                raise socket.timeout("recorded timeout")
+            raise SerialTimeoutException("recorded timeout")
+        self.metrics.bytes_rx += len(payload)
+        return payload
+
+    def read(self):
+        """
+        read a byte, same as Interface.read()
+        """
+        if self.interface_type == InterfaceType.Serial and not self.rx_buffer:
+            try:
+                return self.receive()
+            except SerialTimeoutException:
+                return b''
+        if not self.rx_buffer:
+            self.rx_buffer += self.receive()
+        rx_byte = bytes(self.rx_buffer[:1])
+        del self.rx_buffer[:1]
+        return rx_byte
+
+    def read_exact(self, n):
+        """
+        :param n: int - number of bytes to read
+        :return: bytes object - n raw bytes, same as Interface.read_exact()
+        """
+        if self.interface_type == InterfaceType.Serial:
+            # recorded as one chunk, followed by a timeout if short
+            rx_bytes = self.receive()
+            if len(rx_bytes) < n:
+                self.receive()
+            return rx_bytes
+        try:
+            while len(self.rx_buffer) < n:
+                self.rx_buffer += self.receive()
+        except socket.timeout:
+            self.rx_buffer.clear()
+            raise
+        rx_bytes = bytes(self.rx_buffer[:n])
+        del self.rx_buffer[:n]
+        return rx_bytes
+
+    def read_view(self, n):
+        """
+        :param n: int - number of bytes to read
+        :return: memoryview - n raw bytes, same as Interface.read_view()
+        """
+        return memoryview(self.read_exact(n))
+
+    def flush_input(self, settle_time=0):
+        """
+        same as Interface.flush_input(), settle time is only waited in realtime replay
+        """
+        discarded = self.discard_pending_input()
+        while settle_time > 0:
+            if self.realtime:
+                time.sleep(settle_time)
+            discarded_late = self.discard_pending_input()
+            if not discarded_late:
+                break
+            discarded += discarded_late
+        return discarded
+
+    def discard_pending_input(self):
+        """
+        :return: int - number of bytes discarded when recorded
+        """
+        self.absorb_received()
+        self.rx_buffer.clear()
+        _, _, payload = self.next_event((TraceEvent.flush,))
+        return TraceRecorder.flush_count_struct.unpack(payload)[0]